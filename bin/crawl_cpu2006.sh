@@ -1,3 +1,3 @@
 #!/usr/bin/bash
 
-scrapy runspider spec_spider/spiders/cpu2006.py
+scrapy runspider spec_spider/spiders/cpu2006.py -s JOBDIR=data/jobs/cpu2006 "$@"
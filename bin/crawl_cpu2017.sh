@@ -1,3 +1,3 @@
 #!/usr/bin/bash
 
-scrapy runspider spec_spider/spiders/cpu2017.py
+scrapy runspider spec_spider/spiders/cpu2017.py -s JOBDIR=data/jobs/cpu2017 "$@"
@@ -1,3 +1,3 @@
 #!/usr/bin/bash
 
-scrapy runspider spec_spider/spiders/jbb2015.py
+scrapy runspider spec_spider/spiders/jbb2015.py -s JOBDIR=data/jobs/jbb2015 "$@"
@@ -1,3 +1,3 @@
 #!/usr/bin/bash
 
-scrapy runspider spec_spider/spiders/jvm2008.py
+scrapy runspider spec_spider/spiders/jvm2008.py -s JOBDIR=data/jobs/jvm2008 "$@"
@@ -0,0 +1,3 @@
+#!/usr/bin/bash
+
+export PYTHONPATH=$(pwd) && python -u spec_spider/diff.py "$@"
@@ -1,3 +1,3 @@
 #!/usr/bin/bash
 
-export PYTHONPATH=$(pwd) && python -u spec_spider/extractor/extract_cpu.py
+export PYTHONPATH=$(pwd) && python -u spec_spider/extractor/extract_cpu.py "$@"
@@ -1,3 +1,3 @@
 #!/usr/bin/bash
 
-export PYTHONPATH=$(pwd) && python -u spec_spider/extractor/extract_jbb2015.py
+export PYTHONPATH=$(pwd) && python -u spec_spider/extractor/extract_jbb2015.py "$@"
@@ -0,0 +1,631 @@
+import contextlib
+import csv
+import io
+import os
+import re
+import sys
+import tempfile
+import time
+import tracemalloc
+from functools import partial
+
+from spec_spider.snapshot import latest_snapshot, list_outputs
+from spec_spider.storage import HtmlArchive
+from spec_spider.utils import VENDOR_NAMES, clean_vendor, delete_tag_and_br
+
+ARCHIVE_DIR = 'data/archive'
+# archive keys of the detail pages, by benchmark
+DETAIL_PREFIXES = {
+    'cpu2017': 'spec.org/cpu2017/results/res',
+    'cpu2006': 'spec.org/cpu2006/results/res',
+    'jbb2015': 'spec.org/jbb2015/results/res',
+    'jvm2008': 'spec.org/jvm2008/results/res',
+    'ssj2008': 'spec.org/power_ssj2008/results/res',
+}
+
+
+def _timeit(func, items, repeat):
+    """ Best wall time of `repeat` runs of func over items """
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for item in items:
+            func(item)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def _archived_responses(archive, prefix, limit):
+    from scrapy.http import HtmlResponse
+
+    responses = []
+    for url, body, encoding in archive.iter_pages(prefix):
+        responses.append(HtmlResponse(url, body=body, encoding=encoding))
+        if len(responses) >= limit:
+            break
+    return responses
+
+
+def bench_extraction(archive_dir=ARCHIVE_DIR, limit=500, repeat=3):
+    """ Detail pages per second of the extraction plans against one
+    response.css call per query, over pages of the archive """
+    from spec_spider.spiders.cpu2006 import Cpu2006Spider
+    from spec_spider.spiders.cpu2017 import Cpu2017Spider
+    from spec_spider.spiders.jbb2015 import Jbb2015Spider
+    from spec_spider.spiders.jvm2008 import Jvm2008Spider
+    from spec_spider.spiders.ssj2008 import Ssj2008Spider
+
+    plans = {
+        'cpu2017': Cpu2017Spider.plan,
+        'cpu2006': Cpu2006Spider.plan,
+        'jbb2015': Jbb2015Spider.plan,
+        'jvm2008': Jvm2008Spider.plan,
+        'ssj2008': Ssj2008Spider.plan,
+    }
+    archive = HtmlArchive.open(archive_dir)
+    for name, plan in plans.items():
+        prefix = DETAIL_PREFIXES[name]
+        responses = _archived_responses(archive, prefix, limit)
+        if not len(responses):
+            print(f"{name}: no archived pages under {prefix}")
+            continue
+
+        for response in responses:
+            # both approaches share the parsed tree, only extraction is timed
+            expected = {k: v.getall() for k, v in plan.extract_css(response).items()}
+            actual = {k: v.getall() for k, v in plan.extract(response).items()}
+            if expected != actual:
+                fields = [k for k in expected if expected[k] != actual[k]]
+                print(f"{name}: plan differs on {response.url}: {fields}")
+
+        css = _timeit(plan.extract_css, responses, repeat)
+        compiled = _timeit(plan.extract, responses, repeat)
+        print(
+            f"{name}: {len(responses)} pages, "
+            f"response.css {len(responses) / css:.0f} pages/s, "
+            f"plan {len(responses) / compiled:.0f} pages/s ({css / compiled:.1f}x)"
+        )
+
+
+def _regex_delete_tag_and_br(raw_html):
+    """ delete_tag_and_br as it was, one compile and three passes per call """
+    raw_html = re.sub(re.compile('<.*?>'), '', raw_html).strip()
+    return re.sub('\n', ' ', re.sub('<br>', '', raw_html)).strip()
+
+
+def bench_cleaner(archive_dir=ARCHIVE_DIR, limit=200, repeat=5):
+    """ Table cells per second of delete_tag_and_br against the regex chain it
+    replaced, over the cells of archived detail pages """
+    archive = HtmlArchive.open(archive_dir)
+    cells = []
+    for prefix in DETAIL_PREFIXES.values():
+        for response in _archived_responses(archive, prefix, limit):
+            cells.extend(response.css('td').getall())
+    if not len(cells):
+        print(f"no archived pages in {archive_dir}")
+        return
+
+    for cell in cells:
+        if delete_tag_and_br(cell) != _regex_delete_tag_and_br(cell):
+            print(f"cleaner differs on {cell!r}")
+
+    regex = _timeit(_regex_delete_tag_and_br, cells, repeat)
+    single = _timeit(delete_tag_and_br, cells, repeat)
+    print(
+        f"{len(cells)} cells, regex chain {len(cells) / regex:.0f} cells/s, "
+        f"single pass {len(cells) / single:.0f} cells/s ({regex / single:.1f}x)"
+    )
+
+
+def _folder_size(path):
+    if os.path.isfile(path):
+        return os.path.getsize(path)
+    return sum(os.path.getsize(os.path.join(path, name)) for name in os.listdir(path))
+
+
+def bench_export(benchmarks=('cpu2006', 'cpu2017'), repeat=3):
+    """ Size and load time of the csv files of the latest snapshots against the
+    same rows exported to parquet """
+    import pandas as pd
+
+    from spec_spider.exporters import ParquetItemExporter
+    from spec_spider.extractor.loader import read_parquet_result
+
+    for benchmark in benchmarks:
+        folder = latest_snapshot(benchmark)
+        if folder is None:
+            print(f"{benchmark}: no snapshot")
+            continue
+        with tempfile.TemporaryDirectory() as tmp:
+            for name in sorted(os.listdir(folder)):
+                if not name.endswith('.csv'):
+                    continue
+                csv_path = os.path.join(folder, name)
+                parquet_path = os.path.join(tmp, f"{name[:-4]}.parquet")
+                exporter = ParquetItemExporter(parquet_path)
+                with open(csv_path, newline='', encoding='utf-8') as f:
+                    for row in csv.DictReader(f):
+                        exporter.export_item(row)
+                exporter.finish_exporting()
+
+                expected = pd.read_csv(csv_path)
+                actual = read_parquet_result(parquet_path)
+                if not expected.equals(actual):
+                    print(f"{benchmark}/{name}: parquet load differs from read_csv")
+
+                csv_time = _timeit(pd.read_csv, [csv_path], repeat)
+                parquet_time = _timeit(read_parquet_result, [parquet_path], repeat)
+                csv_size = _folder_size(csv_path)
+                parquet_size = _folder_size(parquet_path)
+                print(
+                    f"{benchmark}/{name}: {len(expected)} rows, "
+                    f"{csv_size / 1024:.0f} KiB -> {parquet_size / 1024:.0f} KiB "
+                    f"({csv_size / parquet_size:.1f}x), load {csv_time * 1000:.1f} ms"
+                    f" -> {parquet_time * 1000:.1f} ms ({csv_time / parquet_time:.1f}x)"
+                )
+
+
+def _retained_bytes(build, rows):
+    """ Memory held by the objects build makes of rows, all kept alive """
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    kept = [build(row) for row in rows]
+    size = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    del kept
+    return size
+
+
+def bench_items(benchmarks=tuple(DETAIL_PREFIXES), repeat=3):
+    """ Memory per item and csv export time of the scraped dicts against the
+    declared slot items, over the rows of the latest snapshots """
+    from scrapy.exporters import CsvItemExporter
+
+    from spec_spider.exporters import SlotCsvItemExporter
+    from spec_spider.items import get_item_class
+
+    for benchmark in benchmarks:
+        folder = latest_snapshot(benchmark)
+        if folder is None:
+            print(f"{benchmark}: no snapshot")
+            continue
+        for name in sorted(os.listdir(folder)):
+            if not name.endswith('.csv'):
+                continue
+            item_class = get_item_class(benchmark, name[: -len('.csv')])
+            if item_class is None:
+                continue
+            with open(os.path.join(folder, name), newline='', encoding='utf-8') as f:
+                # the spiders leave unscraped fields out of their dicts
+                reader = csv.DictReader(f)
+                rows = [{k: v for k, v in row.items() if v} for row in reader]
+            if not len(rows):
+                continue
+            items = [item_class.from_dict(row)[0] for row in rows]
+
+            dict_bytes = _retained_bytes(dict, rows)
+            item_bytes = _retained_bytes(lambda row: item_class.from_dict(row)[0], rows)
+
+            def export(exporter_class, batch, fields=item_class.fields):
+                stream = io.BytesIO()
+                exporter = exporter_class(stream, fields_to_export=fields)
+                exporter.start_exporting()
+                for item in batch:
+                    exporter.export_item(item)
+                exporter.finish_exporting()
+                exporter.stream.flush()
+                return stream.getvalue()
+
+            if export(CsvItemExporter, rows) != export(SlotCsvItemExporter, items):
+                print(f"{benchmark}/{name}: slot items export differently")
+            dict_time = _timeit(partial(export, CsvItemExporter), [rows], repeat)
+            item_time = _timeit(partial(export, SlotCsvItemExporter), [items], repeat)
+            print(
+                f"{benchmark}/{name}: {len(rows)} items, "
+                f"{dict_bytes / len(rows):.0f} -> {item_bytes / len(rows):.0f} B/item "
+                f"({dict_bytes / item_bytes:.1f}x), export {dict_time * 1000:.1f} ms"
+                f" -> {item_time * 1000:.1f} ms ({dict_time / item_time:.1f}x)"
+            )
+
+
+# raw column of the hardware vendor, by benchmark
+VENDOR_COLUMNS = {
+    'cpu2017': 'Hardware Vendor',
+    'cpu2006': 'Hardware Vendor',
+    'jbb2015': 'Vendor',
+    'jvm2008': 'HW vendor',
+    'ssj2008': 'Hardware Vendor',
+}
+
+
+def _regex_clean_vendor(vendor):
+    """ clean_vendor as it was, every pattern compiled again on each call """
+
+    def _clear(pattern):
+        return re.sub(re.compile(pattern, re.IGNORECASE), '', vendor)
+
+    vendor = vendor.strip()
+    patterns = [
+        ' *[(].*[)]',
+        ',* *Ltd\\.*$|,* *Inc\\.*$',
+        ',* *Co\\.*$|,* *Corporation\\.*$|,* *Corparation\\.*$|,* *Corp\\.*$'
+        '| Incoporated$| Incorporated$| Incorporation$',
+        ' International$',
+        ' Computer[s]*$',
+        ' Technology$',
+    ]
+    for pattern in patterns:
+        vendor = _clear(pattern)
+
+    for pair in VENDOR_NAMES:
+        if len(re.findall(re.compile(pair[0], re.IGNORECASE), vendor)):
+            vendor = pair[1]
+    return vendor
+
+
+def bench_vendor(benchmarks=tuple(VENDOR_COLUMNS), repeat=5):
+    """ Vendors per second of clean_vendor against the regex loops it
+    replaced, over the vendors of the latest snapshots of every benchmark """
+    from spec_spider.extractor.loader import read_result
+
+    vendors = []
+    for benchmark in benchmarks:
+        folder = latest_snapshot(benchmark)
+        if folder is None:
+            print(f"{benchmark}: no snapshot")
+            continue
+        for name in list_outputs(folder):
+            df = read_result(os.path.join(folder, name))
+            column = VENDOR_COLUMNS[benchmark]
+            if column in df.columns:
+                vendors.extend(v for v in df[column].tolist() if isinstance(v, str))
+    if not len(vendors):
+        return
+
+    for vendor in sorted(set(vendors)):
+        if clean_vendor(vendor) != _regex_clean_vendor(vendor):
+            print(f"clean_vendor differs on {vendor!r}")
+
+    loops = _timeit(_regex_clean_vendor, vendors, repeat)
+    compiled = _timeit(clean_vendor, vendors, repeat)
+    print(
+        f"{len(vendors)} vendors ({len(set(vendors))} distinct), regex loops "
+        f"{len(vendors) / loops:.0f} vendors/s, precompiled "
+        f"{len(vendors) / compiled:.0f} vendors/s ({loops / compiled:.1f}x)"
+    )
+
+
+# raw columns of the cpu snapshots the CpuExtractor transforms read
+CPU_COLUMNS = {
+    'cpu2017': ('Enabled', 'Orderable', 'Memory', 'Storage', 'File System'),
+    'cpu2006': (
+        'CPU(s) enabled',
+        'CPU(s) orderable',
+        'Memory',
+        'Disk Subsystem',
+        'File System',
+    ),
+}
+# (name, column index in CPU_COLUMNS or the URL Suffix, utils parser)
+CPU_TRANSFORMS = (
+    ('parse_cpu_enabled', 0, None),
+    ('parse_cpu_orderable', 1, 'parse_cpu_orderable'),
+    ('parse_memory', 2, None),
+    ('parse_storage', 3, 'parse_storage'),
+    ('lower', 4, None),
+    ('get_submit_quarter', None, 'get_submit_quarter'),
+    ('get_submit_year', None, 'get_submit_year'),
+)
+
+
+def _cpu_enabled_by_row(values):
+    """ The four passes the extractor made over CPU Enabled """
+    import pandas as pd
+
+    from spec_spider import utils
+
+    df = pd.DataFrame(
+        {
+            'Total Cores': values.apply(utils.get_total_cores),
+            'Chips': values.apply(utils.get_chips),
+            'Threads Per Core': values.apply(utils.get_threads_per_core),
+        }
+    )
+    df['Cores Per Chip'] = df.apply(lambda i: i['Total Cores'] // i['Chips'], axis=1)
+    return df
+
+
+def _memory_by_row(values):
+    """ The two passes the extractor made over Memory """
+    import pandas as pd
+
+    from spec_spider import utils
+
+    return pd.DataFrame(
+        {
+            'Memory Amount': values.apply(utils.get_total_memory_amount),
+            'Memory Number': values.apply(utils.get_memory_number),
+        }
+    )
+
+
+# the transforms of several columns, against the passes they replaced
+FUSED_BY_ROW = {
+    'parse_cpu_enabled': _cpu_enabled_by_row,
+    'parse_memory': _memory_by_row,
+}
+
+
+def bench_cpu_transforms(benchmarks=tuple(CPU_COLUMNS), repeat=5):
+    """ Time of the vectorized CpuExtractor column transforms against applying
+    the utils parsers row by row, over the rows of the latest snapshots """
+    import pandas as pd
+
+    from spec_spider import utils
+    from spec_spider.extractor import vectorized as vec
+    from spec_spider.extractor.loader import read_result
+
+    for benchmark in benchmarks:
+        folder = latest_snapshot(benchmark)
+        if folder is None:
+            print(f"{benchmark}: no snapshot")
+            continue
+        columns = list(CPU_COLUMNS[benchmark]) + ['URL Suffix']
+        df = pd.concat(
+            [read_result(os.path.join(folder, name)) for name in list_outputs(folder)]
+        )
+        # the rows the extractor keeps
+        df = df[columns].dropna().reset_index(drop=True)
+
+        total_apply = total_vec = 0
+        for name, index, parser in CPU_TRANSFORMS:
+            values = df[columns[-1 if index is None else index]]
+            if name in FUSED_BY_ROW:
+                by_row = FUSED_BY_ROW[name]
+            else:
+                func = getattr(utils, parser) if parser else str.lower
+                by_row = partial(pd.Series.apply, func=func)
+            transform = getattr(vec, name)
+            expected = pd.DataFrame(by_row(values))
+            actual = pd.DataFrame(transform(values))
+            if name in FUSED_BY_ROW:
+                # the columns the passes gave, out of all those parsed
+                actual = actual[expected.columns]
+            if expected.to_numpy().tolist() != actual.to_numpy().tolist():
+                print(f"{benchmark}: {name} differs from the row by row parser")
+            apply_time = _timeit(by_row, [values], repeat)
+            vec_time = _timeit(transform, [values], repeat)
+            total_apply += apply_time
+            total_vec += vec_time
+            print(
+                f"{benchmark}/{name}: {len(values)} rows, apply "
+                f"{apply_time * 1000:.1f} ms -> {vec_time * 1000:.1f} ms "
+                f"({apply_time / vec_time:.1f}x)"
+            )
+        print(
+            f"{benchmark}: all transforms {total_apply * 1000:.1f} ms -> "
+            f"{total_vec * 1000:.1f} ms ({total_apply / total_vec:.1f}x)"
+        )
+
+
+def _by_row_cpu2017_extractor():
+    """ Cpu2017Extrator with the transforms it had before the vectorized ones,
+    one .apply per row; the columns added since are computed the same way """
+    from spec_spider import utils
+    from spec_spider.extractor import vectorized as vec
+    from spec_spider.extractor.extract_cpu import Cpu2017Extrator
+
+    class ByRowCpu2017Extrator(Cpu2017Extrator):
+        def _clean_vendor(self):
+            self.df['HW Vendor'] = self.df['HW Vendor'].apply(_regex_clean_vendor)
+
+        def _parse_system_name(self):
+            self.df['System Series'] = self.df['System Name'].apply(
+                utils.parse_system_name
+            )
+
+        def _get_cpu_vendor(self):
+            self.df['CPU Vendor'] = self.df['CPU Name'].apply(utils.get_cpu_vendor)
+
+        def _parse_cpu_orderable(self):
+            self.df['Max Chips'] = self.df['CPU Orderable'].apply(
+                utils.parse_cpu_orderable
+            )
+
+        def _parse_cpu_enabled(self):
+            topology = _cpu_enabled_by_row(self.df['CPU Enabled'])
+            for column in vec.TOPOLOGY_COLUMNS:
+                self.df[column] = topology[column]
+
+        def _parse_file_system(self):
+            self.df['File System'] = self.df['File System'].apply(str.lower)
+
+        def _parse_memory(self):
+            memory = vec.parse_memory(self.df['Memory'])
+            for column in vec.MEMORY_COLUMNS:
+                self.df[column] = memory[column]
+            for column, values in _memory_by_row(self.df['Memory']).items():
+                self.df[column] = values
+
+        def _parse_storage(self):
+            self.df['Storage Type'] = self.df['Storage'].apply(utils.parse_storage)
+
+        def _get_submit_quarter(self):
+            self.df['Submit Quarter'] = self.df['URL Suffix'].apply(
+                utils.get_submit_quarter
+            )
+
+        def _get_submit_year(self):
+            self.df['Submit Year'] = self.df['URL Suffix'].apply(
+                utils.get_submit_year
+            )
+
+        def _clean_test_date(self):
+            self.df['Test Date'] = self.df['Test Date'].apply(utils.clean_date_1)
+
+        def _clean_hw_avail(self):
+            self.df['HW Avail'] = self.df['HW Avail'].apply(utils.clean_date_1)
+
+        def _format_result(self):
+            self.df['Result'] = self.df['Result'].apply(float)
+
+    return ByRowCpu2017Extrator
+
+
+def bench_cpu_run(data_folder='.', repeat=3):
+    """ Time of a whole cpu2017 extraction, from loading the csv files of
+    data_folder/cpu/cpu2017 to writing the cleaned one, against the same
+    extraction with the row by row transforms """
+    import pandas as pd
+
+    from spec_spider.extractor.extract_cpu import Cpu2017Extrator, run_cpu2017
+
+    data_folder = os.path.abspath(data_folder)
+    if not os.path.isdir(os.path.join(data_folder, 'cpu', 'cpu2017')):
+        print(f"no cpu/cpu2017 results in {data_folder}")
+        return
+    extractors = {
+        'by row': _by_row_cpu2017_extractor(),
+        'vectorized': Cpu2017Extrator,
+    }
+    times, outputs = {}, {}
+    cwd = os.getcwd()
+    # the extractor writes ./data/clean/cpu/cpu2017.csv and prints its frame
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                for name, extractor in extractors.items():
+                    run = partial(run_cpu2017, extractor=extractor)
+                    times[name] = _timeit(run, [data_folder], repeat)
+                    outputs[name] = pd.read_csv('data/clean/cpu/cpu2017.csv')
+        finally:
+            os.chdir(cwd)
+
+    if not outputs['by row'].equals(outputs['vectorized']):
+        print("cpu2017: the cleaned csv differs from the row by row extraction")
+    by_row, vectorized = times['by row'], times['vectorized']
+    print(
+        f"cpu2017: {len(outputs['vectorized'])} results, Cpu2017Extrator.run "
+        f"{by_row:.2f} s -> {vectorized:.2f} s ({by_row / vectorized:.1f}x)"
+    )
+
+
+# raw columns describing the memory, by benchmark
+MEMORY_COLUMNS = {
+    'cpu2017': ('Memory',),
+    'cpu2006': ('Memory',),
+    'jbb2015': ('# and size of DIMM(s)', 'Memory Details'),
+    'jvm2008': ('Memory details',),
+    'ssj2008': ('# and size of DIMM', 'Memory Details'),
+}
+
+
+# descriptions of spec.org and the MemorySpec fields parse_memory must read
+MEMORY_CASES = {
+    '384 GB (12 x 32 GB 2Rx4 PC4-2933Y-R)': (384, 12, 384, 32, 'DDR4', 2933),
+    # the DIMMs run below their PC4-3200 rating
+    '512 GB (8 x 64 GB 2Rx4 PC4-3200AA-R, running at 2933)': (
+        512, 8, 512, 64, 'DDR4', 2933
+    ),
+}
+
+
+def _total_memory_amount(info):
+    """ get_total_memory_amount, None on a description it cannot read """
+    from spec_spider import utils
+
+    try:
+        return utils.get_total_memory_amount(info)
+    except (IndexError, ValueError):
+        return None
+
+
+def _memory_passes(values):
+    from spec_spider import utils
+
+    return values.apply(_total_memory_amount), values.apply(utils.get_memory_number)
+
+
+def bench_memory(benchmarks=tuple(MEMORY_COLUMNS), repeat=5):
+    """ parse_memory of the MEMORY_CASES, then over every distinct memory
+    description of the latest snapshots: the same DIMM count as
+    get_memory_number and amount as get_total_memory_amount, the cpu
+    descriptions without an amount, the share of descriptions giving each
+    field, and the time of a column against the two passes """
+    import pandas as pd
+
+    from spec_spider import utils
+    from spec_spider.extractor import vectorized as vec
+    from spec_spider.extractor.loader import read_result
+
+    for info, expected in MEMORY_CASES.items():
+        spec = utils.parse_memory(info)
+        if tuple(spec) != expected:
+            print(f"parse_memory({info!r}) is {tuple(spec)}, not {expected}")
+        if tuple(vec.parse_memory(pd.Series([info])).iloc[0]) != expected:
+            print(f"vectorized parse_memory differs on {info!r}")
+
+    for benchmark in benchmarks:
+        folder = latest_snapshot(benchmark)
+        if folder is None:
+            print(f"{benchmark}: no snapshot")
+            continue
+        df = pd.concat(
+            [read_result(os.path.join(folder, name)) for name in list_outputs(folder)]
+        )
+        for column in MEMORY_COLUMNS[benchmark]:
+            if column not in df.columns:
+                continue
+            values = df[column].dropna()
+            values = values[values.map(type) == str].reset_index(drop=True)
+            if not len(values):
+                continue
+            specs = {info: utils.parse_memory(info) for info in values.unique()}
+
+            for info, spec in specs.items():
+                if spec.dimms != utils.get_memory_number(info):
+                    print(f"{benchmark}: DIMM count differs on {info!r}")
+                amount = _total_memory_amount(info)
+                if spec.amount != amount:
+                    print(f"{benchmark}: amount {amount} -> {spec.amount} on {info!r}")
+                elif amount is None and benchmark in CPU_COLUMNS:
+                    print(f"{benchmark}: no amount in {info!r}, the extraction stops")
+
+            found = ', '.join(
+                f"{field} {sum(getattr(s, field) is not None for s in specs.values())}"
+                for field in ('amount', 'total', 'dimm_size', 'memory_type', 'speed')
+            )
+            # where reading the units gives another total than the first number
+            other_total = sum(
+                None not in (s.amount, s.total) and s.amount != s.total
+                for s in specs.values()
+            )
+            by_row = _timeit(_memory_passes, [values], repeat)
+            fused = _timeit(vec.parse_memory, [values], repeat)
+            print(
+                f"{benchmark}/{column}: {len(values)} rows, {len(specs)} distinct, "
+                f"with {found}, {other_total} totals other than the amount; "
+                f"two passes {by_row * 1000:.1f} ms -> "
+                f"{fused * 1000:.1f} ms ({by_row / fused:.1f}x)"
+            )
+
+
+BENCHMARKS = {
+    'extraction': bench_extraction,
+    'cleaner': bench_cleaner,
+    'vendor': bench_vendor,
+    'export': bench_export,
+    'items': bench_items,
+    'cpu_transforms': bench_cpu_transforms,
+    'cpu_run': bench_cpu_run,
+    'memory': bench_memory,
+}
+
+
+if __name__ == '__main__':
+    # e.g. python spec_spider/bench.py extraction, default to all benchmarks
+    names = sys.argv[1:] or list(BENCHMARKS)
+    for name in names:
+        print(f"--- {name} ---")
+        BENCHMARKS[name]()
@@ -0,0 +1,38 @@
+import sys
+
+from scrapy.crawler import Crawler, CrawlerProcess
+from scrapy.utils.project import get_project_settings
+
+from spec_spider.spiders.cpu2006 import Cpu2006Spider
+from spec_spider.spiders.cpu2017 import Cpu2017Spider
+from spec_spider.spiders.jbb2015 import Jbb2015Spider
+from spec_spider.spiders.jvm2008 import Jvm2008Spider
+from spec_spider.spiders.ssj2008 import Ssj2008Spider
+
+SPIDERS = [Cpu2017Spider, Cpu2006Spider, Jbb2015Spider, Jvm2008Spider, Ssj2008Spider]
+
+
+def crawl_all(names=None):
+    """ Run the spiders concurrently in one process and reactor
+
+    Every spider keeps its own pipeline through its custom_settings and its
+    own resumable JOBDIR, while the download delay becomes a single budget per
+    host shared by all of them.
+    """
+    spiders = [spider for spider in SPIDERS if not names or spider.name in names]
+
+    settings = get_project_settings()
+    settings.set('SHARED_DOWNLOAD_DELAY', settings.getfloat('DOWNLOAD_DELAY'))
+    settings.set('DOWNLOAD_DELAY', 0)
+
+    process = CrawlerProcess(settings)
+    for spider in spiders:
+        crawler_settings = settings.copy()
+        crawler_settings.set('JOBDIR', f"data/jobs/{spider.name}")
+        process.crawl(Crawler(spider, crawler_settings))
+    process.start()
+
+
+if __name__ == '__main__':
+    # e.g. python spec_spider/crawl.py cpu2017 jbb2015, default to all spiders
+    crawl_all(sys.argv[1:])
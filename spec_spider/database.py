@@ -0,0 +1,132 @@
+import os
+import sqlite3
+from contextlib import closing
+from typing import Dict, List, Optional, Set, Tuple
+
+DATABASE_NAME = 'results.db'
+KEY = 'URL Suffix'
+
+
+def quote(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+def submit_year_range(years: Tuple[int, int]) -> Tuple[str, str]:
+    """ URL Suffix bounds of the results submitted within years, both included
+    :param years: (2018, 2019)
+    :return: ('res2018', 'res2020'), res2018q1/... <= suffix < res2020
+    """
+    first, last = years
+    return f"res{first}", f"res{last + 1}"
+
+
+class ResultDatabase:
+    """ Results of a benchmark in SQLite, `data/<benchmark>/results.db`
+
+    One table per suite with `URL Suffix` as primary key, so a result crawled
+    again updates its row. Rows are upserted in transactions of batch_size,
+    the database runs in WAL mode so it can be read during a crawl. Columns
+    are added as items bring new fields; all of them hold the scraped text.
+    """
+
+    _opened: Dict[str, 'ResultDatabase'] = {}
+
+    @classmethod
+    def open(cls, path: str, batch_size: int = 1000) -> 'ResultDatabase':
+        """ One connection per database, shared by the exporters of its suites """
+        path = os.path.abspath(path)
+        database = cls._opened.get(path)
+        if database is None:
+            database = cls(path, batch_size)
+            cls._opened[path] = database
+        database.users += 1
+        return database
+
+    def __init__(self, path: str, batch_size: int = 1000):
+        self.path = path
+        self.batch_size = batch_size
+        self.users = 0
+        self.pending = 0
+        # the writer thread may export the items, one thread at a time
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.execute('PRAGMA journal_mode=WAL')
+        self.connection.execute('PRAGMA synchronous=NORMAL')
+        self.columns: Dict[str, Set[str]] = {}
+        self.statements: Dict[Tuple, str] = {}
+
+    def _ensure_columns(self, table: str, fields):
+        columns = self.columns.get(table)
+        if columns is None:
+            self.connection.execute(
+                f"CREATE TABLE IF NOT EXISTS {quote(table)} "
+                f"({quote(KEY)} TEXT PRIMARY KEY)"
+            )
+            rows = self.connection.execute(f"PRAGMA table_info({quote(table)})")
+            columns = {row[1] for row in rows}
+            self.columns[table] = columns
+        for field in fields:
+            if field not in columns:
+                self.connection.execute(
+                    f"ALTER TABLE {quote(table)} ADD COLUMN {quote(field)} TEXT"
+                )
+                columns.add(field)
+
+    def _upsert_statement(self, table: str, names: Tuple[str, ...]) -> str:
+        statement = self.statements.get((table, names))
+        if statement is None:
+            updates = ', '.join(
+                f"{quote(name)} = excluded.{quote(name)}"
+                for name in names
+                if name != KEY
+            )
+            statement = (
+                f"INSERT INTO {quote(table)} ({', '.join(map(quote, names))}) "
+                f"VALUES ({', '.join('?' for _ in names)}) "
+                f"ON CONFLICT({quote(KEY)}) "
+                + (f"DO UPDATE SET {updates}" if updates else 'DO NOTHING')
+            )
+            self.statements[(table, names)] = statement
+        return statement
+
+    def upsert(self, table: str, row: Dict[str, Optional[str]]):
+        if row.get(KEY) is None:
+            raise ValueError(f"Cannot store a result without {KEY} in {table}")
+        names = tuple(row)
+        self._ensure_columns(table, names)
+        statement = self._upsert_statement(table, names)
+        self.connection.execute(statement, tuple(row.values()))
+        self.pending += 1
+        if self.pending >= self.batch_size:
+            self.commit()
+
+    def commit(self):
+        self.connection.commit()
+        self.pending = 0
+
+    def close(self):
+        self.users -= 1
+        self.commit()
+        if self.users > 0:
+            return
+        self.connection.close()
+        self._opened.pop(self.path, None)
+
+
+def _tables(connection) -> List[str]:
+    rows = connection.execute("SELECT name FROM sqlite_master WHERE type = 'table'")
+    return [row[0] for row in rows]
+
+
+def database_tables(path: str) -> List[str]:
+    with closing(sqlite3.connect(path)) as connection:
+        return _tables(connection)
+
+
+def database_url_suffixes(path: str) -> Set[str]:
+    """ Collect the `URL Suffix` of every result stored in a database """
+    suffixes = set()
+    with closing(sqlite3.connect(path)) as connection:
+        for table in _tables(connection):
+            rows = connection.execute(f"SELECT {quote(KEY)} FROM {quote(table)}")
+            suffixes.update(row[0] for row in rows)
+    return suffixes
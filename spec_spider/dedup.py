@@ -0,0 +1,191 @@
+import csv
+import filecmp
+import json
+import os
+import shutil
+import sys
+import tempfile
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from spec_spider.snapshot import (
+    DATA_FOLDER,
+    MANIFEST_NAME,
+    STORE_FOLDER,
+    list_snapshots,
+)
+from spec_spider.storage import ContentStore
+
+MANIFEST_FOLDER = 'manifests'
+
+
+def canonical_row(row: Dict[str, str]) -> bytes:
+    """ Content of a row independent of the column order of its file """
+    return json.dumps(
+        row, sort_keys=True, ensure_ascii=False, separators=(',', ':')
+    ).encode('utf-8')
+
+
+def _manifest_names(folder: str) -> List[str]:
+    return sorted(
+        name[: -len('.json')] for name in os.listdir(folder) if name.endswith('.json')
+    )
+
+
+class SnapshotStore:
+    """ Snapshots of a benchmark kept as manifests of deduplicated rows
+
+    Every distinct row is stored once in `data/<benchmark>/store/rows.pack`,
+    keyed by the sha1 of its canonical content. A snapshot becomes
+    `manifests/<snapshot>.json`: per suite its csv header and the
+    (URL Suffix, digest) of its rows, in file order, from which the csv files
+    are materialized again byte for byte.
+    """
+
+    def __init__(self, benchmark: str, data_folder: str = DATA_FOLDER):
+        self.folder = os.path.join(data_folder, benchmark, STORE_FOLDER)
+        self.manifest_folder = os.path.join(self.folder, MANIFEST_FOLDER)
+        if not os.path.exists(self.manifest_folder):
+            os.makedirs(self.manifest_folder)
+        self.rows = ContentStore(self.folder, 'rows')
+
+    def manifest_path(self, snapshot: str) -> str:
+        return os.path.join(self.manifest_folder, f"{snapshot}.json")
+
+    def list_manifests(self) -> List[str]:
+        return _manifest_names(self.manifest_folder)
+
+    def read_manifest(self, snapshot: str) -> Dict:
+        with open(self.manifest_path(snapshot), encoding='utf-8') as f:
+            return json.load(f)
+
+    def put_snapshot(self, folder: str) -> Tuple[int, int]:
+        """ Store the csv files of a snapshot folder
+        :return: rows read, rows not stored before
+        """
+        manifest = {}
+        total, before = 0, len(self.rows)
+        for name in sorted(os.listdir(folder)):
+            if not name.endswith('.csv'):
+                continue
+            with open(os.path.join(folder, name), newline='', encoding='utf-8') as f:
+                reader = csv.reader(f)
+                header = next(reader, [])
+                rows = []
+                for values in reader:
+                    row = dict(zip(header, values))
+                    digest = self.rows.put(canonical_row(row))
+                    rows.append((row.get('URL Suffix', ''), digest))
+            manifest[name[: -len('.csv')]] = {'fields': header, 'rows': rows}
+            total += len(rows)
+
+        path = self.manifest_path(os.path.basename(os.path.normpath(folder)))
+        with open(f"{path}.tmp", 'w', encoding='utf-8') as f:
+            json.dump(manifest, f)
+        os.replace(f"{path}.tmp", path)
+        return total, len(self.rows) - before
+
+    def iter_rows(self, snapshot: str, suite: str):
+        """ Yield the rows of a suite of a stored snapshot, as dicts """
+        for _, digest in self.read_manifest(snapshot)[suite]['rows']:
+            yield json.loads(self.rows.get(digest))
+
+    def sorted_rows(self, snapshot: str, suite: str) -> Tuple[List[str], Iterator]:
+        """ Header and (URL Suffix, row) of a suite of a stored snapshot, sorted
+        on URL Suffix as diff.sorted_rows sorts a csv file. Only the manifest is
+        sorted, each row is read from the pack when it is reached """
+        entry = self.read_manifest(snapshot)[suite]
+        fields = entry['fields']
+        keyed = sorted(entry['rows'], key=lambda row: row[0])
+
+        def read():
+            for key, digest in keyed:
+                row = json.loads(self.rows.get(digest))
+                # back in the column order of the file
+                yield key, {field: row[field] for field in fields if field in row}
+
+        return fields, read()
+
+    def materialize(self, snapshot: str, target: str) -> List[str]:
+        """ Write the csv files of a stored snapshot into target """
+        if not os.path.exists(target):
+            os.makedirs(target)
+        paths = []
+        for suite, entry in self.read_manifest(snapshot).items():
+            path = os.path.join(target, f"{suite}.csv")
+            with open(path, 'w', newline='', encoding='utf-8') as f:
+                # same dialect as CsvItemExporter
+                writer = csv.writer(f)
+                if len(entry['fields']):
+                    writer.writerow(entry['fields'])
+                for _, digest in entry['rows']:
+                    row = json.loads(self.rows.get(digest))
+                    writer.writerow([row.get(field, '') for field in entry['fields']])
+            paths.append(path)
+        return paths
+
+    def close(self):
+        self.rows.close()
+
+
+def list_stored_snapshots(benchmark: str, data_folder: str = DATA_FOLDER) -> List[str]:
+    """ Names of the snapshots of a benchmark kept in its store, oldest first,
+    without opening the store """
+    folder = os.path.join(data_folder, benchmark, STORE_FOLDER, MANIFEST_FOLDER)
+    if not os.path.isdir(folder):
+        return []
+    return _manifest_names(folder)
+
+
+def _same_files(folder: str, materialized: str) -> bool:
+    names = [name for name in os.listdir(folder) if name.endswith('.csv')]
+    return sorted(names) == sorted(os.listdir(materialized)) and all(
+        filecmp.cmp(
+            os.path.join(folder, name), os.path.join(materialized, name), shallow=False
+        )
+        for name in names
+    )
+
+
+def store_snapshots(benchmark: str, prune: bool = False, keep_latest: bool = True):
+    """ Store every snapshot folder of a benchmark, with prune remove the folders
+    that materialize back identically, but the latest one an incremental crawl
+    appends to """
+    store = SnapshotStore(benchmark)
+    folders = list_snapshots(benchmark)
+    for folder in folders:
+        total, new = store.put_snapshot(folder)
+        print(f"{folder}: {total} rows, {new} new")
+        if not prune or (keep_latest and folder == folders[-1]):
+            continue
+        with tempfile.TemporaryDirectory() as tmp:
+            store.materialize(os.path.basename(folder), tmp)
+            if not _same_files(folder, tmp):
+                print(f"{folder}: does not materialize identically, kept")
+                continue
+        # only the csv files are stored, the manifest goes with its folder
+        if all(
+            name.endswith('.csv') or name == MANIFEST_NAME
+            for name in os.listdir(folder)
+        ):
+            shutil.rmtree(folder)
+    store.close()
+
+
+def materialize_snapshot(benchmark: str, snapshot: str, target: Optional[str] = None):
+    store = SnapshotStore(benchmark)
+    target = target or os.path.join(DATA_FOLDER, benchmark, snapshot)
+    for path in store.materialize(snapshot, target):
+        print(path)
+    store.close()
+
+
+if __name__ == '__main__':
+    # python spec_spider/dedup.py store cpu2017 [--prune]
+    # python spec_spider/dedup.py materialize cpu2017 2022_05_10_21_05_27 [target]
+    command, benchmark, *args = sys.argv[1:]
+    if command == 'store':
+        store_snapshots(benchmark, prune='--prune' in args)
+    elif command == 'materialize':
+        materialize_snapshot(benchmark, *args)
+    else:
+        raise SystemExit(f"Unknown command {command}, use store or materialize")
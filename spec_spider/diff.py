@@ -0,0 +1,223 @@
+import csv
+import functools
+import heapq
+import itertools
+import json
+import os
+import sys
+import tempfile
+from contextlib import ExitStack
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from spec_spider.database import KEY
+from spec_spider.dedup import SnapshotStore, list_stored_snapshots
+from spec_spider.snapshot import DATA_FOLDER, list_snapshots
+
+# rows sorted in memory at once, longer files are sorted in runs on disk
+RUN_SIZE = 50000
+
+Row = Tuple[str, Dict[str, str]]
+# header and rows sorted on URL Suffix
+Side = Tuple[List[str], Iterator[Row]]
+
+
+def _row_key(idx):
+    def key(values):
+        return values[idx] if len(values) > idx else ''
+
+    return key
+
+
+def _write_run(values_list, folder):
+    fd, path = tempfile.mkstemp(suffix='.csv', dir=folder)
+    with os.fdopen(fd, 'w', newline='', encoding='utf-8') as f:
+        csv.writer(f).writerows(values_list)
+    return path
+
+
+def _read_run(path, stack):
+    return csv.reader(stack.enter_context(open(path, newline='', encoding='utf-8')))
+
+
+def sorted_rows(path: str, tmp: str, run_size: int = RUN_SIZE) -> Tuple[List, Iterator]:
+    """ Header and rows of a csv file sorted on URL Suffix, in bounded memory
+
+    The file is read in runs of run_size rows, each sorted and spilled to tmp,
+    then the runs are merged lazily. Rows of equal key keep their file order.
+    """
+    f = open(path, newline='', encoding='utf-8')
+    reader = csv.reader(f)
+    header = next(reader, [])
+    if KEY not in header:
+        f.close()
+        raise ValueError(f"{path} has no {KEY} column")
+    key = _row_key(header.index(KEY))
+
+    runs = []
+    chunk = []
+    for values in reader:
+        chunk.append(values)
+        if len(chunk) >= run_size:
+            chunk.sort(key=key)
+            runs.append(_write_run(chunk, tmp))
+            chunk = []
+    f.close()
+    chunk.sort(key=key)
+
+    def merge():
+        with ExitStack() as stack:
+            readers = [_read_run(run, stack) for run in runs]
+            for values in heapq.merge(*readers, iter(chunk), key=key):
+                yield key(values), dict(zip(header, values))
+
+    return header, merge()
+
+
+def _last_per_key(rows: Iterator[Row]) -> Iterator[Row]:
+    """ A result appended twice to a snapshot counts once, the later row wins """
+    for _, group in itertools.groupby(rows, key=lambda row: row[0]):
+        *_, last = group
+        yield last
+
+
+def diff_rows(
+    old: Iterator[Row], new: Iterator[Row], fields: List[str]
+) -> Iterator[Dict]:
+    """ Merge two row streams sorted on URL Suffix into change records """
+    old, new = _last_per_key(old), _last_per_key(new)
+    old_row, new_row = next(old, None), next(new, None)
+    while old_row is not None or new_row is not None:
+        if new_row is None or (old_row is not None and old_row[0] < new_row[0]):
+            yield {'change': 'removed', KEY: old_row[0], 'row': old_row[1]}
+            old_row = next(old, None)
+        elif old_row is None or new_row[0] < old_row[0]:
+            yield {'change': 'added', KEY: new_row[0], 'row': new_row[1]}
+            new_row = next(new, None)
+        else:
+            changes = {
+                field: [old_row[1].get(field), new_row[1].get(field)]
+                for field in fields
+                if old_row[1].get(field) != new_row[1].get(field)
+            }
+            if len(changes):
+                yield {'change': 'changed', KEY: new_row[0], 'fields': changes}
+            old_row, new_row = next(old, None), next(new, None)
+
+
+def _diff_sides(old: Side, new: Side) -> Iterator[Dict]:
+    (old_header, old_rows), (new_header, new_rows) = old, new
+    fields = new_header + [field for field in old_header if field not in new_header]
+    return diff_rows(old_rows, new_rows, fields)
+
+
+def diff_files(
+    old_path: Optional[str], new_path: Optional[str], run_size: int = RUN_SIZE
+) -> Iterator[Dict]:
+    """ Changes from one csv file to the other, either may be missing """
+    with tempfile.TemporaryDirectory() as tmp:
+        old, new = ([], iter([])), ([], iter([]))
+        if old_path is not None and os.path.exists(old_path):
+            old = sorted_rows(old_path, tmp, run_size)
+        if new_path is not None and os.path.exists(new_path):
+            new = sorted_rows(new_path, tmp, run_size)
+        yield from _diff_sides(old, new)
+
+
+def diff_folders(old_folder: str, new_folder: str, run_size: int = RUN_SIZE):
+    """ Changes between the csv files of two folders, e.g. two snapshots or two
+    versions of data/clean/cpu, tagged with the file they come from """
+    names = {
+        name
+        for folder in (old_folder, new_folder)
+        for name in os.listdir(folder)
+        if name.endswith('.csv')
+    }
+    for name in sorted(names):
+        suite = name[: -len('.csv')]
+        for record in diff_files(
+            os.path.join(old_folder, name), os.path.join(new_folder, name), run_size
+        ):
+            yield {'suite': suite, **record}
+
+
+def list_benchmark_snapshots(benchmark: str) -> List[str]:
+    """ Names of the snapshots of a benchmark, in a folder or only in its store
+    since `dedup.py store --prune`, oldest first """
+    folders = [os.path.basename(folder) for folder in list_snapshots(benchmark)]
+    return sorted(set(folders) | set(list_stored_snapshots(benchmark)))
+
+
+def _suite_readers(folder: str, snapshot: str, store, tmp: str, run_size: int):
+    """ suite: function reading its Side, from the snapshot folder when it is
+    still there, else from the store """
+    if os.path.isdir(folder):
+        return {
+            name[: -len('.csv')]: functools.partial(
+                sorted_rows, os.path.join(folder, name), tmp, run_size
+            )
+            for name in os.listdir(folder)
+            if name.endswith('.csv')
+        }
+    return {
+        suite: functools.partial(store.sorted_rows, snapshot, suite)
+        for suite in store.read_manifest(snapshot)
+    }
+
+
+def diff_snapshots(benchmark: str, old: str, new: str, run_size: int = RUN_SIZE):
+    """ Changes between two snapshots of a benchmark, by name, tagged with their
+    suite; a pruned snapshot is read from the store without materializing it """
+    folders = [os.path.join(DATA_FOLDER, benchmark, name) for name in (old, new)]
+    store = None
+    if not all(os.path.isdir(folder) for folder in folders):
+        store = SnapshotStore(benchmark)
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            old_readers, new_readers = (
+                _suite_readers(folder, name, store, tmp, run_size)
+                for folder, name in zip(folders, (old, new))
+            )
+            for suite in sorted(set(old_readers) | set(new_readers)):
+                sides = [
+                    readers[suite]() if suite in readers else ([], iter([]))
+                    for readers in (old_readers, new_readers)
+                ]
+                for record in _diff_sides(*sides):
+                    yield {'suite': suite, **record}
+    finally:
+        if store is not None:
+            store.close()
+
+
+def write_diff(records, out) -> Dict[str, int]:
+    """ Write records as json lines, return the count of each change """
+    counts = {'added': 0, 'removed': 0, 'changed': 0}
+    for record in records:
+        out.write(json.dumps(record, ensure_ascii=False))
+        out.write('\n')
+        counts[record['change']] += 1
+    return counts
+
+
+if __name__ == '__main__':
+    # python spec_spider/diff.py cpu2017, the two latest snapshots of a benchmark
+    # python spec_spider/diff.py <old folder or csv> <new folder or csv>
+    args = sys.argv[1:]
+    if len(args) == 1:
+        snapshots = list_benchmark_snapshots(args[0])
+        if len(snapshots) < 2:
+            raise SystemExit(f"{args[0]} has fewer than two snapshots")
+        old, new = snapshots[-2:]
+        records = diff_snapshots(args[0], old, new)
+    else:
+        old, new = args
+        if os.path.isdir(old):
+            records = diff_folders(old, new)
+        else:
+            records = diff_files(old, new)
+    counts = write_diff(records, sys.stdout)
+    print(
+        f"{old} -> {new}: {counts['added']} added, {counts['removed']} removed, "
+        f"{counts['changed']} changed",
+        file=sys.stderr,
+    )
@@ -0,0 +1,364 @@
+import json
+import os
+import threading
+import time
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import pandas as pd
+from itemadapter import ItemAdapter
+from scrapy.exporters import BaseItemExporter, CsvItemExporter
+from scrapy.utils.serialize import ScrapyJSONEncoder
+from twisted.internet import reactor, task, threads
+from twisted.python import threadable
+
+from spec_spider.database import ResultDatabase
+from spec_spider.extractor.loader import type_columns
+from spec_spider.items import SlotItem
+
+PART_PREFIX = 'part-'
+CURSOR_SUFFIX = '.cursor'
+
+
+def import_pyarrow():
+    """ pyarrow is only needed by the parquet format """
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError:
+        raise ImportError(
+            "EXPORT_FORMAT = 'parquet' needs pyarrow, pip install pyarrow"
+        )
+    return pyarrow
+
+
+def list_parts(folder: str) -> List[str]:
+    """ Finished parquet parts of a suite folder, in writing order """
+    if not os.path.isdir(folder):
+        return []
+    return [
+        os.path.join(folder, name)
+        for name in sorted(os.listdir(folder))
+        if name.startswith(PART_PREFIX) and name.endswith('.parquet')
+    ]
+
+
+def read_parquet_fields(folder: str) -> List[str]:
+    parts = list_parts(folder)
+    if not len(parts):
+        return []
+    pa = import_pyarrow()
+    return pa.parquet.read_schema(parts[0]).names
+
+
+def _wider_type(pa, left, right):
+    """ Arrow type holding the values of both, integers < floats < strings """
+    if left is None or left == right:
+        return right
+    for is_type in (pa.types.is_string, pa.types.is_floating):
+        if is_type(left) or is_type(right):
+            return left if is_type(left) else right
+    # int64 and the uint64 of numbers over 2**63
+    return pa.float64()
+
+
+def read_parquet_table(folder: str):
+    """ The parts of a suite folder as one table. Every part is typed on its
+    own rows, a column of numbers in some parts and text in others is read as
+    text, as pd.read_csv would read it """
+    pa = import_pyarrow()
+    tables = [pa.parquet.read_table(part) for part in list_parts(folder)]
+    if not len(tables):
+        return pa.table({})
+    types = {}
+    for table in tables:
+        for field in table.schema:
+            types[field.name] = _wider_type(pa, types.get(field.name), field.type)
+    schema = pa.schema(list(types.items()))
+    return pa.concat_tables([table.cast(schema) for table in tables])
+
+
+def read_parquet_column(folder: str, name: str) -> List:
+    pa = import_pyarrow()
+    values = []
+    for part in list_parts(folder):
+        if name in pa.parquet.read_schema(part).names:
+            values.extend(pa.parquet.read_table(part, columns=[name])[name].to_pylist())
+    return values
+
+
+class SlotCsvItemExporter(CsvItemExporter):
+    """ CsvItemExporter reading SlotItem values by position
+
+    The position of every exported field in the values of an item class is
+    computed once, so a row is built without going through ItemAdapter.
+    Other items are exported as usual.
+    """
+
+    def __init__(self, file, **kwargs):
+        super().__init__(file, **kwargs)
+        self.positions = {}
+
+    def _get_positions(self, item_class):
+        positions = self.positions.get(item_class)
+        if positions is None:
+            positions = [item_class.index.get(name) for name in self.fields_to_export]
+            self.positions[item_class] = positions
+        return positions
+
+    def export_item(self, item):
+        if not isinstance(item, SlotItem) or self._headers_not_written:
+            return super().export_item(item)
+        values = item.values
+        row = [
+            '' if idx is None or values[idx] is None else values[idx]
+            for idx in self._get_positions(type(item))
+        ]
+        self.csv_writer.writerow(
+            list(self._build_row(self._join_if_needed(value) for value in row))
+        )
+
+
+class ParquetItemExporter(BaseItemExporter):
+    """ Items of a suite as a folder of parquet parts, e.g. `CINT2017_rate.parquet/`
+
+    Items are buffered and every batch_size of them is written as a complete
+    part, so the folder stays readable after a crash. Columns are the fields
+    of the first item, or of the parts already in the folder, as for the csv
+    files, unless fields_to_export is given for a new folder. A column is
+    written as int64 or float64 when pd.read_csv would read the text of the
+    batch as numbers, else as strings; NA strings are written as nulls.
+    """
+
+    def __init__(self, folder, batch_size=1000, **kwargs):
+        super().__init__(dont_fail=True, **kwargs)
+        self.pa = import_pyarrow()
+        self.folder = folder
+        self.batch_size = batch_size
+        self.rows = []
+        if not os.path.exists(folder):
+            os.makedirs(folder)
+        self.part = len(list_parts(folder))
+        if self.part:
+            self.fields_to_export = read_parquet_fields(folder)
+
+    def export_item(self, item):
+        if self.fields_to_export is None:
+            self.fields_to_export = ItemAdapter(item).field_names()
+        self.rows.append(dict(self._get_serialized_fields(item, default_value=None)))
+        if len(self.rows) >= self.batch_size:
+            self.flush()
+
+    def serialize_field(self, field, name, value):
+        value = super().serialize_field(field, name, value)
+        return value if value is None else str(value)
+
+    def flush(self):
+        if not len(self.rows):
+            return
+        df = type_columns(
+            pd.DataFrame(
+                {
+                    name: [row.get(name) for row in self.rows]
+                    for name in self.fields_to_export
+                },
+                dtype=object,
+            )
+        )
+        arrays = []
+        for name in self.fields_to_export:
+            column = df[name]
+            if pd.api.types.is_numeric_dtype(column):
+                kind = self.pa.from_numpy_dtype(column.dtype)
+            else:
+                kind = self.pa.string()
+            arrays.append(self.pa.array(column, type=kind, from_pandas=True))
+        table = self.pa.Table.from_arrays(arrays, names=list(self.fields_to_export))
+        path = os.path.join(self.folder, f"{PART_PREFIX}{self.part:05d}.parquet")
+        self.pa.parquet.write_table(table, f"{path}.tmp", compression='zstd')
+        os.replace(f"{path}.tmp", path)
+        self.part += 1
+        self.rows = []
+
+    def finish_exporting(self):
+        self.flush()
+
+
+class SqliteItemExporter(BaseItemExporter):
+    """ Upsert the items of a suite into its table of a ResultDatabase """
+
+    def __init__(self, path, table, batch_size=1000, **kwargs):
+        super().__init__(dont_fail=True, **kwargs)
+        self.database = ResultDatabase.open(path, batch_size)
+        self.table = table
+
+    def export_item(self, item):
+        self.database.upsert(self.table, dict(self._get_serialized_fields(item)))
+
+    def serialize_field(self, field, name, value):
+        value = super().serialize_field(field, name, value)
+        return value if value is None else str(value)
+
+    def finish_exporting(self):
+        self.database.close()
+
+
+def cursor_path(path: str) -> str:
+    return f"{path}{CURSOR_SUFFIX}"
+
+
+def _scan_lines(path: str) -> Tuple[int, int]:
+    """ Offset after the last complete line of a file, and the lines before it """
+    offset, rows = 0, 0
+    with open(path, 'rb') as f:
+        for line in f:
+            if not line.endswith(b'\n'):
+                break
+            offset += len(line)
+            rows += 1
+    return offset, rows
+
+
+def read_cursor(path: str) -> Dict:
+    """ Progress of a json lines file: the byte offset and the number of its
+    durable records, and whether its exporter is closed """
+    if not os.path.exists(path):
+        return {'offset': 0, 'rows': 0, 'closed': False}
+    if os.path.exists(cursor_path(path)):
+        with open(cursor_path(path), encoding='utf-8') as f:
+            cursor = json.load(f)
+        if os.path.getsize(path) >= cursor['offset']:
+            return cursor
+    # no cursor, or one ahead of its file: trust the complete lines only
+    offset, rows = _scan_lines(path)
+    return {'offset': offset, 'rows': rows, 'closed': False}
+
+
+def iter_jsonl_records(
+    path: str, start: int = 0, end: Optional[int] = None
+) -> Iterator[Dict]:
+    """ Records of a json lines file between two offsets, by default up to its
+    cursor, so a file being written is read as of its last batch """
+    if end is None:
+        end = read_cursor(path)['offset']
+    with open(path, 'rb') as f:
+        f.seek(start)
+        while f.tell() < end:
+            yield json.loads(f.readline())
+
+
+def follow_jsonl(path: str, interval: float = 1.0) -> Iterator[Dict]:
+    """ Yield the records of a json lines file as its batches land, until its
+    exporter is closed, e.g. from a downstream job started with the crawl """
+    offset = 0
+    while True:
+        cursor = read_cursor(path)
+        yield from iter_jsonl_records(path, offset, cursor['offset'])
+        offset = cursor['offset']
+        if cursor['closed']:
+            return
+        time.sleep(interval)
+
+
+def read_jsonl_column(path: str, name: str) -> List[str]:
+    return [record.get(name) for record in iter_jsonl_records(path)]
+
+
+class JsonLinesBatchExporter(BaseItemExporter):
+    """ Items of a suite as json lines, `CINT2017_rate.jsonl`, readable while
+    the crawl runs
+
+    Items are appended in batches of batch_size, or once flush_interval seconds
+    have passed, each one fsynced before `CINT2017_rate.jsonl.cursor` moves past
+    it. Once started, a reactor timer also flushes every flush_interval seconds,
+    off the reactor thread, a batch no new item comes to. The cursor holds
+    the offset and count of the durable records, a reader stops at the offset
+    and never sees a partial line. A crash loses the batch being written at
+    most: the file is cut back to the cursor when reopened.
+    """
+
+    def __init__(self, path, batch_size=1000, flush_interval=5.0, **kwargs):
+        super().__init__(dont_fail=True, **kwargs)
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.encoder = ScrapyJSONEncoder(ensure_ascii=False)
+        self.lines = []
+        # items come from the writer thread with EXPORT_THREAD, the timer
+        # flushes from the thread pool
+        self.lock = threading.Lock()
+        self.timer = None
+        cursor = read_cursor(path)
+        self.offset, self.rows = cursor['offset'], cursor['rows']
+        self.file = open(path, 'ab')
+        self.file.truncate(self.offset)
+        self._write_cursor(closed=False)
+        self.flushed_at = time.monotonic()
+
+    def start_exporting(self):
+        self.timer = task.LoopingCall(self._flush_late)
+        self.timer.start(self.flush_interval, now=False)
+
+    def _flush_late(self):
+        if len(self.lines):
+            # the next tick waits for this flush
+            return threads.deferToThread(self.flush)
+        return None
+
+    def export_item(self, item):
+        record = dict(self._get_serialized_fields(item))
+        line = f"{self.encoder.encode(record)}\n".encode('utf-8')
+        with self.lock:
+            self.lines.append(line)
+            if (
+                len(self.lines) >= self.batch_size
+                or time.monotonic() - self.flushed_at >= self.flush_interval
+            ):
+                self._write_batch()
+
+    def flush(self):
+        with self.lock:
+            self._write_batch()
+
+    def _write_batch(self):
+        self.flushed_at = time.monotonic()
+        # a late timer tick after finish_exporting
+        if not len(self.lines) or self.file.closed:
+            return
+        data = b''.join(self.lines)
+        self.file.write(data)
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        self.offset += len(data)
+        self.rows += len(self.lines)
+        self.lines = []
+        self._write_cursor(closed=False)
+
+    def _write_cursor(self, closed):
+        path = cursor_path(self.path)
+        with open(f"{path}.tmp", 'w', encoding='utf-8') as f:
+            json.dump(
+                {
+                    'offset': self.offset,
+                    'rows': self.rows,
+                    'closed': closed,
+                    'updated': time.time(),
+                },
+                f,
+            )
+        os.replace(f"{path}.tmp", path)
+
+    def _stop_timer(self):
+        if self.timer.running:
+            self.timer.stop()
+
+    def finish_exporting(self):
+        if self.timer is not None:
+            # the pipeline finishes the exporters on a thread with EXPORT_THREAD
+            if threadable.isInIOThread():
+                self._stop_timer()
+            else:
+                reactor.callFromThread(self._stop_timer)
+        with self.lock:
+            self._write_batch()
+            self.file.close()
+            self._write_cursor(closed=True)
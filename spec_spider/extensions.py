@@ -0,0 +1,322 @@
+# Define here the extensions of your project
+#
+# See documentation in:
+# https://docs.scrapy.org/en/latest/topics/extensions.html
+import json
+import os
+import shutil
+import time
+
+from scrapy import signals
+from scrapy.exceptions import NotConfigured
+from scrapy.utils.job import job_dir
+from twisted.internet import task
+
+from spec_spider.middlewares import SharedSlotMiddleware
+
+
+class HostThrottle:
+    """ Observed latency and errors of one host, and the delay and concurrency
+    chosen for it """
+
+    def __init__(self, delay, concurrency):
+        self.delay = delay
+        self.concurrency = concurrency
+        self.latency = None
+        self.baseline = None
+        self.streak = 0
+        self.responses = 0
+        self.errors = 0
+        self.started = time.monotonic()
+
+
+class AdaptiveThrottle:
+    """ Latency and error driven throttle tuned for spec.org
+
+    Starting from DOWNLOAD_DELAY and ADAPTIVE_THROTTLE_START_CONCURRENCY, the
+    concurrency of a host grows by one every RAISE_AFTER responses, up to
+    ADAPTIVE_THROTTLE_MAX_CONCURRENCY, while its latency stays within the
+    tolerance of the best latency seen, and the delay follows latency /
+    concurrency. A slower latency takes one off the concurrency, a 429 or 5xx
+    response halves it and doubles the delay, honouring Retry-After.
+
+    When the crawlers of a process share SHARED_DOWNLOAD_DELAY (crawl.py), they
+    share the state of each host too, starting from that delay: every response
+    adapts it, and the delay drives the gate of SharedSlotMiddleware instead
+    of the downloader slots, which then have none.
+    """
+
+    RAISE_AFTER = 20
+    EWMA_ALPHA = 0.2
+    # host -> HostThrottle, of every crawler sharing the download delay
+    shared_hosts = {}
+
+    def __init__(self, crawler):
+        settings = crawler.settings
+        if not settings.getbool('ADAPTIVE_THROTTLE_ENABLED'):
+            raise NotConfigured
+
+        self.crawler = crawler
+        self.debug = settings.getbool('ADAPTIVE_THROTTLE_DEBUG')
+        self.mindelay = settings.getfloat('ADAPTIVE_THROTTLE_MIN_DELAY')
+        self.maxdelay = settings.getfloat('ADAPTIVE_THROTTLE_MAX_DELAY')
+        self.max_concurrency = settings.getint('ADAPTIVE_THROTTLE_MAX_CONCURRENCY')
+        self.tolerance = settings.getfloat('ADAPTIVE_THROTTLE_LATENCY_TOLERANCE')
+        self.shared = settings.getfloat('SHARED_DOWNLOAD_DELAY') > 0
+        delay = settings.getfloat(
+            'SHARED_DOWNLOAD_DELAY' if self.shared else 'DOWNLOAD_DELAY'
+        )
+        self.start_delay = max(self.mindelay, delay)
+        self.start_concurrency = min(
+            self.max_concurrency,
+            max(1, settings.getint('ADAPTIVE_THROTTLE_START_CONCURRENCY', 1)),
+        )
+        self.hosts = self.shared_hosts if self.shared else {}
+
+        crawler.signals.connect(self._spider_opened, signal=signals.spider_opened)
+        crawler.signals.connect(
+            self._response_downloaded, signal=signals.response_downloaded
+        )
+        crawler.signals.connect(self._spider_closed, signal=signals.spider_closed)
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        return cls(crawler)
+
+    def _spider_opened(self, spider):
+        # read by the downloader when it makes the slot of a host
+        spider.download_delay = 0 if self.shared else self.start_delay
+        spider.max_concurrent_requests = self.start_concurrency
+
+    def _response_downloaded(self, response, request, spider):
+        key = request.meta.get('download_slot')
+        slot = self.crawler.engine.downloader.slots.get(key)
+        latency = request.meta.get('download_latency')
+        if slot is None or latency is None:
+            return
+
+        host = self.hosts.get(key)
+        if host is None:
+            host = self.hosts[key] = HostThrottle(
+                self.start_delay, self.start_concurrency
+            )
+        host.responses += 1
+        if response.status == 429 or response.status >= 500:
+            host.errors += 1
+            self._back_off(host, response)
+        else:
+            self._adapt(host, latency)
+
+        slot.concurrency = host.concurrency
+        if self.shared:
+            SharedSlotMiddleware.delays[key] = host.delay
+        else:
+            slot.delay = host.delay
+
+        if self.debug:
+            spider.logger.info(
+                f"{key}: delay {host.delay:.2f}s, concurrency {host.concurrency}, "
+                f"latency {latency:.2f}s, status {response.status}"
+            )
+
+    def _adapt(self, host, latency):
+        if host.latency is None:
+            host.latency = latency
+            host.baseline = latency
+        host.latency += self.EWMA_ALPHA * (latency - host.latency)
+        # let the baseline creep up so a lasting slowdown is accepted
+        host.baseline = min(host.latency, host.baseline * 1.01)
+
+        if host.latency <= host.baseline * self.tolerance:
+            host.streak += 1
+            if host.streak >= self.RAISE_AFTER:
+                host.streak = 0
+                host.concurrency = min(self.max_concurrency, host.concurrency + 1)
+        else:
+            host.streak = 0
+            host.concurrency = max(1, host.concurrency - 1)
+
+        target = host.latency / host.concurrency
+        host.delay = self._clamp((host.delay + target) / 2)
+
+    def _back_off(self, host, response):
+        host.streak = 0
+        host.concurrency = max(1, host.concurrency // 2)
+        delay = max(host.delay * 2, self.start_delay)
+        retry_after = response.headers.get('Retry-After', b'').decode('latin-1')
+        if retry_after.isdigit():
+            delay = max(delay, float(retry_after))
+        host.delay = self._clamp(delay)
+
+    def _clamp(self, delay):
+        return min(self.maxdelay, max(self.mindelay, delay))
+
+    def _spider_closed(self, spider):
+        stats = self.crawler.stats
+        for key, host in self.hosts.items():
+            elapsed = max(time.monotonic() - host.started, 1e-6)
+            rate = host.responses / elapsed
+            if host.latency:
+                # with a shared delay, the rate of the host across the crawlers
+                converged = min(
+                    1 / max(host.delay, 1e-6), host.concurrency / host.latency
+                )
+                spider.logger.info(
+                    f"{key}: {rate:.2f} req/s on average, converged to "
+                    f"{converged:.2f} req/s (delay {host.delay:.2f}s, concurrency "
+                    f"{host.concurrency}, latency {host.latency:.2f}s), "
+                    f"{host.errors} errors in {host.responses} responses"
+                )
+                stats.set_value(f"adaptive_throttle/{key}/converged_rate", converged)
+            stats.set_value(f"adaptive_throttle/{key}/rate", rate)
+            stats.set_value(f"adaptive_throttle/{key}/errors", host.errors)
+
+
+class CrawlFrontier:
+    """ Resumable crawls in JOBDIR
+
+    Scrapy keeps the pending requests, with their cb_kwargs, in disk queues
+    under JOBDIR and the pipelines append every item to the snapshot bound to
+    it, so a stopped crawl resumes into the same snapshot. After a crash the
+    queue state is lost: the frontier is then rebuilt from the index pages,
+    skipping the results already checkpointed in the snapshot. Once a crawl
+    finishes, the next one in the same JOBDIR starts afresh.
+    """
+
+    def __init__(self, jobdir):
+        self.jobdir = jobdir
+        self.running_path = os.path.join(jobdir, 'running')
+        self.finished_path = os.path.join(jobdir, 'finished')
+
+        if os.path.exists(self.finished_path):
+            self._clear()
+        elif os.path.exists(self.running_path):
+            self._remove('requests.seen')
+            self._remove('requests.queue')
+        open(self.running_path, 'w').close()
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        jobdir = job_dir(crawler.settings)
+        if not jobdir:
+            raise NotConfigured
+        ext = cls(jobdir)
+        crawler.signals.connect(ext.spider_closed, signal=signals.spider_closed)
+        return ext
+
+    def _remove(self, name):
+        path = os.path.join(self.jobdir, name)
+        if os.path.isdir(path):
+            shutil.rmtree(path)
+        elif os.path.exists(path):
+            os.remove(path)
+
+    def _clear(self):
+        for name in os.listdir(self.jobdir):
+            self._remove(name)
+
+    def spider_closed(self, spider, reason):
+        if os.path.exists(self.running_path):
+            os.remove(self.running_path)
+        if reason == 'finished':
+            open(self.finished_path, 'w').close()
+        else:
+            spider.logger.info(
+                f"Crawl stopped ({reason}), resume it from {self.jobdir}"
+            )
+
+
+class CrawlProgress:
+    """ Structured progress of a crawl, sampled every PROGRESS_INTERVAL seconds
+
+    Items are only counted, per suite, as they are scraped. Each summary is
+    one json line with the items per second since the previous summary and
+    overall, the requests left in the scheduler or downloading, the time they
+    should take at the current response rate, and the errors so far.
+    """
+
+    def __init__(self, crawler, interval):
+        self.crawler = crawler
+        self.interval = interval
+        self.counts = {}
+        self.errors = {'spider': 0, 'item': 0}
+        self.responses = 0
+        self.started = time.monotonic()
+        # time, items and responses of the previous summary
+        self.last = (self.started, 0, 0)
+        self.task = None
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        interval = crawler.settings.getfloat('PROGRESS_INTERVAL')
+        if interval <= 0:
+            raise NotConfigured
+        ext = cls(crawler, interval)
+        crawler.signals.connect(ext.spider_opened, signal=signals.spider_opened)
+        crawler.signals.connect(ext.spider_closed, signal=signals.spider_closed)
+        crawler.signals.connect(ext.item_scraped, signal=signals.item_scraped)
+        crawler.signals.connect(ext.item_error, signal=signals.item_error)
+        crawler.signals.connect(ext.spider_error, signal=signals.spider_error)
+        crawler.signals.connect(
+            ext.response_received, signal=signals.response_received
+        )
+        return ext
+
+    def spider_opened(self, spider):
+        self.started = time.monotonic()
+        self.last = (self.started, 0, 0)
+        self.task = task.LoopingCall(self.log_summary, spider)
+        self.task.start(self.interval, now=False)
+
+    def item_scraped(self, item, spider):
+        suite = item.get('Suite') or spider.name
+        self.counts[suite] = self.counts.get(suite, 0) + 1
+
+    def item_error(self, item, response, spider, failure):
+        self.errors['item'] += 1
+
+    def spider_error(self, failure, response, spider):
+        self.errors['spider'] += 1
+
+    def response_received(self, response, request, spider):
+        self.responses += 1
+
+    def _pending_requests(self):
+        engine = self.crawler.engine
+        slot = getattr(engine, 'slot', None)
+        if slot is None:
+            return None
+        return len(slot.scheduler) + len(engine.downloader.active)
+
+    def summary(self):
+        now = time.monotonic()
+        items = sum(self.counts.values())
+        since, last_items, last_responses = self.last
+        self.last = (now, items, self.responses)
+        elapsed = max(now - since, 1e-6)
+        response_rate = (self.responses - last_responses) / elapsed
+        pending = self._pending_requests()
+        eta = None
+        if pending is not None and response_rate > 0:
+            eta = round(pending / response_rate)
+        downloads = self.crawler.stats.get_value('downloader/exception_count', 0)
+        return {
+            'items': items,
+            'suites': dict(self.counts),
+            'items_per_sec': round((items - last_items) / elapsed, 2),
+            'avg_items_per_sec': round(items / max(now - self.started, 1e-6), 2),
+            'responses_per_sec': round(response_rate, 2),
+            'pending_requests': pending,
+            'eta_sec': eta,
+            'errors': {**self.errors, 'download': downloads},
+        }
+
+    def log_summary(self, spider, **extra):
+        spider.logger.info('Progress %s', json.dumps({**self.summary(), **extra}))
+
+    def spider_closed(self, spider, reason):
+        if self.task is not None and self.task.running:
+            self.task.stop()
+        self.log_summary(spider, finish_reason=reason)
+        for suite, count in self.counts.items():
+            self.crawler.stats.set_value(f"progress/items/{suite}", count)
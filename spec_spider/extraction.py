@@ -0,0 +1,107 @@
+import re
+from typing import Dict, List, Optional
+
+from lxml import etree
+from parsel.csstranslator import HTMLTranslator
+from scrapy.selector import Selector, SelectorList
+
+_translator = HTMLTranslator()
+
+
+class PlanField:
+    """ One css query of an ExtractionPlan
+
+    A query whose first compound selector has an id or a class is anchored:
+    it is evaluated only below the elements carrying that id or class, which
+    ExtractionPlan collects for all its fields in a single walk of the page.
+    Other queries are evaluated from the root of the page.
+    """
+
+    def __init__(self, name: str, css: str):
+        self.name = name
+        self.css = css
+        anchor, _, rest = css.partition(' ')
+        bare_anchor = anchor.split('::')[0]
+        anchor_id = re.findall(r'#([\w-]+)', bare_anchor)
+        anchor_classes = re.findall(r'\.([\w-]+)', bare_anchor)
+
+        self.anchor_id: Optional[str] = anchor_id[0] if len(anchor_id) else None
+        self.anchor_class: Optional[str] = None
+        if self.anchor_id is None and len(anchor_classes):
+            self.anchor_class = anchor_classes[-1]
+        # key of the anchor candidates collected by ExtractionPlan
+        self.anchor_key: Optional[str] = self.anchor_id
+        if self.anchor_class is not None:
+            self.anchor_key = f".{self.anchor_class}"
+
+        if self.is_anchored:
+            self.nested = len(rest) > 0
+            self.match = etree.XPath(_translator.css_to_xpath(bare_anchor, 'self::'))
+            self.xpath = _translator.css_to_xpath(css, 'self::')
+        else:
+            self.xpath = _translator.css_to_xpath(css)
+
+    @property
+    def is_anchored(self) -> bool:
+        return self.anchor_id is not None or self.anchor_class is not None
+
+    def select(self, response, candidates: List) -> SelectorList:
+        if not self.is_anchored:
+            return response.xpath(self.xpath)
+
+        results = SelectorList()
+        last = None
+        for el in candidates:
+            if not self.match(el):
+                continue
+            # results below a nested anchor already came with its ancestor
+            if self.nested and last is not None and _is_inside(el, last):
+                continue
+            last = el
+            results.extend(Selector(root=el, type='html').xpath(self.xpath))
+        return results
+
+
+def _is_inside(el, ancestor) -> bool:
+    return any(parent is ancestor for parent in el.iterancestors())
+
+
+class ExtractionPlan:
+    """ Named css queries of a detail page, compiled once per spider
+
+    `extract` gives the same SelectorLists as calling `response.css` for every
+    query, but walks the lxml tree once to find the anchors of all the queries
+    instead of once per query. `extract_css` is that per-query baseline.
+    """
+
+    def __init__(self, queries: Dict[str, str]):
+        self.queries = queries
+        self.fields = [PlanField(name, css) for name, css in queries.items()]
+        self.ids = {f.anchor_id for f in self.fields if f.anchor_id is not None}
+        self.classes = {
+            f.anchor_class for f in self.fields if f.anchor_class is not None
+        }
+
+    def _collect_anchors(self, root) -> Dict[str, List]:
+        anchors = {f.anchor_key: [] for f in self.fields if f.is_anchored}
+        # a walk in Python: an XPath of the id and class tests, or of the @id and
+        # @class attributes, is slower in libxml2 than creating every element
+        for el in root.iter(etree.Element):
+            el_id = el.get('id')
+            if el_id in self.ids:
+                anchors[el_id].append(el)
+            el_class = el.get('class')
+            if el_class:
+                for name in set(el_class.split()) & self.classes:
+                    anchors[f".{name}"].append(el)
+        return anchors
+
+    def extract(self, response) -> Dict[str, SelectorList]:
+        anchors = self._collect_anchors(response.selector.root)
+        return {
+            field.name: field.select(response, anchors.get(field.anchor_key, []))
+            for field in self.fields
+        }
+
+    def extract_css(self, response) -> Dict[str, SelectorList]:
+        return {name: response.css(css) for name, css in self.queries.items()}
@@ -1,23 +1,18 @@
 import os
-from typing import Dict, List, Optional
+import sys
+from typing import Dict, List, Optional, Tuple
 
 import pandas as pd
 
+from spec_spider.extractor import vectorized as vec
+from spec_spider.extractor.loader import read_result, submit_years_arg
+from spec_spider.extractor.memo import apply_unique, open_store
 from spec_spider.utils import (
     clean_date_1,
     clean_vendor,
-    get_chips,
     get_cpu_vendor,
     get_full_url,
-    get_memory_number,
-    get_submit_quarter,
-    get_submit_year,
-    get_threads_per_core,
-    get_total_cores,
-    get_total_memory_amount,
     parse_cpu_char,
-    parse_cpu_orderable,
-    parse_storage,
     parse_system_name,
 )
 
@@ -30,16 +25,17 @@ class CpuExtractor:
         sfp_file: str,
         rint_file: str,
         sint_file: str,
+        submit_years: Optional[Tuple[int, int]] = None,
     ):
         rfp_path: str = os.path.join(data_folder, rfp_file)
         sfp_path: str = os.path.join(data_folder, sfp_file)
         rint_path: str = os.path.join(data_folder, rint_file)
         sint_path: str = os.path.join(data_folder, sint_file)
 
-        self.rfp: pd.DataFrame = pd.read_csv(rfp_path)
-        self.sfp: pd.DataFrame = pd.read_csv(sfp_path)
-        self.rint: pd.DataFrame = pd.read_csv(rint_path)
-        self.sint: pd.DataFrame = pd.read_csv(sint_path)
+        self.rfp: pd.DataFrame = read_result(rfp_path, submit_years)
+        self.sfp: pd.DataFrame = read_result(sfp_path, submit_years)
+        self.rint: pd.DataFrame = read_result(rint_path, submit_years)
+        self.sint: pd.DataFrame = read_result(sint_path, submit_years)
 
         self.df: Optional[pd.DataFrame] = None
 
@@ -62,70 +58,66 @@ class CpuExtractor:
         self.df = self.df[self.df['Result'] != 'NC'].reset_index(drop=True)
 
     def _clean_vendor(self):
-        self.df['HW Vendor'] = self.df['HW Vendor'].apply(lambda x: clean_vendor(x))
+        self.df['HW Vendor'] = apply_unique(self.df['HW Vendor'], clean_vendor)
 
     def _parse_system_name(self):
-        self.df['System Series'] = self.df['System Name'].apply(
-            lambda x: parse_system_name(x)
+        self.df['System Series'] = apply_unique(
+            self.df['System Name'], parse_system_name
         )
 
     def _get_cpu_vendor(self):
-        self.df['CPU Vendor'] = self.df['CPU Name'].apply(lambda x: get_cpu_vendor(x))
+        self.df['CPU Vendor'] = apply_unique(self.df['CPU Name'], get_cpu_vendor)
 
     def _get_cpu_ghz(self):
         self.df['CPU GHz'] = self.df['CPU MHz'].apply(lambda x: round(x / 1000, 2))
 
     def _parse_cpu_orderable(self):
-        self.df['Max Chips'] = self.df['CPU Orderable'].apply(
-            lambda x: parse_cpu_orderable(x)
-        )
-
-    def _get_total_cores(self):
-        self.df['Total Cores'] = self.df['CPU Enabled'].apply(
-            lambda x: get_total_cores(x)
-        )
-
-    def _get_chips(self):
-        self.df['Chips'] = self.df['CPU Enabled'].apply(lambda x: get_chips(x))
-
-    def _get_threads_per_core(self):
-        self.df['Threads Per Core'] = self.df['CPU Enabled'].apply(
-            lambda x: get_threads_per_core(x)
-        )
-
-    def _get_cores_per_chip(self):
-        self.df['Cores Per Chip'] = self.df.apply(
-            lambda item: item['Total Cores'] // item['Chips'], axis=1
-        )
+        self.df['Max Chips'] = vec.parse_cpu_orderable(self.df['CPU Orderable'])
+
+    def _parse_cpu_enabled(self):
+        topology = vec.parse_cpu_enabled(self.df['CPU Enabled'])
+        malformed = topology.isna().any(axis=1)
+        if malformed.any():
+            print(
+                f"Drop {malformed.sum()} results of unknown CPU Enabled: "
+                f"{sorted(self.df.loc[malformed, 'CPU Enabled'].map(str).unique())}"
+            )
+            self.df = self.df[~malformed].reset_index(drop=True)
+            topology = topology[~malformed].reset_index(drop=True)
+        for column in vec.TOPOLOGY_COLUMNS:
+            self.df[column] = topology[column].astype('int64')
 
     def _parse_file_system(self):
-        self.df['File System'] = self.df['File System'].apply(lambda x: x.lower())
-
-    def _get_total_memory_amount(self):
-        self.df['Memory Amount'] = self.df['Memory'].apply(
-            lambda x: get_total_memory_amount(x)
-        )
-
-    def _get_memory_number(self):
-        self.df['Memory Number'] = self.df['Memory'].apply(
-            lambda x: get_memory_number(x)
-        )
+        self.df['File System'] = vec.lower(self.df['File System'])
+
+    def _parse_memory(self):
+        memory = vec.parse_memory(self.df['Memory'])
+        unread = memory['Memory Amount'].isna()
+        if unread.any():
+            print(
+                f"Drop {unread.sum()} results of unknown Memory: "
+                f"{sorted(self.df.loc[unread, 'Memory'].map(str).unique())}"
+            )
+            self.df = self.df[~unread].reset_index(drop=True)
+            memory = memory[~unread].reset_index(drop=True)
+        for column in vec.MEMORY_COLUMNS:
+            self.df[column] = memory[column]
+        # plain numbers as before
+        for column in ['Memory Amount', 'Memory Number']:
+            self.df[column] = memory[column].astype('int64')
 
     def _parse_storage(self):
-        self.df['Storage Type'] = self.df['Storage'].apply(lambda x: parse_storage(x))
+        self.df['Storage Type'] = vec.parse_storage(self.df['Storage'])
 
     def _get_submit_quarter(self):
-        self.df['Submit Quarter'] = self.df['URL Suffix'].apply(
-            lambda x: get_submit_quarter(x)
-        )
+        self.df['Submit Quarter'] = vec.get_submit_quarter(self.df['URL Suffix'])
 
     def _get_submit_year(self):
-        self.df['Submit Year'] = self.df['URL Suffix'].apply(
-            lambda x: get_submit_year(x)
-        )
+        self.df['Submit Year'] = vec.get_submit_year(self.df['URL Suffix'])
 
     def _get_full_url(self):
-        self.df['Full URL'] = self.df['URL Suffix'].apply(lambda x: get_full_url(x))
+        # one new string per result, the string methods of pandas are no faster
+        self.df['Full URL'] = self.df['URL Suffix'].apply(get_full_url)
 
     def _to_csv(self, filename):
         target_folder = './data/clean/cpu'
@@ -134,13 +126,13 @@ class CpuExtractor:
         self.df.to_csv(os.path.join(target_folder, filename), index=False)
     
     def _clean_test_date(self):
-        self.df['Test Date'] = self.df['Test Date'].apply(lambda x: clean_date_1(x))
+        self.df['Test Date'] = apply_unique(self.df['Test Date'], clean_date_1)
     
     def _clean_hw_avail(self):
-        self.df['HW Avail'] = self.df['HW Avail'].apply(lambda x: clean_date_1(x))
+        self.df['HW Avail'] = apply_unique(self.df['HW Avail'], clean_date_1)
     
     def _format_result(self):
-        self.df['Result'] = self.df['Result'].apply(lambda x: float(x))
+        self.df['Result'] = self.df['Result'].astype(float)
 
 
 class Cpu2017Extrator(CpuExtractor):
@@ -151,8 +143,11 @@ class Cpu2017Extrator(CpuExtractor):
         sfp_file: str,
         rint_file: str,
         sint_file: str,
+        submit_years: Optional[Tuple[int, int]] = None,
     ):
-        super().__init__(data_folder, rfp_file, sfp_file, rint_file, sint_file)
+        super().__init__(
+            data_folder, rfp_file, sfp_file, rint_file, sint_file, submit_years
+        )
 
     def run(self, used_columns, rename_dict):
         self._extract_columns(used_columns)
@@ -165,13 +160,9 @@ class Cpu2017Extrator(CpuExtractor):
         self._get_cpu_ghz()
         self._get_max_ghz()
         self._parse_cpu_orderable()
-        self._get_total_cores()
-        self._get_chips()
-        self._get_threads_per_core()
-        self._get_cores_per_chip()
+        self._parse_cpu_enabled()
         self._parse_file_system()
-        self._get_total_memory_amount()
-        self._get_memory_number()
+        self._parse_memory()
         self._parse_storage()
         self._get_submit_quarter()
         self._get_submit_year()
@@ -200,6 +191,10 @@ class Cpu2017Extrator(CpuExtractor):
             'Memory',
             'Memory Number',
             'Memory Amount',
+            'Memory GB',
+            'DIMM Size',
+            'Memory Type',
+            'Memory Speed',
             'Storage Type',
             'Storage',
             'OS',
@@ -231,8 +226,11 @@ class Cpu2006Extrator(CpuExtractor):
         sfp_file: str,
         rint_file: str,
         sint_file: str,
+        submit_years: Optional[Tuple[int, int]] = None,
     ):
-        super().__init__(data_folder, rfp_file, sfp_file, rint_file, sint_file)
+        super().__init__(
+            data_folder, rfp_file, sfp_file, rint_file, sint_file, submit_years
+        )
 
     def run(self, used_columns, rename_dict):
         self._extract_columns(used_columns)
@@ -245,13 +243,9 @@ class Cpu2006Extrator(CpuExtractor):
         self._get_cpu_ghz()
         self._get_max_ghz()
         self._parse_cpu_orderable()
-        self._get_total_cores()
-        self._get_chips()
-        self._get_threads_per_core()
-        self._get_cores_per_chip()
+        self._parse_cpu_enabled()
         self._parse_file_system()
-        self._get_total_memory_amount()
-        self._get_memory_number()
+        self._parse_memory()
         self._parse_storage()
         self._get_submit_quarter()
         self._get_submit_year()
@@ -279,6 +273,10 @@ class Cpu2006Extrator(CpuExtractor):
             'Memory',
             'Memory Amount',
             'Memory Number',
+            'Memory GB',
+            'DIMM Size',
+            'Memory Type',
+            'Memory Speed',
             'Storage Type',
             'Storage',
             'OS',
@@ -302,15 +300,15 @@ class Cpu2006Extrator(CpuExtractor):
         print(self.df.columns)
 
     def _get_max_ghz(self):
-        self.df['Max GHz'] = self.df['CPU Characteristics'].apply(
-            lambda x: parse_cpu_char(x)
+        self.df['Max GHz'] = apply_unique(
+            self.df['CPU Characteristics'], parse_cpu_char
         )
         f = self.df['Max GHz'] == 0.0
         indices = self.df[f].index
         self.df.loc[indices, 'Max GHz'] = self.df.loc[indices, 'CPU GHz']
 
 
-def run_cpu2017(data_folder):
+def run_cpu2017(data_folder, extractor=Cpu2017Extrator, submit_years=None):
     c2017_rfp = 'cpu/cpu2017/CFP2017_rate.csv'
     c2017_sfp = 'cpu/cpu2017/CFP2017_speed.csv'
     c2017_rint = 'cpu/cpu2017/CINT2017_rate.csv'
@@ -347,13 +345,13 @@ def run_cpu2017(data_folder):
         'L3': 'L3 Cache',
     }
 
-    c2017_extrator = Cpu2017Extrator(
-        data_folder, c2017_rfp, c2017_sfp, c2017_rint, c2017_sint
+    c2017_extrator = extractor(
+        data_folder, c2017_rfp, c2017_sfp, c2017_rint, c2017_sint, submit_years
     )
     c2017_extrator.run(c2017_columns, c2017_rename_dict)
 
 
-def run_cpu2006(data_folder):
+def run_cpu2006(data_folder, submit_years=None):
     c2006_rfp = 'cpu/cpu2006/SPECfp_rate.csv'
     c2006_sfp = 'cpu/cpu2006/SPECfp.csv'
     c2006_rint = 'cpu/cpu2006/SPECint_rate.csv'
@@ -392,14 +390,19 @@ def run_cpu2006(data_folder):
     }
 
     c2006_extractor = Cpu2006Extrator(
-        data_folder, c2006_rfp, c2006_sfp, c2006_rint, c2006_sint
+        data_folder, c2006_rfp, c2006_sfp, c2006_rint, c2006_sint, submit_years
     )
     c2006_extractor.run(c2006_columns, c2006_rename_dict)
 
 
 if __name__ == '__main__':
     data_folder = '/home/scott/Documents/SPEC_Spider'
-
-    run_cpu2017(data_folder)
-    run_cpu2006(data_folder)
+    # --memo keeps the normalized values across runs, in data/clean/memo
+    if '--memo' in sys.argv[1:]:
+        open_store()
+    # --years 2018-2019 keeps the results submitted in 2018-2019
+    submit_years = submit_years_arg(sys.argv[1:])
+
+    run_cpu2017(data_folder, submit_years=submit_years)
+    run_cpu2006(data_folder, submit_years=submit_years)
 
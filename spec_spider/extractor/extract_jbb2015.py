@@ -1,9 +1,13 @@
 import os
 import re
-from typing import Dict, List, Optional
+import sys
+from typing import Dict, List, Optional, Tuple
 
 import pandas as pd
 
+from spec_spider.extractor import vectorized as vec
+from spec_spider.extractor.loader import read_result, submit_years_arg
+from spec_spider.extractor.memo import apply_unique, open_store
 from spec_spider.utils import (
     clean_date_1,
     clean_date_2,
@@ -20,15 +24,20 @@ from spec_spider.utils import (
 
 class Jbb2015Extractor:
     def __init__(
-        self, data_folder: str, com_file: str, mul_file: str, dis_file: str,
+        self,
+        data_folder: str,
+        com_file: str,
+        mul_file: str,
+        dis_file: str,
+        submit_years: Optional[Tuple[int, int]] = None,
     ):
         com_path: str = os.path.join(data_folder, com_file)
         mul_path: str = os.path.join(data_folder, mul_file)
         dis_path: str = os.path.join(data_folder, dis_file)
 
-        self.com: pd.DataFrame = pd.read_csv(com_path)
-        self.mul: pd.DataFrame = pd.read_csv(mul_path)
-        self.dis: pd.DataFrame = pd.read_csv(dis_path)
+        self.com: pd.DataFrame = read_result(com_path, submit_years)
+        self.mul: pd.DataFrame = read_result(mul_path, submit_years)
+        self.dis: pd.DataFrame = read_result(dis_path, submit_years)
 
         self.df: Optional[pd.DataFrame] = None
 
@@ -47,22 +56,22 @@ class Jbb2015Extractor:
         self.df = self.df[~self.df.isnull().any(axis=1)].reset_index(drop=True)
 
     def _clean_vendor(self):
-        self.df['HW Vendor'] = self.df['HW Vendor'].apply(lambda x: clean_vendor(x))
+        self.df['HW Vendor'] = apply_unique(self.df['HW Vendor'], clean_vendor)
 
     def _parse_system_name(self):
-        self.df['System Series'] = self.df['System Name'].apply(
-            lambda x: parse_system_name(x)
+        self.df['System Series'] = apply_unique(
+            self.df['System Name'], parse_system_name
         )
 
     def _get_cpu_vendor(self):
-        self.df['CPU Vendor'] = self.df['CPU Name'].apply(lambda x: get_cpu_vendor(x))
+        self.df['CPU Vendor'] = apply_unique(self.df['CPU Name'], get_cpu_vendor)
 
     def _get_cpu_ghz(self):
         self.df['CPU GHz'] = self.df['CPU MHz'].apply(lambda x: round(x / 1000, 2))
 
     def _get_max_ghz(self):
-        self.df['Max GHz'] = self.df['CPU Characteristics'].apply(
-            lambda x: parse_cpu_char(x)
+        self.df['Max GHz'] = apply_unique(
+            self.df['CPU Characteristics'], parse_cpu_char
         )
         f = self.df['Max GHz'] == 0.0
         indices = self.df[f].index
@@ -81,24 +90,18 @@ class Jbb2015Extractor:
             lambda x: _formatter(x)
         )
 
+    def _parse_memory(self):
+        memory = vec.parse_memory(self.df['# and size of DIMM(s)'])
+        self.df['Memory Number'] = memory['Memory Number'].astype('int64')
+        # the amount is read from its own column
+        for column in ['DIMM Size', 'Memory Type', 'Memory Speed']:
+            self.df[column] = memory[column]
+
     def _parse_file_system(self):
         self.df['File System'] = self.df['File System'].apply(lambda x: x.lower())
 
-    def _get_memory_number(self):
-        def _func(info):
-            items = re.findall('\d+[ ]*x', info)
-            if len(items) == 0:
-                number = 1
-            else:
-                number = int(re.sub('[ ]*x', '', items[0]))
-            return number
-
-        self.df['Memory Number'] = self.df['# and size of DIMM(s)'].apply(
-            lambda x: _func(x)
-        )
-
     def _parse_storage(self):
-        self.df['Storage Type'] = self.df['Storage'].apply(lambda x: parse_storage(x))
+        self.df['Storage Type'] = apply_unique(self.df['Storage'], parse_storage)
 
     def _get_submit_quarter(self):
         self.df['Submit Quarter'] = self.df['URL Suffix'].apply(
@@ -130,10 +133,10 @@ class Jbb2015Extractor:
         )
 
     def _clean_test_date(self):
-        self.df['Test Date'] = self.df['Test Date'].apply(lambda x: clean_date_2(x))
+        self.df['Test Date'] = apply_unique(self.df['Test Date'], clean_date_2)
 
     def _clean_hw_avail(self):
-        self.df['HW Avail'] = self.df['HW Avail'].apply(lambda x: clean_date_1(x))
+        self.df['HW Avail'] = apply_unique(self.df['HW Avail'], clean_date_1)
     
     def _format_result(self):
         self.df['Result'] = self.df['Result'].apply(lambda x: float(x))
@@ -150,7 +153,7 @@ class Jbb2015Extractor:
         self._get_max_ghz()
         self._parse_file_system()
         self._format_memory_amount()
-        self._get_memory_number()
+        self._parse_memory()
         self._parse_storage()
         self._get_submit_quarter()
         self._get_submit_year()
@@ -181,6 +184,9 @@ class Jbb2015Extractor:
             'Memory',
             'Memory Number',
             'Memory Amount',
+            'DIMM Size',
+            'Memory Type',
+            'Memory Speed',
             'Storage Type',
             'Storage',
             'OS',
@@ -201,7 +207,7 @@ class Jbb2015Extractor:
         print(self.df.columns)
 
 
-def run_jbb2015(data_folder):
+def run_jbb2015(data_folder, submit_years=None):
     com_file = 'java/jbb2015/SPECjbb2015-Composite.csv'
     mul_file = 'java/jbb2015/SPECjbb2015-Distributed.csv'
     dis_file = 'java/jbb2015/SPECjbb2015-MultiJVM.csv'
@@ -258,10 +264,17 @@ def run_jbb2015(data_folder):
         'Cores Per System': 'Total Cores',
     }
 
-    jbb2015_extractor = Jbb2015Extractor(data_folder, com_file, mul_file, dis_file)
+    jbb2015_extractor = Jbb2015Extractor(
+        data_folder, com_file, mul_file, dis_file, submit_years
+    )
     jbb2015_extractor.run(jbb2015_columns, jbb2015_rename_dict)
 
 
 if __name__ == '__main__':
     data_folder = '/home/scott/Documents/SPEC_Spider'
-    run_jbb2015(data_folder)
+    # --memo keeps the normalized values across runs, in data/clean/memo
+    if '--memo' in sys.argv[1:]:
+        open_store()
+    # --years 2018-2019 keeps the results submitted in 2018-2019
+    submit_years = submit_years_arg(sys.argv[1:])
+    run_jbb2015(data_folder, submit_years=submit_years)
@@ -1,15 +1,18 @@
 import os
 import re
-from typing import Dict, List
+import sys
+from typing import Dict, List, Optional, Tuple
 import pandas as pd
 
+from spec_spider.extractor import vectorized as vec
+from spec_spider.extractor.loader import read_result, submit_years_arg
+from spec_spider.extractor.memo import apply_unique, open_store
 from spec_spider.utils import (
     clean_date_1,
     clean_date_3,
     clean_vendor,
     get_cpu_vendor,
     get_full_url,
-    get_memory_number,
     get_submit_quarter,
     get_submit_year,
     parse_cpu_char,
@@ -19,11 +22,11 @@ from spec_spider.utils import (
 
 class Jvm2008Extrator:
     def __init__(
-        self, data_folder, filename,
+        self, data_folder, filename, submit_years: Optional[Tuple[int, int]] = None,
     ):
         filepath: str = os.path.join(data_folder, filename)
 
-        self.df: pd.DataFrame = pd.read_csv(filepath)
+        self.df: pd.DataFrame = read_result(filepath, submit_years)
 
     def _extract_columns(self, columns: List[str]):
         self.df = self.df[columns]
@@ -35,15 +38,15 @@ class Jvm2008Extrator:
         self.df = self.df[~self.df.isnull().any(axis=1)].reset_index(drop=True)
 
     def _clean_vendor(self):
-        self.df['HW Vendor'] = self.df['HW Vendor'].apply(lambda x: clean_vendor(x))
+        self.df['HW Vendor'] = apply_unique(self.df['HW Vendor'], clean_vendor)
 
     def _parse_system_name(self):
-        self.df['System Series'] = self.df['System Name'].apply(
-            lambda x: parse_system_name(x)
+        self.df['System Series'] = apply_unique(
+            self.df['System Name'], parse_system_name
         )
 
     def _get_cpu_vendor(self):
-        self.df['CPU Vendor'] = self.df['CPU Name'].apply(lambda x: get_cpu_vendor(x))
+        self.df['CPU Vendor'] = apply_unique(self.df['CPU Name'], get_cpu_vendor)
 
     def _get_cpu_ghz(self):
         def _func(info):
@@ -58,7 +61,7 @@ class Jvm2008Extrator:
         self.df['CPU GHz'] = self.df['CPU MHz'].apply(lambda x: _func(x))
 
     def _get_max_ghz(self):
-        self.df['Max GHz'] = self.df['CPU Name'].apply(lambda x: parse_cpu_char(x))
+        self.df['Max GHz'] = apply_unique(self.df['CPU Name'], parse_cpu_char)
         f = (self.df['Max GHz'] == 0.0) | (self.df['Max GHz'] < self.df['CPU GHz'])
         indices = self.df[f].index
         self.df.loc[indices, 'Max GHz'] = self.df.loc[indices, 'CPU GHz']
@@ -88,18 +91,12 @@ class Jvm2008Extrator:
             lambda x: get_memory_amount(x)
         )
 
-    def _get_memory_number(self):
-        def _func(info):
-            items = re.findall('\d+[ ]*x', info)
-            if len(items) == 0:
-                number = 1
-            else:
-                number = int(re.sub('[ ]*x', '', items[0]))
-            return number
-
-        self.df['Memory Number'] = self.df['# and size of DIMM(s)'].apply(
-            lambda x: _func(x)
-        )
+    def _parse_memory(self):
+        memory = vec.parse_memory(self.df['Memory'])
+        self.df['Memory Number'] = memory['Memory Number'].astype('int64')
+        # the amount is read from its own column
+        for column in ['DIMM Size', 'Memory Type', 'Memory Speed']:
+            self.df[column] = memory[column]
 
     def _parse_file_system(self):
         self.df['File System'] = self.df['File System'].apply(lambda x: x.lower())
@@ -131,16 +128,11 @@ class Jvm2008Extrator:
     def _get_cores_per_chip(self):
         self.df['Cores Per Chip'] = self.df['Total Cores'] // self.df['Chips']
 
-    def _get_memory_number(self):
-        self.df['Memory Number'] = self.df['Memory'].apply(
-            lambda x: get_memory_number(x)
-        )
-    
     def _clean_test_date(self):
-        self.df['Test Date'] = self.df['Test Date'].apply(lambda x: clean_date_3(x))
+        self.df['Test Date'] = apply_unique(self.df['Test Date'], clean_date_3)
 
     def _clean_hw_avail(self):
-        self.df['HW Avail'] = self.df['HW Avail'].apply(lambda x: clean_date_1(x))
+        self.df['HW Avail'] = apply_unique(self.df['HW Avail'], clean_date_1)
     
     def _format_result(self):
         self.df['Result'] = self.df['Result'].apply(lambda x: float(x))
@@ -157,7 +149,7 @@ class Jvm2008Extrator:
         self._get_cores_per_chip()
         self._parse_file_system()
         self._get_memory_amount()
-        self._get_memory_number()
+        self._parse_memory()
         self._get_submit_quarter()
         self._get_submit_year()
         self._get_full_url()
@@ -184,6 +176,9 @@ class Jvm2008Extrator:
             'Memory',
             'Memory Number',
             'Memory Amount',
+            'DIMM Size',
+            'Memory Type',
+            'Memory Speed',
             'OS',
             'File System',
             'JVM',
@@ -201,7 +196,7 @@ class Jvm2008Extrator:
         print(self.df.columns)
 
 
-def run_jvm2008(data_folder):
+def run_jvm2008(data_folder, submit_years=None):
     jvm_file = 'java/jvm2008/jvm2008.csv'
 
     jvm2008_columns = [
@@ -250,10 +245,15 @@ def run_jvm2008(data_folder):
         '# of cores': 'Total Cores',
     }
 
-    jvm2008_extractor = Jvm2008Extrator(data_folder, jvm_file)
+    jvm2008_extractor = Jvm2008Extrator(data_folder, jvm_file, submit_years)
     jvm2008_extractor.run(jvm2008_columns, jvm2008_rename_dict)
 
 
 if __name__ == '__main__':
     data_folder = '/home/scott/Documents/SPEC_Spider'
-    run_jvm2008(data_folder)
+    # --memo keeps the normalized values across runs, in data/clean/memo
+    if '--memo' in sys.argv[1:]:
+        open_store()
+    # --years 2018-2019 keeps the results submitted in 2018-2019
+    submit_years = submit_years_arg(sys.argv[1:])
+    run_jvm2008(data_folder, submit_years=submit_years)
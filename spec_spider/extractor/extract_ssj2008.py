@@ -1,8 +1,12 @@
 import os
 import re
-from typing import Dict, List
+import sys
+from typing import Dict, List, Optional, Tuple
 import pandas as pd
 
+from spec_spider.extractor import vectorized as vec
+from spec_spider.extractor.loader import read_result, submit_years_arg
+from spec_spider.extractor.memo import apply_unique, open_store
 from spec_spider.utils import (
     clean_date_1,
     clean_date_2,
@@ -18,10 +22,12 @@ from spec_spider.utils import (
 
 
 class Ssj2008Extractor:
-    def __init__(self, data_folder, filename):
+    def __init__(
+        self, data_folder, filename, submit_years: Optional[Tuple[int, int]] = None,
+    ):
         filepath = os.path.join(data_folder, filename)
 
-        self.df: pd.DataFrame = pd.read_csv(filepath)
+        self.df: pd.DataFrame = read_result(filepath, submit_years)
 
     def _extract_columns(self, columns: List[str]):
         self.df = self.df[columns]
@@ -34,22 +40,22 @@ class Ssj2008Extractor:
         self.df = self.df[self.df['Test Date'] != 'Various'].reset_index(drop=True)
 
     def _clean_vendor(self):
-        self.df['HW Vendor'] = self.df['HW Vendor'].apply(lambda x: clean_vendor(x))
+        self.df['HW Vendor'] = apply_unique(self.df['HW Vendor'], clean_vendor)
 
     def _parse_system_name(self):
-        self.df['System Series'] = self.df['System Name'].apply(
-            lambda x: parse_system_name(x)
+        self.df['System Series'] = apply_unique(
+            self.df['System Name'], parse_system_name
         )
 
     def _get_cpu_vendor(self):
-        self.df['CPU Vendor'] = self.df['CPU Name'].apply(lambda x: get_cpu_vendor(x))
+        self.df['CPU Vendor'] = apply_unique(self.df['CPU Name'], get_cpu_vendor)
 
     def _get_cpu_ghz(self):
         self.df['CPU GHz'] = self.df['CPU MHz'].apply(lambda x: round(x / 1000, 2))
 
     def _get_max_ghz(self):
-        self.df['Max GHz'] = self.df['CPU Characteristics'].apply(
-            lambda x: parse_cpu_char(x)
+        self.df['Max GHz'] = apply_unique(
+            self.df['CPU Characteristics'], parse_cpu_char
         )
         f = (self.df['Max GHz'] == 0.0) | (self.df['Max GHz'] < self.df['CPU GHz'])
         indices = self.df[f].index
@@ -78,21 +84,15 @@ class Ssj2008Extractor:
     def _format_memory_amount(self):
         self.df['Memory Amount'] = self.df['Memory Amount'].apply(lambda x: int(x))
 
-    def _get_memory_number(self):
-        def _func(info):
-            items = re.findall('\d+[ ]*x', info)
-            if len(items) == 0:
-                number = 1
-            else:
-                number = int(re.sub('[ ]*x', '', items[0]))
-            return number
-
-        self.df['Memory Number'] = self.df['# and size of DIMM'].apply(
-            lambda x: _func(x)
-        )
-
     def _parse_storage(self):
-        self.df['Storage Type'] = self.df['Storage'].apply(lambda x: parse_storage(x))
+        self.df['Storage Type'] = apply_unique(self.df['Storage'], parse_storage)
+
+    def _parse_memory(self):
+        memory = vec.parse_memory(self.df['# and size of DIMM'])
+        self.df['Memory Number'] = memory['Memory Number'].astype('int64')
+        # the amount is read from its own column
+        for column in ['DIMM Size', 'Memory Type', 'Memory Speed']:
+            self.df[column] = memory[column]
 
     def _parse_file_system(self):
         self.df['File System'] = self.df['File System'].apply(lambda x: x.lower())
@@ -127,10 +127,10 @@ class Ssj2008Extractor:
         )
 
     def _clean_test_date(self):
-        self.df['Test Date'] = self.df['Test Date'].apply(lambda x: clean_date_2(x))
+        self.df['Test Date'] = apply_unique(self.df['Test Date'], clean_date_2)
 
     def _clean_hw_avail(self):
-        self.df['HW Avail'] = self.df['HW Avail'].apply(lambda x: clean_date_1(x))
+        self.df['HW Avail'] = apply_unique(self.df['HW Avail'], clean_date_1)
 
     def _format_result(self):
         self.df['Result'] = self.df['Result'].apply(lambda x: float(x.replace(',', '')))
@@ -150,7 +150,7 @@ class Ssj2008Extractor:
         self._get_threads_per_chip()
         self._parse_file_system()
         self._format_memory_amount()
-        self._get_memory_number()
+        self._parse_memory()
         self._parse_storage()
         self._get_submit_quarter()
         self._get_submit_year()
@@ -180,6 +180,9 @@ class Ssj2008Extractor:
             'Memory',
             'Memory Number',
             'Memory Amount',
+            'DIMM Size',
+            'Memory Type',
+            'Memory Speed',
             'Storage Type',
             'Storage',
             'OS',
@@ -201,7 +204,7 @@ class Ssj2008Extractor:
         print(self.df.columns)
 
 
-def run_ssj2008(data_folder):
+def run_ssj2008(data_folder, submit_years=None):
     ssj_file = 'power/ssj2008.csv'
 
     ssj2008_columns = [
@@ -250,10 +253,15 @@ def run_ssj2008(data_folder):
         'Filesystem': 'File System',
     }
 
-    ssj2008_extractor = Ssj2008Extractor(data_folder, ssj_file)
+    ssj2008_extractor = Ssj2008Extractor(data_folder, ssj_file, submit_years)
     ssj2008_extractor.run(ssj2008_columns, ssj2008_rename_dict)
 
 
 if __name__ == '__main__':
     data_folder = '/home/scott/Documents/SPEC_Spider'
-    run_ssj2008(data_folder)
+    # --memo keeps the normalized values across runs, in data/clean/memo
+    if '--memo' in sys.argv[1:]:
+        open_store()
+    # --years 2018-2019 keeps the results submitted in 2018-2019
+    submit_years = submit_years_arg(sys.argv[1:])
+    run_ssj2008(data_folder, submit_years=submit_years)
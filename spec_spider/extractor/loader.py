@@ -0,0 +1,131 @@
+import os
+import sqlite3
+from contextlib import closing
+from typing import List, Optional, Tuple
+
+import pandas as pd
+
+from spec_spider.database import (
+    DATABASE_NAME,
+    KEY,
+    database_tables,
+    quote,
+    submit_year_range,
+)
+from spec_spider.snapshot import verify_output
+
+# strings pd.read_csv reads as NaN by default
+NA_VALUES = {
+    '',
+    '#N/A',
+    '#N/A N/A',
+    '#NA',
+    '-1.#IND',
+    '-1.#QNAN',
+    '-NaN',
+    '-nan',
+    '1.#IND',
+    '1.#QNAN',
+    '<NA>',
+    'N/A',
+    'NA',
+    'NULL',
+    'NaN',
+    'None',
+    'n/a',
+    'nan',
+    'null',
+}
+
+
+def type_columns(df: pd.DataFrame) -> pd.DataFrame:
+    """ Type text columns as pd.read_csv would type the same rows: NA strings
+    become NaN and numeric columns numbers """
+    for name in df.columns:
+        column = df[name]
+        if not (
+            pd.api.types.is_object_dtype(column) or pd.api.types.is_string_dtype(column)
+        ):
+            continue
+        column = column.mask(column.isin(NA_VALUES))
+        try:
+            column = pd.to_numeric(column)
+        except (ValueError, TypeError):
+            # the str dtype of read_csv on pandas 3, object before
+            column = column.infer_objects()
+        df[name] = column
+    return df
+
+
+def read_parquet_result(path: str) -> pd.DataFrame:
+    """ Read a suite folder written by ParquetItemExporter, its columns are
+    typed already """
+    from spec_spider.exporters import read_parquet_table
+
+    return read_parquet_table(path).to_pandas()
+
+
+def read_jsonl_result(path: str) -> pd.DataFrame:
+    """ Read the durable records of a suite file written by JsonLinesBatchExporter """
+    from spec_spider.exporters import iter_jsonl_records
+
+    return type_columns(pd.DataFrame(list(iter_jsonl_records(path)), dtype=object))
+
+
+def read_database_result(
+    path: str, suite: str, submit_years: Optional[Tuple[int, int]] = None
+) -> pd.DataFrame:
+    """ Read the table of a suite from a ResultDatabase, the submit years are
+    looked up on the `URL Suffix` primary key """
+    query = f"SELECT * FROM {quote(suite)}"
+    params = ()
+    if submit_years is not None:
+        query += f" WHERE {quote(KEY)} >= ? AND {quote(KEY)} < ?"
+        params = submit_year_range(submit_years)
+    with closing(sqlite3.connect(path)) as connection:
+        df = pd.read_sql_query(f"{query} ORDER BY rowid", connection, params=params)
+    return type_columns(df)
+
+
+def submit_years_arg(args: List[str]) -> Optional[Tuple[int, int]]:
+    """ Submit years of a `--years 2018-2019` or `--years 2018` argument
+    :param args: sys.argv[1:]
+    :return: (2018, 2019), None without --years
+    """
+    if '--years' not in args:
+        return None
+    first, _, last = args[args.index('--years') + 1].partition('-')
+    return int(first), int(last or first)
+
+
+def read_result(
+    path: str, submit_years: Optional[Tuple[int, int]] = None, verify: bool = True
+) -> pd.DataFrame:
+    """ Read the results of a suite, from its parquet folder, json lines file or
+    the results.db next to it when there is one
+    :param path: data/cpu/cpu2017/CFP2017_rate.csv
+    :param submit_years: (2018, 2019) to keep the results submitted in 2018-2019
+    :param verify: refuse, with IncompleteSnapshotError, a file that is partial or
+        does not match the manifest of its snapshot
+    :return: data/cpu/cpu2017/CFP2017_rate.parquet, else CFP2017_rate.jsonl, else
+        the CFP2017_rate table of data/cpu/cpu2017/results.db, else the csv file
+    """
+    root = os.path.splitext(path)[0]
+    suite = os.path.basename(root)
+    database_path = os.path.join(os.path.dirname(path), DATABASE_NAME)
+    if os.path.isdir(f"{root}.parquet"):
+        source, read = f"{root}.parquet", read_parquet_result
+    elif os.path.exists(f"{root}.jsonl"):
+        source, read = f"{root}.jsonl", read_jsonl_result
+    elif os.path.exists(database_path) and suite in database_tables(database_path):
+        return read_database_result(database_path, suite, submit_years)
+    else:
+        source, read = path, pd.read_csv
+    if verify:
+        verify_output(source)
+    df = read(source)
+
+    if submit_years is not None:
+        first, last = submit_year_range(submit_years)
+        df = df[(df[KEY] >= first) & (df[KEY] < last)].reset_index(drop=True)
+    return df
@@ -0,0 +1,140 @@
+""" Run the normalizers of spec_spider.utils once per distinct value of a column
+
+A column of tens of thousands of results holds a few hundred vendors, system
+names or dates: apply_unique factorizes it, calls the normalizer on each
+distinct value and takes the results back to their rows, with the same values
+and dtype as Series.apply.
+
+With a MemoStore, the normalized values are also kept across runs, one json
+file per normalizer, dropped as soon as the source of the normalizer, or of a
+global it reads, changes.
+"""
+import hashlib
+import inspect
+import json
+import os
+from typing import Callable, Dict, Optional
+
+import pandas as pd
+
+from spec_spider.extractor.vectorized import all_strings, map_distinct
+
+MEMO_FOLDER = './data/clean/memo'
+# outputs a json file gives back unchanged
+STORABLE = (str, int, float, bool, type(None))
+
+
+def _global_names(code):
+    names = set(code.co_names)
+    for const in code.co_consts:
+        if inspect.iscode(const):
+            names |= _global_names(const)
+    return names
+
+
+def fingerprint(func: Callable) -> str:
+    """ sha256 of the source of func, of the functions it calls and of the
+    values of the other globals it reads, e.g. the month tables of the dates """
+    digest = hashlib.sha256()
+    seen = set()
+
+    def add(f):
+        if f in seen:
+            return
+        seen.add(f)
+        digest.update(inspect.getsource(f).encode('utf-8'))
+        for name in sorted(_global_names(f.__code__)):
+            if name not in f.__globals__:
+                continue
+            value = f.__globals__[name]
+            if inspect.isfunction(value):
+                add(value)
+            elif not inspect.ismodule(value):
+                digest.update(f"{name}={value!r}".encode('utf-8'))
+
+    add(func)
+    return digest.hexdigest()
+
+
+class MemoStore:
+    """ Normalized values of earlier runs, `<folder>/<normalizer>.json`
+
+    Each file holds the fingerprint of its normalizer, a file of another
+    fingerprint is ignored and rewritten. Only str inputs and outputs of a
+    type json gives back unchanged are kept.
+    """
+
+    def __init__(self, folder: str = MEMO_FOLDER):
+        self.folder = folder
+        # normalizer name: (fingerprint, {input: output})
+        self.tables: Dict[str, tuple] = {}
+
+    def _path(self, func):
+        return os.path.join(self.folder, f"{func.__module__}.{func.__qualname__}.json")
+
+    def table(self, func: Callable) -> Dict:
+        name = f"{func.__module__}.{func.__qualname__}"
+        if name in self.tables:
+            return self.tables[name][1]
+        key = fingerprint(func)
+        values = {}
+        try:
+            with open(self._path(func), encoding='utf-8') as f:
+                memo = json.load(f)
+            if memo.get('fingerprint') == key:
+                values = memo['values']
+        except (OSError, ValueError, KeyError):
+            pass
+        self.tables[name] = (key, values)
+        return values
+
+    def save(self, func: Callable):
+        key, values = self.tables[f"{func.__module__}.{func.__qualname__}"]
+        os.makedirs(self.folder, exist_ok=True)
+        path = self._path(func)
+        with open(f"{path}.tmp", 'w', encoding='utf-8') as f:
+            json.dump({'fingerprint': key, 'values': values}, f, ensure_ascii=False)
+        os.replace(f"{path}.tmp", path)
+
+
+# the store apply_unique uses by default, off unless opened
+STORE: Optional[MemoStore] = None
+
+
+def open_store(folder: str = MEMO_FOLDER) -> MemoStore:
+    global STORE
+    STORE = MemoStore(folder)
+    return STORE
+
+
+def apply_unique(
+    values: pd.Series, func: Callable, store: Optional[MemoStore] = None
+) -> pd.Series:
+    """ values.apply(func), func called once per distinct value
+
+    A column with missing or non str values is applied row by row, so func
+    sees the same values as before.
+    """
+    if not all_strings(values):
+        return values.apply(func)
+    store = store if store is not None else STORE
+    memo = {} if store is None else store.table(func)
+    added = []
+
+    def normalize(distinct):
+        results = []
+        for value in distinct:
+            if value in memo:
+                results.append(memo[value])
+                continue
+            result = func(value)
+            results.append(result)
+            if type(result) in STORABLE:
+                memo[value] = result
+                added.append(value)
+        return pd.Series(results, index=distinct.index)
+
+    result = map_distinct(values, normalize)
+    if store is not None and added:
+        store.save(func)
+    return result
@@ -0,0 +1,225 @@
+""" Column-wise versions of the spec_spider.utils parsers for the extractors
+
+Each function takes the column the extractor used to `.apply` the parser of
+the same name to, and returns the same values with pandas string methods.
+Rows of an unexpected shape, not a str or a number that is not plain digits,
+go through the parser itself, so they give the same value or raise the same
+exception as before.
+
+The string methods still loop over the rows in python, a column of thousands
+of results holds a few hundred distinct descriptions: they are parsed once
+each and taken back to their rows. The parsers reading the same text, the CPU
+Enabled or the Memory of a result, run together on each distinct value and
+fill the columns of one table.
+"""
+import functools
+
+import numpy as np
+import pandas as pd
+
+from spec_spider import utils
+
+
+def _strings(values: pd.Series) -> pd.Series:
+    """ Rows holding a str """
+    return values.str.len().notna()
+
+
+def all_strings(values: pd.Series) -> bool:
+    """ The column holds a str in every row """
+    # the str dtype of pandas 3 holds missing values too
+    return not values.hasnans and (
+        pd.api.types.infer_dtype(values, skipna=False) == 'string'
+    )
+
+
+def _flag(mask: pd.Series) -> pd.Series:
+    return mask.fillna(False).astype(bool)
+
+
+def _fallback(values: pd.Series, result: pd.Series, rows: pd.Series, func):
+    """ func over the values of rows, the others keep their vectorized result """
+    if rows.any():
+        result[rows] = values[rows].map(func)
+    return result
+
+
+def map_distinct(values: pd.Series, transform):
+    """ transform, a Series or DataFrame per row of the Series it is given,
+    over the distinct values of a column of str, taken back to the rows of
+    values; a column of other values goes through transform whole """
+    if not all_strings(values):
+        return transform(values)
+    codes, uniques = pd.factorize(values)
+    result = transform(pd.Series(uniques, name=values.name)).take(codes)
+    result.index = values.index
+    if isinstance(result, pd.Series):
+        result.name = values.name
+    return result
+
+
+def _distinct(transform):
+    """ transform over the distinct values of a column of str """
+
+    @functools.wraps(transform)
+    def wrapper(values: pd.Series) -> pd.Series:
+        return map_distinct(values, transform)
+
+    return wrapper
+
+
+def _table(values: pd.Series, parse, columns, dtype=None) -> pd.DataFrame:
+    """ parse of each value, a row of the columns, once per distinct value;
+    without a dtype, each column takes the nullable dtype of its values """
+
+    def transform(distinct):
+        table = pd.DataFrame(
+            [parse(value) for value in distinct],
+            index=distinct.index,
+            columns=columns,
+        )
+        return table.convert_dtypes() if dtype is None else table.astype(dtype)
+
+    return map_distinct(values, transform)
+
+
+def _digits(tokens: pd.Series, valid: pd.Series) -> pd.Series:
+    """ Rows of valid whose token int() reads as a plain number """
+    return valid & _flag(tokens.str.fullmatch('[0-9]+'))
+
+
+def _to_int(values, tokens, valid, func, preset=None):
+    """ tokens as int where valid and plain digits, the value of preset, a
+    (rows, value), for its rows, and func over the values of the others """
+    digits = _digits(tokens, valid)
+    result = pd.Series(0, index=values.index, dtype='int64')
+    result[digits] = tokens[digits].astype('int64')
+    others = ~digits
+    if preset is not None:
+        rows, value = preset
+        result[rows] = value
+        others &= ~rows
+    return _fallback(values, result, others, func)
+
+
+TOPOLOGY_COLUMNS = ['Total Cores', 'Chips', 'Threads Per Core', 'Cores Per Chip']
+
+
+def _topology(cpu_enabled):
+    topology = utils.parse_cpu_enabled(cpu_enabled)
+    if topology is None or topology[1] == 0:
+        return [pd.NA] * len(TOPOLOGY_COLUMNS)
+    total_cores, chips, threads_per_core = topology
+    return total_cores, chips, threads_per_core, total_cores // chips
+
+
+def parse_cpu_enabled(values: pd.Series) -> pd.DataFrame:
+    """ utils.parse_cpu_enabled and the cores per chip of each row, as nullable
+    ints in the TOPOLOGY_COLUMNS; a row it cannot parse, or without chips, is
+    <NA> in all of them """
+    return _table(values, _topology, TOPOLOGY_COLUMNS, 'Int64')
+
+
+MEMORY_COLUMNS = [
+    'Memory Amount',
+    'Memory Number',
+    'Memory GB',
+    'DIMM Size',
+    'Memory Type',
+    'Memory Speed',
+]
+
+
+def _memory(memory_info):
+    spec = utils.parse_memory(memory_info)
+    return [None] * len(MEMORY_COLUMNS) if spec is None else spec
+
+
+def parse_memory(values: pd.Series) -> pd.DataFrame:
+    """ utils.parse_memory of each row in the MEMORY_COLUMNS; a field a
+    description does not give, or a row that is not a str, is <NA>. The
+    numbers are ints when they all are """
+    return _table(values, _memory, MEMORY_COLUMNS)
+
+
+STORAGE_TYPES = [
+    # (case, text, type), the first matching wins as in utils.parse_storage
+    ('upper', 'SSD', 'SSD'),
+    ('upper', 'HDD', 'HDD'),
+    ('lower', 'ramfs', 'ramfs'),
+    ('lower', 'tmpfs', 'tmpfs'),
+    ('lower', 'zfs', 'zfs'),
+]
+
+
+@_distinct
+def parse_storage(values: pd.Series) -> pd.Series:
+    cased = {'upper': values.str.upper(), 'lower': values.str.lower()}
+    conditions = [
+        _flag(cased[case].str.contains(text, regex=False))
+        for case, text, _ in STORAGE_TYPES
+    ]
+    choices = [storage_type for _, _, storage_type in STORAGE_TYPES]
+    result = pd.Series(
+        np.select(conditions, choices, 'SSD').astype(object), index=values.index
+    )
+    return _fallback(values, result, ~_strings(values), utils.parse_storage)
+
+
+@_distinct
+def parse_cpu_orderable(values: pd.Series) -> pd.Series:
+    chip = values.str.split(';', n=1).str[0].str.extract('(.*chip)', expand=False)
+    # the last number before the first 'chip'
+    number = chip.str.extract(r'.*?(\d+)\D*$', expand=False)
+    strings = _strings(values)
+    # without a chip count, one chip
+    preset = (strings & chip.isna(), 1)
+    return _to_int(
+        values, number, strings & chip.notna(), utils.parse_cpu_orderable, preset
+    )
+
+
+# 'res2022q1/', the first part of the url paths of spec.org
+URL_HEAD = 10
+
+
+def get_submit_year(values: pd.Series) -> pd.Series:
+    # the year is read from the first 7 characters, the same for a quarter
+    if all_strings(values):
+        values = values.str[:7]
+    return _submit_year(values)
+
+
+@_distinct
+def _submit_year(values: pd.Series) -> pd.Series:
+    tokens = values.str.split('/', n=1).str[0].str[3:7]
+    return _to_int(values, tokens, _strings(values), utils.get_submit_year)
+
+
+def get_submit_quarter(values: pd.Series) -> pd.Series:
+    if not all_strings(values):
+        return _submit_quarter(values)
+    codes, heads = pd.factorize(values.str[:URL_HEAD])
+    heads = pd.Series(heads)
+    # a first part longer than URL_HEAD is read from the whole url
+    cut = _flag(heads.str.len() == URL_HEAD) & ~_flag(
+        heads.str.contains('/', regex=False)
+    )
+    quarters = _submit_quarter(heads[~cut]).reindex(heads.index, fill_value=0)
+    result = quarters.take(codes)
+    result.index = values.index
+    rows = cut.to_numpy()[codes]
+    if rows.any():
+        result[rows] = _submit_quarter(values[rows])
+    return result
+
+
+def _submit_quarter(values: pd.Series) -> pd.Series:
+    tokens = values.str.split('/', n=1).str[0].str[-1]
+    return _to_int(values, tokens, _strings(values), utils.get_submit_quarter)
+
+
+@_distinct
+def lower(values: pd.Series) -> pd.Series:
+    result = values.str.lower()
+    return _fallback(values, result, ~_strings(values), lambda x: x.lower())
@@ -2,11 +2,507 @@
 #
 # See documentation in:
 # https://docs.scrapy.org/en/latest/topics/items.html
+import json
+from types import MappingProxyType
+from typing import Dict, Iterable, List, Optional, Tuple
 
 import scrapy
+from itemadapter import ItemAdapter
+from itemadapter.adapter import AdapterInterface
+
+# last column of every suite, the fields a page brings that its suite does not
+# declare, as a json object
+UNDECLARED = 'Undeclared Fields'
 
 
 class SpecSpiderItem(scrapy.Item):
     # define the fields for your item here like:
     # name = scrapy.Field()
     pass
+
+
+class SlotItem:
+    """ Result of a suite with a fixed, ordered set of fields
+
+    The values live in a single list slot indexed by field position, instead
+    of a dict per item; unset fields are None and behave as missing keys.
+    """
+
+    __slots__ = ('values',)
+    fields: Tuple[str, ...] = ()
+    index: Dict[str, int] = {}
+
+    def __init__(self, values: Optional[List] = None):
+        self.values = values if values is not None else [None] * len(self.fields)
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> Tuple['SlotItem', List[str]]:
+        """ Item of data, whose undeclared keys go as a json object to its
+        UNDECLARED field, and these keys """
+        values = [None] * len(cls.fields)
+        undeclared = {}
+        for name, value in data.items():
+            idx = cls.index.get(name)
+            if idx is None or name == UNDECLARED:
+                undeclared[name] = value
+            else:
+                values[idx] = value
+        if len(undeclared):
+            values[cls.index[UNDECLARED]] = json.dumps(undeclared, ensure_ascii=False)
+        return cls(values), list(undeclared)
+
+    def __getitem__(self, name):
+        value = self.values[self.index[name]]
+        if value is None:
+            raise KeyError(name)
+        return value
+
+    def __setitem__(self, name, value):
+        idx = self.index.get(name)
+        if idx is None:
+            raise KeyError(f"{type(self).__name__} does not declare {name}")
+        self.values[idx] = value
+
+    def __delitem__(self, name):
+        self.values[self.index[name]] = None
+
+    def __contains__(self, name):
+        idx = self.index.get(name)
+        return idx is not None and self.values[idx] is not None
+
+    def get(self, name, default=None):
+        idx = self.index.get(name)
+        if idx is None or self.values[idx] is None:
+            return default
+        return self.values[idx]
+
+    def keys(self) -> List[str]:
+        return [
+            name for name, value in zip(self.fields, self.values) if value is not None
+        ]
+
+    def asdict(self) -> Dict:
+        return {
+            name: value
+            for name, value in zip(self.fields, self.values)
+            if value is not None
+        }
+
+    # no __iter__: Scrapy would take the item for an iterable of spider outputs
+    def __repr__(self):
+        return f"{type(self).__name__}({self.asdict()})"
+
+    def __reduce__(self):
+        return _restore_item, (type(self).__name__, self.values)
+
+
+class SlotItemAdapter(AdapterInterface):
+    """ Lets Scrapy and its exporters handle SlotItem like any other item """
+
+    @classmethod
+    def is_item_class(cls, item_class: type) -> bool:
+        return issubclass(item_class, SlotItem)
+
+    @classmethod
+    def get_field_meta_from_class(cls, item_class: type, field_name: str):
+        return MappingProxyType({})
+
+    @classmethod
+    def get_field_names_from_class(cls, item_class: type) -> List[str]:
+        return list(item_class.fields)
+
+    def field_names(self):
+        return list(self.item.fields)
+
+    def __getitem__(self, field_name):
+        return self.item[field_name]
+
+    def __setitem__(self, field_name, value):
+        self.item[field_name] = value
+
+    def __delitem__(self, field_name):
+        del self.item[field_name]
+
+    def __iter__(self):
+        return iter(self.item.keys())
+
+    def __len__(self):
+        return len(self.item.keys())
+
+
+ItemAdapter.ADAPTER_CLASSES.insert(0, SlotItemAdapter)
+
+
+# item classes by name, to unpickle items of the classes made by slot_item
+_ITEM_CLASSES: Dict[str, type] = {}
+
+
+def _restore_item(name: str, values: List) -> SlotItem:
+    return _ITEM_CLASSES[name](values)
+
+
+def slot_item(name: str, fields: Iterable[str]) -> type:
+    fields = tuple(fields) + (UNDECLARED,)
+    _ITEM_CLASSES[name] = type(
+        name,
+        (SlotItem,),
+        {
+            '__slots__': (),
+            'fields': fields,
+            'index': {field: idx for idx, field in enumerate(fields)},
+        },
+    )
+    return _ITEM_CLASSES[name]
+
+
+CPU2017_HARDWARE = [
+    'CPU Name',
+    'Max MHz',
+    'Nominal',
+    'Enabled',
+    'Orderable',
+    'L1',
+    'L2',
+    'L3',
+    'Other Cache',
+    'Memory',
+    'Storage',
+    'Other HW',
+]
+CPU2017_SOFTWARE = [
+    'OS',
+    'Compiler',
+    'Parallel',
+    'Firmware',
+    'File System',
+    'System State',
+    'Base Pointers',
+    'Peak Pointers',
+    'Other SW',
+]
+CPU2006_HARDWARE = [
+    'CPU Name',
+    'CPU Characteristics',
+    'CPU MHz',
+    'FPU',
+    'CPU(s) enabled',
+    'CPU(s) orderable',
+    'Primary Cache',
+    'Secondary Cache',
+    'L3 Cache',
+    'Other Cache',
+    'Memory',
+    'Disk Subsystem',
+    'Other Hardware',
+]
+CPU2006_SOFTWARE = [
+    'OS',
+    'Compiler',
+    'Parallel',
+    'File System',
+    'System State',
+    'Base Pointers',
+    'Peak Pointers',
+    'Other Software',
+]
+CPU_INFO = [
+    'Hardware Vendor',
+    'System Name',
+    'Metric',
+    'Baseline',
+    'License',
+    'Test Sponsor',
+    'Tested By',
+    'Test Date',
+    'HW Avail',
+    'SW Avail',
+]
+
+# benchmarks of each suite, in the order of the result tables
+CINT2017 = [
+    'perlbench',
+    'gcc',
+    'mcf',
+    'omnetpp',
+    'xalancbmk',
+    'x264',
+    'deepsjeng',
+    'leela',
+    'exchange2',
+    'xz',
+]
+CINT2017_RATE = [
+    f"{num}.{name}_r"
+    for num, name in zip([500, 502, 505, 520, 523, 525, 531, 541, 548, 557], CINT2017)
+]
+CINT2017_SPEED = [
+    f"{num}.{name}_s"
+    for num, name in zip([600, 602, 605, 620, 623, 625, 631, 641, 648, 657], CINT2017)
+]
+CFP2017_RATE = [
+    '503.bwaves_r',
+    '507.cactuBSSN_r',
+    '508.namd_r',
+    '510.parest_r',
+    '511.povray_r',
+    '519.lbm_r',
+    '521.wrf_r',
+    '526.blender_r',
+    '527.cam4_r',
+    '538.imagick_r',
+    '544.nab_r',
+    '549.fotonik3d_r',
+    '554.roms_r',
+]
+CFP2017_SPEED = [
+    '603.bwaves_s',
+    '607.cactuBSSN_s',
+    '619.lbm_s',
+    '621.wrf_s',
+    '627.cam4_s',
+    '628.pop2_s',
+    '638.imagick_s',
+    '644.nab_s',
+    '649.fotonik3d_s',
+    '654.roms_s',
+]
+CINT2006 = [
+    '400.perlbench',
+    '401.bzip2',
+    '403.gcc',
+    '429.mcf',
+    '445.gobmk',
+    '456.hmmer',
+    '458.sjeng',
+    '462.libquantum',
+    '464.h264ref',
+    '471.omnetpp',
+    '473.astar',
+    '483.xalancbmk',
+]
+CFP2006 = [
+    '410.bwaves',
+    '416.gamess',
+    '433.milc',
+    '434.zeusmp',
+    '435.gromacs',
+    '436.cactusADM',
+    '437.leslie3d',
+    '444.namd',
+    '447.dealII',
+    '450.soplex',
+    '453.povray',
+    '454.calculix',
+    '459.GemsFDTD',
+    '465.tonto',
+    '470.lbm',
+    '481.wrf',
+    '482.sphinx3',
+]
+
+
+def cpu2017_item(suite: str, benchmarks: List[str]) -> type:
+    base = 'Base Copies' if suite.endswith('rate') else 'Base Threads'
+    fields = (
+        ['Suite', *CPU_INFO, *CPU2017_HARDWARE, *CPU2017_SOFTWARE, *benchmarks]
+        + [base, 'URL Suffix']
+    )
+    return slot_item(f"{suite}Item", fields)
+
+
+def cpu2006_item(suite: str, benchmarks: List[str]) -> type:
+    base = ['Base Copies'] if suite.endswith('rate') else []
+    fields = (
+        ['Suite', *CPU_INFO, *CPU2006_HARDWARE, *CPU2006_SOFTWARE, *benchmarks]
+        + [*base, 'URL Suffix']
+    )
+    return slot_item(f"{suite}Item", fields)
+
+
+JBB2015_FIELDS = [
+    'Suite',
+    'max_jOPS',
+    'cirtical_jOPS',
+    # report header
+    'Tested by',
+    'Test Sponsor',
+    'SPEC license #',
+    'Test Location',
+    'Test date',
+    'Hardware Availability',
+    'Software Availability',
+    'Publication',
+    'System Vendor',
+    'System Name',
+    'JVM Vendor',
+    # overall SUT
+    'Vendor',
+    'System Source',
+    'Total System Count',
+    'Total Node Count',
+    'Nodes Per System',
+    'Total Chips',
+    'Total Cores',
+    'Total Threads',
+    'Total Memory Amount (GB)',
+    'Total OS Images',
+    # hardware
+    'Form Factor',
+    'CPU Name',
+    'CPU Characteristics',
+    'Number of Systems',
+    'Chips Per System',
+    'Cores Per System',
+    'Cores Per Chip',
+    'Threads Per System',
+    'Threads Per Core',
+    'Version',
+    'CPU Frequency (MHz)',
+    'Primary Cache',
+    'Secondary Cache',
+    'Tertiary Cache',
+    'Other Cache',
+    'Disk',
+    'File System',
+    'Memory Amount (GB)',
+    '# and size of DIMM(s)',
+    'Memory Details',
+    '# and type of Network Interface Cards (NICs) Installed',
+    'Power Supply Quantity and Rating (W)',
+    'Other Hardware',
+    'Cabinet/Housing/Enclosure',
+    'Shared Description',
+    'Tuning',
+    'Notes',
+    # software
+    'OS Name',
+    'OS Vendor',
+    'OS Version',
+    'JVM Name',
+    'JVM Version',
+    'URL Suffix',
+]
+
+JVM2008_FIELDS = [
+    'Suite',
+    'Result',
+    # info
+    'Submitter',
+    'SPEC license #',
+    'Test date:',
+    # hardware
+    'HW vendor',
+    'HW model',
+    'HW available',
+    'CPU vendor',
+    'CPU name',
+    'CPU frequency',
+    '# of logical cpus',
+    '# of chips',
+    '# of cores',
+    'Cores per chip',
+    'Threads per core',
+    'Threads per chip',
+    'Primary cache',
+    'Secondary cache',
+    'Other cache',
+    'Memory size',
+    'Memory details',
+    'Other HW details',
+    # software
+    'OS name',
+    'OS available',
+    'Filesystem',
+    # jvm
+    'JVM name',
+    'JVM version',
+    'JVM Vendor',
+    'JVM available',
+    'URL Suffix',
+]
+
+SSJ2008_LOADS = ['100%', '90%', '80%', '70%', '60%', '50%', '40%', '30%', '20%', '10%']
+SSJ2008_FIELDS = [
+    'Suite',
+    # result header
+    'Test Sponsor',
+    'SPEC License #',
+    'Test Method',
+    'Tested By',
+    'Test Date',
+    'Hardware Availability',
+    'Software Availability',
+    'Publication',
+    # results
+    *[
+        f"{metric} @ {load} of target load"
+        for load in SSJ2008_LOADS
+        for metric in ['ssj_ops', 'Average watts', 'Performance/power']
+    ],
+    'Average watts @ active idle',
+    'Benchmark',
+    # hardware
+    'Hardware Vendor',
+    'Model',
+    'Form Factor',
+    'CPU Name',
+    'CPU Characteristics',
+    'CPU Frequency (MHz)',
+    'CPU(s) Enabled',
+    'Hardware Threads',
+    'CPU(s) Orderable',
+    'Primary Cache',
+    'Secondary Cache',
+    'Tertiary Cache',
+    'Other Cache',
+    'Memory Amount (GB)',
+    '# and size of DIMM',
+    'Memory Details',
+    'Power Supply Quantity and Rating (W)',
+    'Power Supply Details',
+    'Disk Drive',
+    'Disk Controller',
+    '# and type of Network Interface Cards (NICs) Installed',
+    'NICs Enabled in Firmware / OS / Connected',
+    'Network Speed (Mbit)',
+    'Other Hardware',
+    # software
+    'Power Management',
+    'Operating System (OS)',
+    'OS Version',
+    'Filesystem',
+    'JVM Vendor',
+    'JVM Version',
+    'JVM Instances',
+    'JVM Initial Heap (MB)',
+    'JVM Maximum Heap (MB)',
+    'JVM Address Bits',
+    'Boot Firmware Version',
+    'Management Firmware Version',
+    'Workload Version',
+    'Director Location',
+    'Other Software',
+    'URL Suffix',
+]
+
+# item class of each file of a snapshot, by suite or by benchmark
+ITEMS = {
+    'CINT2017_rate': cpu2017_item('CINT2017_rate', CINT2017_RATE),
+    'CINT2017_speed': cpu2017_item('CINT2017_speed', CINT2017_SPEED),
+    'CFP2017_rate': cpu2017_item('CFP2017_rate', CFP2017_RATE),
+    'CFP2017_speed': cpu2017_item('CFP2017_speed', CFP2017_SPEED),
+    'SPECint_rate': cpu2006_item('SPECint_rate', CINT2006),
+    'SPECint': cpu2006_item('SPECint', CINT2006),
+    'SPECfp_rate': cpu2006_item('SPECfp_rate', CFP2006),
+    'SPECfp': cpu2006_item('SPECfp', CFP2006),
+    'SPECjbb2015-Composite': slot_item('Jbb2015CompositeItem', JBB2015_FIELDS),
+    'SPECjbb2015-MultiJVM': slot_item('Jbb2015MultiJVMItem', JBB2015_FIELDS),
+    'SPECjbb2015-Distributed': slot_item('Jbb2015DistributedItem', JBB2015_FIELDS),
+    'jvm2008': slot_item('Jvm2008Item', JVM2008_FIELDS),
+    'ssj2008': slot_item('Ssj2008Item', SSJ2008_FIELDS),
+}
+
+
+def get_item_class(benchmark: str, suite: Optional[str]) -> Optional[type]:
+    """ Item class of a suite, or of a single file benchmark """
+    return ITEMS.get(suite) or ITEMS.get(benchmark)
@@ -3,12 +3,20 @@
 # See documentation in:
 # https://docs.scrapy.org/en/latest/topics/spider-middleware.html
 import random
+import time
 
 from scrapy import signals
+from scrapy.exceptions import IgnoreRequest, NotConfigured
+from scrapy.http import HtmlResponse, TextResponse
+from scrapy.utils.httpobj import urlparse_cached
+from twisted.internet import reactor
+from twisted.internet.task import deferLater
 
 # useful for handling different item types with a single interface
 from itemadapter import is_item, ItemAdapter
 
+from spec_spider.storage import HtmlArchive
+
 
 class SpecSpiderSpiderMiddleware:
     # Not all methods need to be defined. If a method is not defined,
@@ -124,3 +132,88 @@ class UserAgentMiddleware:
         # user_agent = random.choice(self.user_agents_list)
         user_agent = random.choice(self.USER_AGENTS_LIST)
         request.headers['User-Agent'] = user_agent
+
+
+class ArchiveMiddleware:
+    """ Keep every fetched page in an HtmlArchive
+
+    With ARCHIVE_REPLAY the pages are served from the archive instead, so the
+    spiders can re-parse a whole crawl without network access.
+    """
+
+    def __init__(self, archive, replay):
+        self.archive = archive
+        self.replay = replay
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        settings = crawler.settings
+        replay = settings.getbool('ARCHIVE_REPLAY')
+        if not settings.getbool('ARCHIVE_ENABLED') and not replay:
+            raise NotConfigured
+        s = cls(HtmlArchive.open(settings.get('ARCHIVE_DIR')), replay)
+        crawler.signals.connect(s.spider_closed, signal=signals.spider_closed)
+        return s
+
+    def process_request(self, request, spider):
+        if not self.replay:
+            return None
+        page = self.archive.get(request.url)
+        if page is None:
+            spider.crawler.stats.inc_value('archive/miss')
+            raise IgnoreRequest(f"Not archived: {request.url}")
+        body, encoding = page
+        spider.crawler.stats.inc_value('archive/replayed')
+        return HtmlResponse(
+            request.url,
+            body=body,
+            encoding=encoding,
+            request=request,
+            flags=['archive'],
+        )
+
+    def process_response(self, request, response, spider):
+        if self.replay or response.status != 200:
+            return response
+        if isinstance(response, TextResponse):
+            self.archive.put(response.url, response.body, response.encoding)
+            spider.crawler.stats.inc_value('archive/stored')
+        return response
+
+    def spider_closed(self, spider):
+        self.archive.flush()
+        spider.logger.info(f"Archive holds {len(self.archive)} pages")
+
+
+class SharedSlotMiddleware:
+    """ Space out the requests to a host across every crawler of the process
+
+    DOWNLOAD_DELAY is enforced by each crawler's own downloader, so spiders
+    sharing a process would each get the full budget. This keeps one budget
+    per host instead, see spec_spider/crawl.py. AdaptiveThrottle adapts the
+    delay of each host from there on.
+    """
+
+    # host -> time at which its next request may be sent
+    next_slot_time = {}
+    # host -> delay set by AdaptiveThrottle, SHARED_DOWNLOAD_DELAY until then
+    delays = {}
+
+    def __init__(self, delay):
+        self.delay = delay
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        delay = crawler.settings.getfloat('SHARED_DOWNLOAD_DELAY')
+        if delay <= 0:
+            raise NotConfigured
+        return cls(delay)
+
+    def process_request(self, request, spider):
+        host = urlparse_cached(request).hostname
+        now = time.monotonic()
+        slot_time = max(now, self.next_slot_time.get(host, now))
+        self.next_slot_time[host] = slot_time + self.delays.get(host, self.delay)
+        if slot_time > now:
+            return deferLater(reactor, slot_time - now, lambda: None)
+        return None
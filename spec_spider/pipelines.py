@@ -5,9 +5,32 @@
 
 
 # useful for handling different item types with a single interface
+import logging
 import os
-from datetime import datetime
-from scrapy.exporters import CsvItemExporter
+from typing import FrozenSet, Optional
+
+from scrapy import signals
+from twisted.internet import threads
+
+from spec_spider.database import DATABASE_NAME
+from spec_spider.exporters import (
+    JsonLinesBatchExporter,
+    ParquetItemExporter,
+    SlotCsvItemExporter,
+    SqliteItemExporter,
+)
+from spec_spider.items import SlotItem
+from spec_spider.snapshot import (
+    bind_jobdir_snapshot,
+    finalize_outputs,
+    jobdir_snapshot,
+    latest_snapshot,
+    new_snapshot,
+    read_csv_header,
+    stage_output,
+    trim_partial_rows,
+)
+from spec_spider.writer import BackgroundWriter
 
 
 class SpecSpiderPipeline:
@@ -15,175 +38,238 @@ class SpecSpiderPipeline:
         return item
 
 
-def get_file_path(benchmark, suite):
-    now = datetime.now().strftime('%Y_%m_%d_%H_%M_%S')
-    folder = f"data/{benchmark}/{now}"
-    if not os.path.exists(folder):
-        os.makedirs(folder)
+def get_snapshot_folder(benchmark, settings):
+    """ Incremental crawls merge into the latest snapshot, others start a new one
+
+    A resumable crawl (JOBDIR) keeps writing to the snapshot it started.
+    """
+    jobdir = settings.get('JOBDIR')
+    if jobdir:
+        folder = jobdir_snapshot(jobdir)
+        if folder is not None:
+            # the rows only partly flushed before a crash are crawled again
+            trim_partial_rows(folder)
+            return folder
+
+    folder = None
+    if settings.getbool('INCREMENTAL'):
+        folder = latest_snapshot(benchmark)
+    if folder is None:
+        folder = new_snapshot(benchmark)
+
+    if jobdir:
+        bind_jobdir_snapshot(jobdir, folder)
+    return folder
+
+
+def get_export_options(settings):
+    return {
+        # resumable crawls carry on with the outputs staged by the interrupted run
+        'resume': bool(settings.get('JOBDIR')),
+        'export_format': settings.get('EXPORT_FORMAT'),
+        'batch_size': settings.getint('EXPORT_BATCH_SIZE'),
+        'flush_interval': settings.getfloat('EXPORT_FLUSH_INTERVAL'),
+    }
+
+
+def staged_output(folder, suite, export_format):
+    """ Path of the csv or parquet output of suite, written to a staged copy
+    until its crawl finishes. jsonl files are read while they are written and
+    the database commits as it goes, neither is staged """
+    if export_format in ('csv', 'parquet'):
+        return os.path.join(folder, f"{suite}.{export_format}")
+    return None
+
+
+def open_exporter(
+    folder,
+    suite,
+    fields=None,
+    resume=False,
+    export_format='csv',
+    batch_size=1000,
+    flush_interval=5.0,
+):
+    """ Open an exporter for suite, appending to the output if it already exists
+
+    fields is the declared field order of the suite items; the columns of an
+    existing file win over it. The parquet, sqlite and jsonl exporters write
+    their own files, there is no file to close. All the snapshots of a
+    benchmark share its database, next to them.
+    """
+    if export_format == 'parquet':
+        path = stage_output(staged_output(folder, suite, export_format), resume)
+        return None, ParquetItemExporter(
+            path, batch_size=batch_size, fields_to_export=fields
+        )
+    if export_format == 'jsonl':
+        path = os.path.join(folder, f"{suite}.jsonl")
+        return None, JsonLinesBatchExporter(
+            path,
+            batch_size=batch_size,
+            flush_interval=flush_interval,
+            fields_to_export=fields,
+        )
+    if export_format == 'sqlite':
+        path = os.path.join(os.path.dirname(os.path.normpath(folder)), DATABASE_NAME)
+        return None, SqliteItemExporter(
+            path, suite, batch_size=batch_size, fields_to_export=fields
+        )
+
+    path = stage_output(staged_output(folder, suite, export_format), resume)
+    header = read_csv_header(path)
+    file = open(path, 'ab')
+    if len(header):
+        exporter = SlotCsvItemExporter(
+            file, include_headers_line=False, fields_to_export=header
+        )
+    else:
+        exporter = SlotCsvItemExporter(file, fields_to_export=fields)
+    return file, exporter
 
-    return f"{folder}/{suite}.csv"
 
+def close_exporter(file, exporter):
+    exporter.finish_exporting()
+    if file is not None:
+        file.close()
 
-class CpuPipeline:
-    cint_name: str
-    rint_name: str
-    cfp_name: str
-    rfp_name: str
-    benchmark: str
 
-    def __init__(self,):
-        self.cint_file = open(get_file_path(self.benchmark, self.cint_name), 'wb')
-        self.rint_file = open(get_file_path(self.benchmark, self.rint_name), 'wb')
-        self.cfp_file = open(get_file_path(self.benchmark, self.cfp_name), 'wb')
-        self.rfp_file = open(get_file_path(self.benchmark, self.rfp_name), 'wb')
-
-        self.cint_exporter = CsvItemExporter(self.cint_file)
-        self.rint_exporter = CsvItemExporter(self.rint_file)
-        self.cfp_exporter = CsvItemExporter(self.cfp_file)
-        self.rfp_exporter = CsvItemExporter(self.rfp_file)
-
-        self.cint_exporter.start_exporting()
-        self.rint_exporter.start_exporting()
-        self.cfp_exporter.start_exporting()
-        self.rfp_exporter.start_exporting()
-
-        self.cint_cnt = 0
-        self.rint_cnt = 0
-        self.cfp_cnt = 0
-        self.rfp_cnt = 0
-
-    def close_siper(self, spider):
-        self.cint_exporter.finish_exporting()
-        self.rfp_exporter.finish_exporting()
-        self.cfp_exporter.finish_exporting()
-        self.rfp_exporter.finish_exporting()
-
-        self.cint_file.close()
-        self.rint_file.close()
-        self.cfp_file.close()
-        self.rfp_file.close()
+class SuitePipeline:
+    """ Route every item to the exporter of its suite, opened with its first item
 
-    def process_item(self, item, spider):
-        # suite: CINT2017_speed, CINT2017_rate, CFP2017_speed, CFP2017_rate
-        if item['Suite'] == self.cint_name:
-            self.cint_exporter.export_item(item)
-            self.cint_cnt += 1
-            spider.logger.info(f"Crawl item {self.cint_cnt} for {self.cint_name}")
-        elif item['Suite'] == self.rint_name:
-            self.rint_exporter.export_item(item)
-            self.rint_cnt += 1
-            spider.logger.info(f"Crawl item {self.rint_cnt} for {self.rint_name}")
-        elif item['Suite'] == self.cfp_name:
-            self.cfp_exporter.export_item(item)
-            self.cfp_cnt += 1
-            spider.logger.info(f"Crawl item {self.cfp_cnt} for {self.cfp_name}")
-        elif item['Suite'] == self.rfp_name:
-            self.rfp_exporter.export_item(item)
-            self.rfp_cnt += 1
-            spider.logger.info(f"Crawl item {self.rfp_cnt} for {self.rfp_name}")
-
-
-class Cpu2017Pipeline(CpuPipeline):
-    # suite: CINT2017_speed, CINT2017_rate, CFP2017_speed, CFP2017_rate
-    cint_name: str = 'CINT2017_speed'
-    rint_name: str = 'CINT2017_rate'
-    cfp_name: str = 'CFP2017_speed'
-    rfp_name: str = 'CFP2017_rate'
-    benchmark: str = 'cpu2017'
-
-    def __init__(self):
-        super().__init__()
-
-
-class Cpu2006Pipeline(CpuPipeline):
-    # suite: SPECint, SPECint_rate, SPECfp, SPECfp_rate
-    cint_name: str = 'SPECint'
-    rint_name: str = 'SPECint_rate'
-    cfp_name: str = 'SPECfp'
-    rfp_name: str = 'SPECfp_rate'
-    benchmark: str = 'cpu2006'
-
-    def __init__(self):
-        super().__init__()
-
-
-class Jbb2015Pipeline:
-    composite_name = 'SPECjbb2015-Composite'
-    multijvm_name = 'SPECjbb2015-MultiJVM'
-    distributed_name = 'SPECjbb2015-Distributed'
-
-    def __init__(self,):
-        self.composite_file = open(get_file_path('jbb2015', self.composite_name), 'wb')
-        self.multijvm_file = open(get_file_path('jbb2015', self.multijvm_name), 'wb')
-        self.distributed_file = open(
-            get_file_path('jbb2015', self.distributed_name), 'wb'
+    A benchmark with several suites lists them, items of other suites pass
+    through to the next pipeline unwritten; otherwise every item goes to the
+    file named after the benchmark.
+    The outputs are moved in place, and the snapshot manifest written, only
+    when the spider finishes.
+    """
+
+    benchmark: str
+    suites: Optional[FrozenSet[str]] = None
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        settings = crawler.settings
+        writer = None
+        if settings.getbool('EXPORT_THREAD'):
+            writer = BackgroundWriter(settings.getint('EXPORT_QUEUE_SIZE'))
+        pipeline = cls(
+            get_snapshot_folder(cls.benchmark, settings),
+            writer=writer,
+            **get_export_options(settings),
         )
+        # close_spider is not told why the spider closed
+        crawler.signals.connect(pipeline.spider_closed, signal=signals.spider_closed)
+        return pipeline
+
+    def __init__(self, folder, writer=None, **options):
+        self.folder = folder
+        self.writer = writer
+        self.options = options
+        self.export_format = options.get('export_format', 'csv')
+        self.batch_size = options.get('batch_size', 1000)
+        # suite: (file, exporter)
+        self.sinks = {}
+        # suite: items exported since its csv file was last flushed
+        self.unflushed = {}
+        self.staged = set()
+
+    def open_spider(self, spider):
+        if self.writer is not None:
+            self.writer.start()
+
+    def get_suite(self, item):
+        if self.suites is None:
+            return self.benchmark
+        suite = item.get('Suite')
+        return suite if suite in self.suites else None
+
+    def _open_sink(self, suite, item):
+        fields = type(item).fields if isinstance(item, SlotItem) else None
+        file, exporter = open_exporter(self.folder, suite, fields, **self.options)
+        path = staged_output(self.folder, suite, self.export_format)
+        if path is not None:
+            self.staged.add(path)
+        exporter.start_exporting()
+        self.sinks[suite] = (file, exporter)
+        return file, exporter
+
+    def _close_sinks(self, _=None):
+        for file, exporter in self.sinks.values():
+            close_exporter(file, exporter)
+        self.sinks.clear()
+
+    def close_spider(self, spider):
+        if self.writer is None:
+            self._close_sinks()
+            return None
+        d = self.writer.stop()
+        # finishing the exporters may write too, keep it off the reactor
+        return d.addCallback(lambda _: threads.deferToThread(self._close_sinks))
+
+    def spider_closed(self, spider, reason):
+        if reason != 'finished':
+            if len(self.staged):
+                spider.logger.warning(
+                    f"Spider closed ({reason}), outputs left staged in {self.folder}"
+                )
+            return None
+        if self.export_format == 'sqlite':
+            return None
+        return threads.deferToThread(finalize_outputs, self.folder, self.staged)
+
+    def _checkpoint(self, suite, file):
+        """ Flush the csv of a suite every batch_size items, so a crash loses
+        at most a batch, which a resumed crawl fetches again; the background
+        writer flushes its own batches """
+        count = self.unflushed.get(suite, 0) + 1
+        if count >= self.batch_size:
+            file.flush()
+            count = 0
+        self.unflushed[suite] = count
 
-        self.composite_exporter = CsvItemExporter(self.composite_file)
-        self.multijvm_exporter = CsvItemExporter(self.multijvm_file)
-        self.distributed_exporter = CsvItemExporter(self.distributed_file)
+    def process_item(self, item, spider):
+        suite = self.get_suite(item)
+        if suite is None:
+            return item
+        file, exporter = self.sinks.get(suite) or self._open_sink(suite, item)
+        # counted by the CrawlProgress extension, only logged one by one to debug
+        if spider.logger.isEnabledFor(logging.DEBUG):
+            spider.logger.debug(f"Crawl item {item.get('URL Suffix')} for {suite}")
 
-        self.composite_exporter.start_exporting()
-        self.multijvm_exporter.start_exporting()
-        self.distributed_exporter.start_exporting()
+        if self.writer is None:
+            exporter.export_item(item)
+            if file is not None:
+                self._checkpoint(suite, file)
+            return item
+        d = self.writer.put(file, exporter, item)
+        if d is None:
+            return item
+        return d.addCallback(lambda _: item)
 
-        self.c_cnt = 0
-        self.m_cnt = 0
-        self.d_cnt = 0
 
-    def close_siper(self, spider):
-        self.composite_exporter.finish_exporting()
-        self.multijvm_exporter.finish_exporting()
-        self.distributed_exporter.finish_exporting()
-        self.composite_file.close()
-        self.multijvm_file.close()
-        self.distributed_file.close()
+class Cpu2017Pipeline(SuitePipeline):
+    benchmark = 'cpu2017'
+    suites = frozenset(
+        ['CINT2017_speed', 'CINT2017_rate', 'CFP2017_speed', 'CFP2017_rate']
+    )
 
-    def process_item(self, item, spider):
-        if item['Suite'] == self.composite_name:
-            self.composite_exporter.export_item(item)
-            self.c_cnt += 1
-            spider.logger.info(f"Crawl item {self.c_cnt} for {self.composite_name}")
-        elif item['Suite'] == self.multijvm_name:
-            self.multijvm_exporter.export_item(item)
-            self.m_cnt += 1
-            spider.logger.info(f"Crawl item {self.m_cnt} for {self.multijvm_name}")
-        elif item['Suite'] == self.distributed_name:
-            self.distributed_exporter.export_item(item)
-            self.d_cnt += 1
-            spider.logger.info(f"Crawl item {self.d_cnt} for {self.distributed_name}")
-
-
-class Jvm2008Pipeline:
-    def __init__(self,):
-        self.file = open(get_file_path('jvm2008', 'jvm2008'), 'wb')
-        self.exporter = CsvItemExporter(self.file)
-        self.exporter.start_exporting()
-        self.cnt = 0
-
-    def close_siper(self, spider):
-        self.exporter.finish_exporting()
-        self.file.close()
 
-    def process_item(self, item, spider):
-        self.exporter.export_item(item)
-        self.cnt += 1
-        spider.logger.info(f"Crawl item {self.cnt} for jvm2008")
+class Cpu2006Pipeline(SuitePipeline):
+    benchmark = 'cpu2006'
+    suites = frozenset(['SPECint', 'SPECint_rate', 'SPECfp', 'SPECfp_rate'])
 
 
-class Ssj2008Pipeline:
-    def __init__(self,):
-        self.file = open(get_file_path('ssj2008', 'ssj2008'), 'wb')
-        self.exporter = CsvItemExporter(self.file)
-        self.exporter.start_exporting()
-        self.cnt = 0
+class Jbb2015Pipeline(SuitePipeline):
+    benchmark = 'jbb2015'
+    suites = frozenset(
+        ['SPECjbb2015-Composite', 'SPECjbb2015-MultiJVM', 'SPECjbb2015-Distributed']
+    )
 
-    def close_siper(self, spider):
-        self.exporter.finish_exporting()
-        self.file.close()
 
-    def process_item(self, item, spider):
-        if item.get('Status') is None:
-            self.exporter.export_item(item)
-            self.cnt += 1
-            spider.logger.info(f"Crawl item {self.cnt} for ssj2008")
+class Jvm2008Pipeline(SuitePipeline):
+    benchmark = 'jvm2008'
+
+
+class Ssj2008Pipeline(SuitePipeline):
+    benchmark = 'ssj2008'
@@ -28,11 +28,45 @@ ROBOTSTXT_OBEY = True
 # Configure a delay for requests for the same website (default: 0)
 # See https://docs.scrapy.org/en/latest/topics/settings.html#download-delay
 # See also autothrottle settings and docs
+# Start delay of the adaptive throttle below
 DOWNLOAD_DELAY = 0.8
 # The download delay setting will honor only one of:
 #CONCURRENT_REQUESTS_PER_DOMAIN = 16
 #CONCURRENT_REQUESTS_PER_IP = 16
 
+# Only request results missing from the earlier snapshots in data/<benchmark>/
+# and merge them into the latest one, e.g. `-s INCREMENTAL=True`
+INCREMENTAL = False
+
+# Results marked NC / non-compliant in the index tables are never requested,
+# list them in data/<benchmark>/non_compliant.txt
+NC_SIDECAR = False
+
+# Keep the pending requests on disk and resume an interrupted crawl into the
+# same snapshot, e.g. `-s JOBDIR=data/jobs/cpu2017` (see bin/crawl_*.sh)
+#JOBDIR = 'data/jobs/<benchmark>'
+
+# Parse the detail pages in that many worker processes instead of the reactor
+# thread, once a higher concurrency makes the crawl CPU bound. At most
+# PARSE_MAX_INFLIGHT pages are queued for the workers (default 2 per worker)
+PARSE_WORKERS = 0
+PARSE_MAX_INFLIGHT = 0
+
+# Write the snapshot as csv files or, with pyarrow installed, as one folder of
+# parquet parts per suite of EXPORT_BATCH_SIZE items each. 'sqlite' upserts
+# every result into data/<benchmark>/results.db instead, committing every
+# EXPORT_BATCH_SIZE items. 'jsonl' appends json lines per suite, fsynced every
+# EXPORT_BATCH_SIZE items or EXPORT_FLUSH_INTERVAL seconds, with a cursor file
+# downstream jobs can follow during the crawl
+EXPORT_FORMAT = 'csv'
+EXPORT_BATCH_SIZE = 1000
+EXPORT_FLUSH_INTERVAL = 5
+
+# Export the items on a writer thread, with at most EXPORT_QUEUE_SIZE of them
+# queued before the crawl waits for the disk
+EXPORT_THREAD = False
+EXPORT_QUEUE_SIZE = 1000
+
 # Disable cookies (enabled by default)
 #COOKIES_ENABLED = False
 
@@ -56,13 +90,48 @@ DOWNLOAD_DELAY = 0.8
 DOWNLOADER_MIDDLEWARES = {
     'spec_spider.middlewares.UserAgentMiddleware': 300,
     'spec_spider.middlewares.SpecSpiderDownloaderMiddleware': 543,
+    # below HttpCompressionMiddleware so the archive sees decoded bodies
+    'spec_spider.middlewares.ArchiveMiddleware': 580,
+    'spec_spider.middlewares.SharedSlotMiddleware': 950,
 }
 
+# Keep every fetched page in a compressed, content-addressed archive, and with
+# ARCHIVE_REPLAY re-parse it offline, e.g. `-s ARCHIVE_REPLAY=True`
+ARCHIVE_ENABLED = False
+ARCHIVE_REPLAY = False
+ARCHIVE_DIR = 'data/archive'
+
+# Delay between requests to a host shared by all the spiders of a process,
+# set by spec_spider/crawl.py in place of DOWNLOAD_DELAY
+SHARED_DOWNLOAD_DELAY = 0
+
 # Enable or disable extensions
 # See https://docs.scrapy.org/en/latest/topics/extensions.html
-#EXTENSIONS = {
+EXTENSIONS = {
 #    'scrapy.extensions.telnet.TelnetConsole': None,
-#}
+    'spec_spider.extensions.AdaptiveThrottle': 500,
+    'spec_spider.extensions.CrawlFrontier': 510,
+    'spec_spider.extensions.CrawlProgress': 520,
+}
+
+# Log a json summary of the crawl progress every PROGRESS_INTERVAL seconds, 0
+# turns it off. It replaces the "Crawled N pages" lines of Scrapy's LogStats
+PROGRESS_INTERVAL = 30
+LOGSTATS_INTERVAL = 0
+
+# Adapt delay and concurrency per host to latency and 429/5xx responses,
+# starting from DOWNLOAD_DELAY, or SHARED_DOWNLOAD_DELAY which it then adapts
+ADAPTIVE_THROTTLE_ENABLED = True
+ADAPTIVE_THROTTLE_MIN_DELAY = 0.2
+ADAPTIVE_THROTTLE_MAX_DELAY = 60
+# Requests in parallel to a host to start from, raised while latencies stay flat
+ADAPTIVE_THROTTLE_START_CONCURRENCY = 1
+# Never send more requests in parallel to a host than this
+ADAPTIVE_THROTTLE_MAX_CONCURRENCY = 4
+# Latency may grow by this factor over the best seen before backing off
+ADAPTIVE_THROTTLE_LATENCY_TOLERANCE = 1.5
+# Log the throttle state for every response
+ADAPTIVE_THROTTLE_DEBUG = False
 
 # Configure item pipelines
 # See https://docs.scrapy.org/en/latest/topics/item-pipeline.html
@@ -0,0 +1,349 @@
+import csv
+import hashlib
+import json
+import os
+import re
+import shutil
+import sys
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Set
+
+from spec_spider.database import DATABASE_NAME, database_url_suffixes
+
+DATA_FOLDER = 'data'
+# snapshots deduplicated by spec_spider/dedup.py
+STORE_FOLDER = 'store'
+SNAPSHOT_PATTERN = re.compile(r'^\d{4}(_\d{2}){5}$')
+# row counts and checksums of the outputs of a finished crawl
+MANIFEST_NAME = 'manifest.json'
+# outputs are written under this suffix until their crawl finishes
+PART_SUFFIX = '.part'
+OUTPUT_EXTENSIONS = ('.csv', '.parquet', '.jsonl')
+
+
+class IncompleteSnapshotError(Exception):
+    """ An output of a snapshot is partial or does not match its manifest """
+
+
+def list_snapshots(benchmark: str, data_folder: str = DATA_FOLDER) -> List[str]:
+    """ List the snapshot folders of a benchmark, oldest first
+    :param benchmark: cpu2017
+    :return: ['data/cpu2017/2022_05_10_21_05_27', 'data/cpu2017/2022_05_11_20_44_51']
+    """
+    root = os.path.join(data_folder, benchmark)
+    if not os.path.isdir(root):
+        return []
+    return [
+        os.path.join(root, name)
+        for name in sorted(os.listdir(root))
+        if SNAPSHOT_PATTERN.match(name) and os.path.isdir(os.path.join(root, name))
+    ]
+
+
+def latest_snapshot(benchmark: str, data_folder: str = DATA_FOLDER) -> Optional[str]:
+    snapshots = list_snapshots(benchmark, data_folder)
+    return snapshots[-1] if len(snapshots) else None
+
+
+def new_snapshot(benchmark: str, data_folder: str = DATA_FOLDER) -> str:
+    now = datetime.now().strftime('%Y_%m_%d_%H_%M_%S')
+    folder = os.path.join(data_folder, benchmark, now)
+    if not os.path.exists(folder):
+        os.makedirs(folder)
+    return folder
+
+
+def read_csv_header(path: str) -> List[str]:
+    if not os.path.exists(path):
+        return []
+    with open(path, newline='', encoding='utf-8') as f:
+        return next(csv.reader(f), [])
+
+
+def trim_partial_rows(folder: str):
+    """ Cut the staged csv outputs of a crawl that stopped abruptly back to
+    their last complete row, each of which the csv writer ends with CRLF """
+    for name in os.listdir(folder):
+        if name.endswith(f".csv{PART_SUFFIX}"):
+            _trim_partial_row(os.path.join(folder, name))
+
+
+def _trim_partial_row(path: str, block: int = 1 << 16):
+    with open(path, 'rb+') as f:
+        size = f.seek(0, os.SEEK_END)
+        start = size
+        while start > 0:
+            start = max(0, start - block)
+            f.seek(start)
+            end = f.read(size - start).rfind(b'\r\n')
+            if end >= 0:
+                f.truncate(start + end + 2)
+                return
+        f.truncate(0)
+
+
+def folder_url_suffixes(folder: str, partial: bool = False) -> Set[str]:
+    """ Collect the `URL Suffix` of every result stored in a snapshot folder,
+    with partial also those of the outputs of an unfinished crawl """
+    suffixes = set()
+    for file_name in os.listdir(folder):
+        name = file_name
+        if name.endswith(PART_SUFFIX):
+            if not partial:
+                continue
+            name = name[: -len(PART_SUFFIX)]
+        if name.endswith('.parquet'):
+            from spec_spider.exporters import read_parquet_column
+
+            path = os.path.join(folder, file_name)
+            suffixes.update(read_parquet_column(path, 'URL Suffix'))
+            continue
+        if name.endswith('.jsonl'):
+            from spec_spider.exporters import read_jsonl_column
+
+            path = os.path.join(folder, file_name)
+            suffixes.update(read_jsonl_column(path, 'URL Suffix'))
+            continue
+        if not name.endswith('.csv'):
+            continue
+        with open(os.path.join(folder, file_name), newline='', encoding='utf-8') as f:
+            reader = csv.reader(f)
+            header = next(reader, [])
+            if 'URL Suffix' not in header:
+                continue
+            idx = header.index('URL Suffix')
+            suffixes.update(row[idx] for row in reader if len(row) > idx)
+    suffixes.discard('')
+    suffixes.discard(None)
+    return suffixes
+
+
+def load_url_suffixes(benchmark: str, data_folder: str = DATA_FOLDER) -> Set[str]:
+    """ Collect the `URL Suffix` of every result captured by earlier crawls """
+    suffixes = set()
+    for folder in list_snapshots(benchmark, data_folder):
+        suffixes.update(folder_url_suffixes(folder))
+    path = os.path.join(data_folder, benchmark, DATABASE_NAME)
+    if os.path.exists(path):
+        suffixes.update(database_url_suffixes(path))
+    manifest_folder = os.path.join(data_folder, benchmark, STORE_FOLDER, 'manifests')
+    if os.path.isdir(manifest_folder):
+        for name in os.listdir(manifest_folder):
+            if not name.endswith('.json'):
+                continue
+            with open(os.path.join(manifest_folder, name), encoding='utf-8') as f:
+                for entry in json.load(f).values():
+                    suffixes.update(suffix for suffix, _ in entry['rows'])
+    suffixes.discard('')
+    return suffixes
+
+
+def jobdir_snapshot(jobdir: str) -> Optional[str]:
+    """ Snapshot folder a resumable crawl in jobdir writes to, if already bound """
+    path = os.path.join(jobdir, 'snapshot')
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        folder = f.read().strip()
+    return folder if os.path.isdir(folder) else None
+
+
+def bind_jobdir_snapshot(jobdir: str, folder: str):
+    if not os.path.exists(jobdir):
+        os.makedirs(jobdir)
+    with open(os.path.join(jobdir, 'snapshot'), 'w') as f:
+        f.write(folder)
+
+
+def stage_output(path: str, resume: bool = False) -> str:
+    """ Path to write an output to until finalize_outputs moves it to path
+
+    The staged copy starts from the finished output, if any, so appending to it
+    leaves path untouched. A resumed crawl carries on with its own staged copy.
+    """
+    part = f"{path}{PART_SUFFIX}"
+    if resume and os.path.exists(part):
+        return part
+    _remove(part)
+    if os.path.isdir(path):
+        shutil.copytree(path, part)
+    elif os.path.exists(path):
+        shutil.copyfile(path, part)
+    return part
+
+
+def _remove(path: str):
+    if os.path.isdir(path):
+        shutil.rmtree(path)
+    elif os.path.exists(path):
+        os.remove(path)
+
+
+def _fsync(path: str):
+    with open(path, 'rb') as f:
+        os.fsync(f.fileno())
+
+
+def finalize_outputs(folder: str, paths: Iterable[str]):
+    """ Move the staged outputs in place, then describe the folder in its manifest """
+    for path in paths:
+        part = f"{path}{PART_SUFFIX}"
+        if not os.path.exists(part):
+            continue
+        if os.path.isfile(part):
+            _fsync(part)
+            os.replace(part, path)
+            continue
+        # a folder cannot replace another one, keep the old one until moved
+        old = f"{path}.old"
+        _remove(old)
+        if os.path.exists(path):
+            os.replace(path, old)
+        os.replace(part, path)
+        _remove(old)
+    write_manifest(folder)
+
+
+def _output_files(path: str) -> List[str]:
+    if os.path.isfile(path):
+        return [path]
+    from spec_spider.exporters import list_parts
+
+    return list_parts(path)
+
+
+def _count_rows(path: str) -> int:
+    if path.endswith('.parquet') and os.path.isdir(path):
+        from spec_spider.exporters import import_pyarrow
+
+        pa = import_pyarrow()
+        return sum(
+            pa.parquet.ParquetFile(part).metadata.num_rows
+            for part in _output_files(path)
+        )
+    with open(path, newline='', encoding='utf-8') as f:
+        if path.endswith('.jsonl'):
+            return sum(1 for _ in f)
+        return max(sum(1 for _ in csv.reader(f)) - 1, 0)
+
+
+def _output_size(path: str) -> int:
+    return sum(os.path.getsize(file) for file in _output_files(path))
+
+
+def describe_output(path: str, rows: bool = True) -> Dict:
+    """ Size and sha256 of an output, a file or a folder of parquet parts, and
+    its number of rows """
+    digest = hashlib.sha256()
+    size = 0
+    for file in _output_files(path):
+        with open(file, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                digest.update(chunk)
+                size += len(chunk)
+    entry = {'size': size, 'sha256': digest.hexdigest()}
+    if rows:
+        entry['rows'] = _count_rows(path)
+    return entry
+
+
+def list_outputs(folder: str) -> List[str]:
+    return sorted(
+        name for name in os.listdir(folder) if name.endswith(OUTPUT_EXTENSIONS)
+    )
+
+
+def write_manifest(folder: str):
+    manifest = {
+        'finished': datetime.now().isoformat(timespec='seconds'),
+        'files': {
+            name: describe_output(os.path.join(folder, name))
+            for name in list_outputs(folder)
+        },
+    }
+    path = os.path.join(folder, MANIFEST_NAME)
+    with open(f"{path}.tmp", 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(f"{path}.tmp", path)
+
+
+def read_manifest(folder: str) -> Optional[Dict]:
+    path = os.path.join(folder, MANIFEST_NAME)
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def verify_output(path: str):
+    """ Raise IncompleteSnapshotError unless path is an output of a finished crawl
+
+    Outputs of a folder with a manifest must match their entry, size first, then
+    checksum, which is only computed when the sizes match. A json lines file
+    must have been closed by its exporter, manifest or not. Folders written
+    before manifests existed are otherwise only refused when they hold nothing
+    but the staged copy of the output.
+    """
+    folder, name = os.path.split(path)
+    if not os.path.exists(path):
+        if os.path.exists(f"{path}{PART_SUFFIX}"):
+            raise IncompleteSnapshotError(f"{path} was never finalized, its crawl died")
+        return
+    if path.endswith('.jsonl'):
+        from spec_spider.exporters import read_cursor
+
+        if not read_cursor(path)['closed']:
+            raise IncompleteSnapshotError(
+                f"{path} was not closed by its exporter, its crawl died or still runs"
+            )
+    manifest = read_manifest(folder or '.')
+    if manifest is None:
+        return
+    entry = manifest['files'].get(name)
+    if entry is None:
+        raise IncompleteSnapshotError(f"{path} is not in the manifest of {folder}")
+    size = _output_size(path)
+    if size != entry['size']:
+        raise IncompleteSnapshotError(
+            f"{path} has {size} bytes, its manifest {entry['size']}"
+        )
+    if describe_output(path, rows=False)['sha256'] != entry['sha256']:
+        raise IncompleteSnapshotError(f"{path} does not match its manifest checksum")
+
+
+def verify_snapshot(folder: str) -> List[str]:
+    """ Problems found in a snapshot folder, none when its crawl finished and its
+    outputs are as it left them """
+    manifest = read_manifest(folder)
+    if manifest is None:
+        return [f"{folder} has no {MANIFEST_NAME}"]
+    problems = []
+    outputs = list_outputs(folder)
+    staged = [
+        name[: -len(PART_SUFFIX)]
+        for name in os.listdir(folder)
+        if name.endswith(PART_SUFFIX)
+    ]
+    for name in sorted(set(manifest['files']) | set(outputs) | set(staged)):
+        path = os.path.join(folder, name)
+        if name not in outputs and name not in staged:
+            problems.append(f"{path} is missing")
+            continue
+        try:
+            verify_output(path)
+        except IncompleteSnapshotError as e:
+            problems.append(str(e))
+    return problems
+
+
+if __name__ == '__main__':
+    # python spec_spider/snapshot.py cpu2017, or a snapshot folder
+    folders = list_snapshots(sys.argv[1]) or sys.argv[1:]
+    failed = False
+    for folder in folders:
+        problems = verify_snapshot(folder)
+        print(f"{folder}: {'ok' if not problems else 'INCOMPLETE'}")
+        for problem in problems:
+            print(f"  {problem}")
+        failed = failed or len(problems) > 0
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,157 @@
+import os
+
+import scrapy
+from twisted.internet import defer
+
+from spec_spider.items import UNDECLARED, get_item_class
+from spec_spider.snapshot import (
+    DATA_FOLDER,
+    folder_url_suffixes,
+    jobdir_snapshot,
+    load_url_suffixes,
+)
+from spec_spider.workers import ParsePool
+
+NC_TEXTS = {'nc', 'non-compliant', 'non compliant'}
+NC_CLASSES = {'nc', 'noncompliant', 'non-compliant'}
+
+
+class SpecSpider(scrapy.Spider):
+    """ Common behaviour of the SPEC result spiders
+
+    The spider name doubles as the benchmark folder under `data/`. Detail pages
+    go through `parse_detail`, which hands them to `extract_detail`, in the
+    PARSE_WORKERS processes when set, and turns the dict it returns into the
+    declared item of its suite.
+
+    Every spider defines `extract_detail(self, response, **cb_kwargs)`, called
+    with the cb_kwargs of its detail requests. It must return a plain dict
+    built from the response alone, as it may run on a fresh spider in a worker
+    process, see `offload`.
+    """
+
+    _seen_suffixes = None
+    _non_compliant = None
+    _undeclared_fields = None
+    parse_pool = None
+
+    @classmethod
+    def from_crawler(cls, crawler, *args, **kwargs):
+        spider = super().from_crawler(crawler, *args, **kwargs)
+        workers = crawler.settings.getint('PARSE_WORKERS')
+        if workers > 0:
+            max_inflight = crawler.settings.getint('PARSE_MAX_INFLIGHT') or 2 * workers
+            spider.parse_pool = ParsePool(workers, max_inflight)
+        return spider
+
+    def parse_detail(self, response, **kwargs):
+        return self.offload_item(self.extract_detail, response, **kwargs)
+
+    def offload(self, parser, response, **kwargs):
+        """ Call parser(response, **kwargs), a method of the spider, in the parse
+        pool when there is one. It then returns a Deferred, and the parser runs
+        on a fresh spider without crawler: it may only build a plain dict """
+        if self.parse_pool is None:
+            return parser(response, **kwargs)
+        return self.parse_pool.submit(type(self), parser.__name__, response, kwargs)
+
+    def offload_item(self, parser, response, **kwargs):
+        """ offload, then make_item of the dict parser returns """
+        result = self.offload(parser, response, **kwargs)
+        if isinstance(result, defer.Deferred):
+            return result.addCallback(self.make_item)
+        return self.make_item(result)
+
+    def make_item(self, data):
+        """ Declared item of the suite of data, see items.py
+
+        Fields the schema does not declare are kept, as a json object, in the
+        UNDECLARED column of the suite, with a warning the first time
+        each of them shows up so it gets declared.
+        """
+        item_class = get_item_class(self.name, data.get('Suite'))
+        if item_class is None:
+            self.logger.warning(f"No item declared for suite {data.get('Suite')}")
+            return data
+        item, undeclared = item_class.from_dict(data)
+        if len(undeclared):
+            self._warn_undeclared(item_class, undeclared)
+        return item
+
+    def _warn_undeclared(self, item_class, undeclared):
+        if self._undeclared_fields is None:
+            self._undeclared_fields = set()
+        self.crawler.stats.inc_value('item/undeclared_fields', len(undeclared))
+        for name in undeclared:
+            if (item_class, name) not in self._undeclared_fields:
+                self._undeclared_fields.add((item_class, name))
+                self.logger.warning(
+                    f"{item_class.__name__} does not declare {name}, kept in "
+                    f"{UNDECLARED}"
+                )
+
+    def is_seen(self, url_suffix):
+        """ Whether the result is already stored, by an earlier incremental crawl
+        or by the interrupted crawl being resumed """
+        if self._seen_suffixes is None:
+            self._seen_suffixes = self._load_seen_suffixes()
+        if url_suffix in self._seen_suffixes:
+            self.crawler.stats.inc_value('frontier/skipped')
+            return True
+        return False
+
+    def _load_seen_suffixes(self):
+        suffixes = set()
+        if self.settings.getbool('INCREMENTAL'):
+            suffixes.update(load_url_suffixes(self.name))
+            self.logger.info(
+                f"Incremental crawl: {len(suffixes)} results already captured"
+            )
+        jobdir = self.settings.get('JOBDIR')
+        folder = jobdir_snapshot(jobdir) if jobdir else None
+        if folder is not None:
+            checkpointed = folder_url_suffixes(folder, partial=True)
+            suffixes.update(checkpointed)
+            if len(checkpointed):
+                self.logger.info(
+                    f"Resuming into {folder}: {len(checkpointed)} results checkpointed"
+                )
+        return suffixes
+
+    def is_non_compliant(self, tr_selector, url_suffix):
+        """ Whether an index row marks its result as NC / non-compliant, whose
+        detail page would only be thrown away """
+        texts = {text.strip().lower() for text in tr_selector.css('td ::text').getall()}
+        classes = {
+            name
+            for value in tr_selector.xpath('descendant-or-self::*/@class').getall()
+            for name in value.lower().split()
+        }
+        if not (texts & NC_TEXTS or classes & NC_CLASSES):
+            return False
+        self.mark_non_compliant(url_suffix)
+        return True
+
+    def mark_non_compliant(self, url_suffix):
+        if self._non_compliant is None:
+            self._non_compliant = set()
+        self._non_compliant.add(url_suffix)
+        self.crawler.stats.inc_value('frontier/non_compliant')
+
+    def closed(self, reason):
+        if self.parse_pool is not None:
+            self.parse_pool.shutdown()
+        if self._non_compliant and self.settings.getbool('NC_SIDECAR'):
+            self._write_nc_sidecar()
+
+    def _write_nc_sidecar(self):
+        """ Merge the skipped results into data/<benchmark>/non_compliant.txt """
+        path = os.path.join(DATA_FOLDER, self.name, 'non_compliant.txt')
+        suffixes = set(self._non_compliant)
+        if os.path.exists(path):
+            with open(path) as f:
+                suffixes.update(line.strip() for line in f if line.strip())
+        elif not os.path.exists(os.path.dirname(path)):
+            os.makedirs(os.path.dirname(path))
+        with open(path, 'w') as f:
+            f.writelines(f"{suffix}\n" for suffix in sorted(suffixes))
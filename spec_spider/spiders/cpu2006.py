@@ -1,9 +1,12 @@
 import scrapy
 
+from spec_spider.extraction import ExtractionPlan
+from spec_spider.items import CPU2006_HARDWARE, CPU2006_SOFTWARE
+from spec_spider.spiders.base import SpecSpider
 from spec_spider.utils import delete_tag_and_br, get_detail_url
 
 
-class Cpu2006Spider(scrapy.Spider):
+class Cpu2006Spider(SpecSpider):
     name = 'cpu2006'
     allowed_domains = ['spec.org']
     start_urls = [
@@ -16,6 +19,25 @@ class Cpu2006Spider(scrapy.Spider):
         'ITEM_PIPELINES': {'spec_spider.pipelines.Cpu2006Pipeline': 300,}
     }
 
+    plan = ExtractionPlan(
+        {
+            'system_bar': '.systembar p',
+            'metric': '.metricbar#base a::text',
+            'baseline': '.metricbar#base span.value::text',
+            'license': '#license_num_val::text',
+            'test_sponsor': '#test_sponsor_val::text',
+            'tested_by': '#tester_val::text',
+            'test_date': '#test_date_val::text',
+            'hw_avail': '#hw_avail_val::text',
+            'sw_avail': '#sw_avail_val::text',
+            'hardware': '#Hardware tbody td',
+            'software': '#Software tbody td',
+            'benchmarks': '.resultstable tbody td.bm a::text',
+            'ratios': 'td.basecol.ratio.selected span.selected::text',
+            'base_copies': 'td.basecol.bm::text',
+        }
+    )
+
     def parse(self, response):
         # suite: SPECint, SPECint_rate, SPECfp, SPECfp_rate
         suite = response.css('.idx_table h2 a::attr(name)').get()
@@ -23,6 +45,10 @@ class Cpu2006Spider(scrapy.Spider):
             url_suffix = tr_selector.css('a::attr(href)').get()
             if url_suffix is None or (url_suffix is not None and len(url_suffix) == 0):
                 continue
+            if self.is_seen(url_suffix):
+                continue
+            if self.is_non_compliant(tr_selector, url_suffix):
+                continue
             detail_url = get_detail_url(response.url, url_suffix)
             yield scrapy.Request(
                 detail_url,
@@ -30,84 +56,53 @@ class Cpu2006Spider(scrapy.Spider):
                 cb_kwargs={'url_suffix': url_suffix, 'suite': suite},
             )
 
-    def parse_detail(self, response, url_suffix, suite):
-
-        info_dict = self._parse_info(response)
-        benchmark_dict = self._parse_benchmark(response, suite)
+    def extract_detail(self, response, url_suffix, suite):
+        page = self.plan.extract(response)
+        info_dict = self._parse_info(page)
+        benchmark_dict = self._parse_benchmark(page, suite)
         return {'Suite': suite, **info_dict, **benchmark_dict, 'URL Suffix': url_suffix}
 
-    def _parse_hw_info(self, response):
-        hw_keys = [
-            'CPU Name',
-            'CPU Characteristics',
-            'CPU MHz',
-            'FPU',
-            'CPU(s) enabled',
-            'CPU(s) orderable',
-            'Primary Cache',
-            'Secondary Cache',
-            'L3 Cache',
-            'Other Cache',
-            'Memory',
-            'Disk Subsystem',
-            'Other Hardware',
-        ]
-        hw_values = [
-            delete_tag_and_br(value)
-            for value in response.css('#Hardware tbody td').getall()
-        ]
+    def _parse_hw_info(self, page):
+        hw_keys = CPU2006_HARDWARE
+        hw_values = [delete_tag_and_br(value) for value in page['hardware'].getall()]
         hw_values = hw_values[: len(hw_keys)]
         return {k: v for k, v in zip(hw_keys, hw_values)}
 
-    def _parse_sw_info(self, response):
-        sw_keys = [
-            'OS',
-            'Compiler',
-            'Parallel',
-            'File System',
-            'System State',
-            'Base Pointers',
-            'Peak Pointers',
-            'Other Software',
-        ]
-        sw_values = [
-            delete_tag_and_br(value)
-            for value in response.css('#Software tbody td').getall()
-        ]
+    def _parse_sw_info(self, page):
+        sw_keys = CPU2006_SOFTWARE
+        sw_values = [delete_tag_and_br(value) for value in page['software'].getall()]
         sw_values = sw_values[: len(sw_keys)]
         return {k: v for k, v in zip(sw_keys, sw_values)}
 
-    def _parse_info(self, response):
-        system_bar = [
-            delete_tag_and_br(item) for item in response.css('.systembar p').getall()
-        ]
-        hw_dict = self._parse_hw_info(response)
-        sw_dict = self._parse_sw_info(response)
+    def _parse_info(self, page):
+        system_bar = [delete_tag_and_br(item) for item in page['system_bar'].getall()]
+        hw_dict = self._parse_hw_info(page)
+        sw_dict = self._parse_sw_info(page)
         return {
             'Hardware Vendor': system_bar[0],
             'System Name': system_bar[1],
-            'Metric': response.css('.metricbar#base a::text').get(),
-            'Baseline': response.css('.metricbar#base span.value::text').get(),
-            'License': response.css('#license_num_val::text').get(),
-            'Test Sponsor': response.css('#test_sponsor_val::text').get(),
-            'Tested By': response.css('#tester_val::text').get(),
-            'Test Date': response.css('#test_date_val::text').get(),
-            'HW Avail': response.css('#hw_avail_val::text').get(),
-            'SW Avail': response.css('#sw_avail_val::text').get(),
+            'Metric': page['metric'].get(),
+            'Baseline': page['baseline'].get(),
+            'License': page['license'].get(),
+            'Test Sponsor': page['test_sponsor'].get(),
+            'Tested By': page['tested_by'].get(),
+            'Test Date': page['test_date'].get(),
+            'HW Avail': page['hw_avail'].get(),
+            'SW Avail': page['sw_avail'].get(),
             **hw_dict,
             **sw_dict,
         }
 
-    def _parse_benchmark(self, response, suite):
+    def _parse_benchmark(self, page, suite):
         benchmark_dict = {
             k: v
             for k, v in zip(
-                response.css('.resultstable tbody td.bm a::text').getall(),
-                response.css('td.basecol.ratio.selected span.selected::text').getall(),
+                page['benchmarks'].getall(),
+                page['ratios'].getall(),
             )
         }
         if suite[-4:] == 'rate':
-            base_copies = response.css('td.basecol.bm::text').get()
+            base_copies = page['base_copies'].get()
             benchmark_dict['Base Copies'] = base_copies
         return benchmark_dict
 
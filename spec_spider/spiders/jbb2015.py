@@ -1,10 +1,12 @@
 import scrapy
 from scrapy.selector import SelectorList
 
+from spec_spider.extraction import ExtractionPlan
+from spec_spider.spiders.base import SpecSpider
 from spec_spider.utils import delete_tag_and_br, get_detail_url
 
 
-class Jbb2015Spider(scrapy.Spider):
+class Jbb2015Spider(SpecSpider):
     name = 'jbb2015'
     allowed_domains = ['spec.org']
     start_urls = [
@@ -16,12 +18,20 @@ class Jbb2015Spider(scrapy.Spider):
         'ITEM_PIPELINES': {'spec_spider.pipelines.Jbb2015Pipeline': 300,}
     }
 
+    plan = ExtractionPlan(
+        {'main_desc': '.section.mainDesc tr', 'tables': 'table.alternate',}
+    )
+
     def parse(self, response):
         suite = response.css('.idx_table h2 a::attr(name)').get()
         for tr_selector in response.css('tbody tr'):
             url_suffix = tr_selector.css('a::attr(href)').get()
             if url_suffix is None or (url_suffix is not None and len(url_suffix) == 0):
                 continue
+            if self.is_seen(url_suffix):
+                continue
+            if self.is_non_compliant(tr_selector, url_suffix):
+                continue
             max_jOPS, critical_jOPS = tr_selector.css('td::text').getall()[-2:]
             detail_url = get_detail_url(response.url, url_suffix)
 
@@ -36,18 +46,20 @@ class Jbb2015Spider(scrapy.Spider):
                 },
             )
 
-    def parse_detail(self, response, url_suffix, suite, max_jOPS, critical_jOPS):
+    def extract_detail(self, response, url_suffix, suite, max_jOPS, critical_jOPS):
+        page = self.plan.extract(response)
+        main_desc = page['main_desc'][1:]
         top_bar_dict = {
             k: v
             for k, v in zip(
-                response.css('.section.mainDesc tr')[1:].css('td a::text').getall(),
-                response.css('.section.mainDesc tr')[1:].css('td::text').getall(),
+                main_desc.css('td a::text').getall(),
+                main_desc.css('td::text').getall(),
             )
         }
 
-        overall_dict = self.parse_overall_sut(response)
-        hw_dict = self._parse_hw(response)
-        sw_dict = self._parse_sw(response)
+        overall_dict = self.parse_overall_sut(page)
+        hw_dict = self._parse_hw(page)
+        sw_dict = self._parse_sw(page)
 
         return {
             'Suite': suite,
@@ -60,8 +72,8 @@ class Jbb2015Spider(scrapy.Spider):
             'URL Suffix': url_suffix,
         }
 
-    def parse_overall_sut(self, response):
-        selector = response.css('table.alternate')[1].css('tr')
+    def parse_overall_sut(self, page):
+        selector = page['tables'][1].css('tr')
         trs = SelectorList()
         [trs.append(selector[idx]) for idx in [0, 4, 6, 8, 9, 10, 11, 12]]
         return {
@@ -69,10 +81,10 @@ class Jbb2015Spider(scrapy.Spider):
             for k, v in zip(trs.css('a::text').getall(), trs.css('td::text').getall())
         }
 
-    def _parse_hw(self, response):
+    def _parse_hw(self, page):
         indices = [i for i in range(29)]
         indices = indices[1:2] + indices[6:16] + indices[17:]
-        hw_dict = self._get_dict(response, 2, indices)
+        hw_dict = self._get_dict(page, 2, indices)
         hw_dict['System Name'] = hw_dict.pop('Name')
         return hw_dict
                 
@@ -84,21 +96,21 @@ class Jbb2015Spider(scrapy.Spider):
         # hw_dict['System Name'] = hw_dict.pop('Name')
         # return hw_dict
 
-    def _parse_sw(self, response):
-        os_dict = self._get_dict(response, 3, [1, 2, 4])
+    def _parse_sw(self, page):
+        os_dict = self._get_dict(page, 3, [1, 2, 4])
         os_dict['OS Name'] = os_dict.pop('Name')
         os_dict['OS Vendor'] = os_dict.pop('Vendor')
         os_dict['OS Version'] = os_dict.pop('Version')
 
-        jvm_dict = self._get_dict(response, 3, [9, 10, 12])
+        jvm_dict = self._get_dict(page, 3, [9, 10, 12])
         jvm_dict['JVM Name'] = jvm_dict.pop('Name')
         jvm_dict['JVM Vendor'] = jvm_dict.pop('Vendor')
         jvm_dict['JVM Version'] = jvm_dict.pop('Version')
 
         return {**os_dict, **jvm_dict}
 
-    def _get_dict(self, response, sid, tr_ids):
-        selector = response.css('table.alternate')[sid].css('tr')
+    def _get_dict(self, page, sid, tr_ids):
+        selector = page['tables'][sid].css('tr')
         keys, values = [], []
         for idx, tr in enumerate(selector):
             if idx not in tr_ids:
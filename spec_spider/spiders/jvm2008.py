@@ -1,15 +1,28 @@
+import csv
+import os
+import posixpath
+
 import scrapy
 
+from spec_spider.snapshot import DATA_FOLDER
+from spec_spider.extraction import ExtractionPlan
+from spec_spider.spiders.base import SpecSpider
 from spec_spider.utils import delete_tag_and_br, get_detail_url
 
 
-class Jvm2008Spider(scrapy.Spider):
+class Jvm2008Spider(SpecSpider):
     name = 'jvm2008'
     allowed_domains = ['spec.org']
     start_urls = ['http://spec.org/jvm2008/results/jvm2008.html']
     custom_settings = {
         'ITEM_PIPELINES': {'spec_spider.pipelines.Jvm2008Pipeline': 300,}
     }
+    # URL Suffix -> (Final Suffix, Result) learnt from the intermediate pages
+    hops_path = os.path.join(DATA_FOLDER, 'jvm2008', 'final_urls.csv')
+    _hops = None
+    _hops_file = None
+    hop_plan = ExtractionPlan({'rows': 'tbody tr'})
+    plan = ExtractionPlan({'tables': 'table tbody table'})
 
     def parse(self, response):
         suite = response.css('.idx_table h2 a::attr(name)').get()
@@ -17,6 +30,24 @@ class Jvm2008Spider(scrapy.Spider):
             url_suffix = tr_selector.css('a::attr(href)').get()
             if url_suffix is None or (url_suffix is not None and len(url_suffix) == 0):
                 continue
+            if self.is_seen(url_suffix):
+                continue
+            if self.is_non_compliant(tr_selector, url_suffix):
+                continue
+            hop = self.hops.get(url_suffix)
+            if hop is not None:
+                final_suffix, result = hop
+                self.crawler.stats.inc_value('jvm2008/hop_cached')
+                yield scrapy.Request(
+                    get_detail_url(response.url, final_suffix),
+                    callback=self.parse_detail_2,
+                    cb_kwargs={
+                        'url_suffix': url_suffix,
+                        'suite': suite,
+                        'result': result,
+                    },
+                )
+                continue
             detail_url = get_detail_url(response.url, url_suffix)
 
             yield scrapy.Request(
@@ -26,7 +57,7 @@ class Jvm2008Spider(scrapy.Spider):
             )
 
     def parse_detail(self, response, url_suffix, suite):
-        trs = response.css('tbody tr')
+        trs = self.hop_plan.extract(response)['rows']
         href = trs[-2].css('a::attr(href)').get()
         result = trs[-4].css('td::text').getall()[-1]
         if href is None:
@@ -34,14 +65,52 @@ class Jvm2008Spider(scrapy.Spider):
             result = trs[-3].css('td::text').getall()[-1]
 
         detail_url = get_detail_url(response.url, href[2:])
+        final_suffix = posixpath.join(posixpath.dirname(url_suffix), href[2:])
+        self._save_hop(url_suffix, final_suffix, result)
         yield scrapy.Request(
             detail_url,
             callback=self.parse_detail_2,
             cb_kwargs={'url_suffix': url_suffix, 'suite': suite, 'result': result},
         )
 
-    def parse_detail_2(self, response, url_suffix, suite, result):
-        selectors = response.css('table tbody table')
+    @property
+    def hops(self):
+        """ The intermediate page is fetched at most once per result, later
+        crawls go straight to the final page """
+        if self._hops is None:
+            self._hops = {}
+            if os.path.exists(self.hops_path):
+                with open(self.hops_path, newline='', encoding='utf-8') as f:
+                    for row in csv.DictReader(f):
+                        self._hops[row['URL Suffix']] = (
+                            row['Final Suffix'],
+                            row['Result'],
+                        )
+        return self._hops
+
+    def _save_hop(self, url_suffix, final_suffix, result):
+        if self._hops_file is None:
+            is_new = not os.path.exists(self.hops_path)
+            if is_new and not os.path.exists(os.path.dirname(self.hops_path)):
+                os.makedirs(os.path.dirname(self.hops_path))
+            self._hops_file = open(self.hops_path, 'a', newline='', encoding='utf-8')
+            self._hops_writer = csv.writer(self._hops_file)
+            if is_new:
+                self._hops_writer.writerow(['URL Suffix', 'Final Suffix', 'Result'])
+        self._hops_writer.writerow([url_suffix, final_suffix, result])
+        self._hops_file.flush()
+        self.hops[url_suffix] = (final_suffix, result)
+
+    def closed(self, reason):
+        super().closed(reason)
+        if self._hops_file is not None:
+            self._hops_file.close()
+
+    def parse_detail_2(self, response, **kwargs):
+        return self.offload_item(self.extract_detail, response, **kwargs)
+
+    def extract_detail(self, response, url_suffix, suite, result):
+        selectors = self.plan.extract(response)['tables']
         info_dict = self._parse_info(selectors[0])
         sw_dict = self._parse_sw(selectors[1])
         jvm_dict = self._parse_jvm(selectors[2])
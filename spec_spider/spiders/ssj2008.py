@@ -1,10 +1,13 @@
 import re
 import scrapy
+from twisted.internet import defer
 
+from spec_spider.extraction import ExtractionPlan
+from spec_spider.spiders.base import SpecSpider
 from spec_spider.utils import delete_tag_and_br, get_detail_url
 
 
-class Ssj2008Spider(scrapy.Spider):
+class Ssj2008Spider(SpecSpider):
     name = 'ssj2008'
     allowed_domains = ['spec.org']
     start_urls = ['http://spec.org/power_ssj2008/results/power_ssj2008.html']
@@ -12,11 +15,25 @@ class Ssj2008Spider(scrapy.Spider):
         'ITEM_PIPELINES': {'spec_spider.pipelines.Ssj2008Pipeline': 300,}
     }
 
+    plan = ExtractionPlan(
+        {
+            'noncompliant': '.noncompliant',
+            'benchmark_name': '.benchmarkName::text',
+            'result_header': '.resultHeader tbody td',
+            'results': '.resultsTable tbody tr',
+            'config': '.configSection tbody',
+        }
+    )
+
     def parse(self, response):
         for tr_selector in response.css('tbody tr'):
             url_suffix = tr_selector.css('a::attr(href)').get()
             if url_suffix is None or (url_suffix is not None and len(url_suffix) == 0):
                 continue
+            if self.is_seen(url_suffix):
+                continue
+            if self.is_non_compliant(tr_selector, url_suffix):
+                continue
             detail_url = get_detail_url(response.url, url_suffix)
             yield scrapy.Request(
                 detail_url,
@@ -24,15 +41,27 @@ class Ssj2008Spider(scrapy.Spider):
                 cb_kwargs={'url_suffix': url_suffix},
             )
 
-    def parse_detail(self, response, url_suffix):
-        if response.css('.noncompliant').get() is not None:
-            return {'Status': 'Non-Compliant'}
+    def parse_detail(self, response, **kwargs):
+        d = defer.maybeDeferred(self.offload, self.extract_detail, response, **kwargs)
+        return d.addCallback(self._check_compliance)
+
+    def _check_compliance(self, data):
+        if data.get('Status') == 'Non-Compliant':
+            # not flagged in the index table
+            self.mark_non_compliant(data['URL Suffix'])
+            return None
+        return self.make_item(data)
+
+    def extract_detail(self, response, url_suffix):
+        page = self.plan.extract(response)
+        if page['noncompliant'].get() is not None:
+            return {'Status': 'Non-Compliant', 'URL Suffix': url_suffix}
 
-        suite = delete_tag_and_br(response.css('.benchmarkName::text').get())
-        info_dict = self._parse_info(response)
-        bm_dict = self._parse_benchmark(response)
+        suite = delete_tag_and_br(page['benchmark_name'].get())
+        info_dict = self._parse_info(page)
+        bm_dict = self._parse_benchmark(page)
         hw_dict, sw_dict = {}, {}
-        for tbody in response.css('.configSection tbody'):
+        for tbody in page['config']:
             first_key = tbody.css('tr a::text').get()
             keys = tbody.css('tr a::text').getall()
             if len(keys) > 25 and 'Hardware Vendor' in first_key:
@@ -48,8 +77,8 @@ class Ssj2008Spider(scrapy.Spider):
             'URL Suffix': url_suffix,
         }
 
-    def _parse_info(self, response):
-        items = response.css('.resultHeader tbody td').getall()[2:]
+    def _parse_info(self, page):
+        items = page['result_header'].getall()[2:]
         items = [re.sub(':', '', delete_tag_and_br(item)) for item in items]
         info_dict = {k: v for k, v in zip(items[::2], items[1::2])}
         info_dict.pop('Test Location', None)
@@ -58,8 +87,8 @@ class Ssj2008Spider(scrapy.Spider):
         info_dict.pop('Power Provisioning', None)
         return info_dict
 
-    def _parse_benchmark(self, response):
-        trs = response.css('.resultsTable tbody tr')
+    def _parse_benchmark(self, page):
+        trs = page['results']
         bm_dict = {}
         for tr in trs[:10]:
             tds = tr.css('td::text').getall()
@@ -0,0 +1,140 @@
+import hashlib
+import os
+import zlib
+from typing import Dict, Iterator, Optional, Tuple
+
+
+class ContentStore:
+    """ Content-addressed blobs packed into a single file
+
+    `<name>.pack` holds the zlib-compressed blobs back to back, `<name>.idx`
+    maps the sha1 digest of each blob to its offset and length in the pack.
+    A blob is stored once however many times it is put.
+    """
+
+    def __init__(self, folder: str, name: str = 'blobs'):
+        if not os.path.exists(folder):
+            os.makedirs(folder)
+        self.pack_path = os.path.join(folder, f"{name}.pack")
+        self.index_path = os.path.join(folder, f"{name}.idx")
+        self.index: Dict[str, Tuple[int, int]] = {}
+
+        if os.path.exists(self.index_path):
+            with open(self.index_path) as f:
+                for line in f:
+                    items = line.split()
+                    # skip a line torn by a crash while it was written
+                    if len(items) == 3 and line.endswith('\n'):
+                        self.index[items[0]] = (int(items[1]), int(items[2]))
+
+        self.pack = open(self.pack_path, 'a+b')
+        self.index_file = open(self.index_path, 'a')
+
+    def __contains__(self, digest: str) -> bool:
+        return digest in self.index
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def put(self, data: bytes) -> str:
+        digest = hashlib.sha1(data).hexdigest()
+        if digest in self.index:
+            return digest
+        blob = zlib.compress(data)
+        self.pack.seek(0, os.SEEK_END)
+        offset = self.pack.tell()
+        self.pack.write(blob)
+        # the blob must be on disk before the index points at it
+        self.pack.flush()
+        self.index[digest] = (offset, len(blob))
+        self.index_file.write(f"{digest} {offset} {len(blob)}\n")
+        self.index_file.flush()
+        return digest
+
+    def get(self, digest: str) -> bytes:
+        offset, length = self.index[digest]
+        self.pack.seek(offset)
+        return zlib.decompress(self.pack.read(length))
+
+    def flush(self):
+        self.pack.flush()
+        self.index_file.flush()
+
+    def close(self):
+        self.pack.close()
+        self.index_file.close()
+
+
+def url_key(url: str) -> str:
+    """ Archive key of an url, http and https share it
+    :param url: https://spec.org/cpu2017/results/cint2017.html
+    :return: spec.org/cpu2017/results/cint2017.html
+    """
+    return url.split('://', 1)[-1]
+
+
+class HtmlArchive:
+    """ Fetched pages kept in a ContentStore, looked up by url
+
+    `urls.idx` records `<url key> <digest> <encoding>` per fetch, the last
+    record of an url wins.
+    """
+
+    _opened: Dict[str, 'HtmlArchive'] = {}
+
+    def __init__(self, folder: str):
+        self.store = ContentStore(folder, 'pages')
+        self.urls_path = os.path.join(folder, 'urls.idx')
+        self.urls: Dict[str, Tuple[str, str]] = {}
+
+        if os.path.exists(self.urls_path):
+            with open(self.urls_path) as f:
+                for line in f:
+                    items = line.split('\t')
+                    if len(items) == 3 and line.endswith('\n'):
+                        self.urls[items[0]] = (items[1], items[2].rstrip('\n'))
+
+        self.urls_file = open(self.urls_path, 'a')
+
+    @classmethod
+    def open(cls, folder: str) -> 'HtmlArchive':
+        """ Share one archive per folder, e.g. between crawlers of a process """
+        folder = os.path.abspath(folder)
+        if folder not in cls._opened:
+            cls._opened[folder] = cls(folder)
+        return cls._opened[folder]
+
+    def __contains__(self, url: str) -> bool:
+        return url_key(url) in self.urls
+
+    def __len__(self) -> int:
+        return len(self.urls)
+
+    def put(self, url: str, body: bytes, encoding: str):
+        key = url_key(url)
+        digest = self.store.put(body)
+        if self.urls.get(key) == (digest, encoding):
+            return
+        self.urls[key] = (digest, encoding)
+        self.urls_file.write(f"{key}\t{digest}\t{encoding}\n")
+        self.urls_file.flush()
+
+    def get(self, url: str) -> Optional[Tuple[bytes, str]]:
+        record = self.urls.get(url_key(url))
+        if record is None:
+            return None
+        digest, encoding = record
+        return self.store.get(digest), encoding
+
+    def iter_pages(self, prefix: str = '') -> Iterator[Tuple[str, bytes, str]]:
+        """ Yield (url, body, encoding) of the archived pages under prefix
+        :param prefix: spec.org/cpu2017/results/res
+        """
+        for key in sorted(self.urls):
+            if key.startswith(prefix):
+                body, encoding = self.get(key)
+                yield f"https://{key}", body, encoding
+
+    def flush(self):
+        self.store.flush()
+        self.urls_file.flush()
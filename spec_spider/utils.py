@@ -1,6 +1,5 @@
 import re
-
-import pandas as pd
+from typing import NamedTuple, Optional, Union
 
 
 def get_detail_url(o_url, suffix):
@@ -13,62 +12,130 @@ def get_detail_url(o_url, suffix):
     return '/'.join(items[:-1] + [suffix])
 
 
+TAG_PATTERN = re.compile('<.*?>')
+
+
 def delete_br(raw_html):
-    return re.sub('\n', ' ', re.sub('<br>', '', raw_html))
+    return raw_html.replace('<br>', '').replace('\n', ' ')
 
 
 def delete_tag(raw_html):
-    cleaner = re.compile('<.*?>')
-    return re.sub(cleaner, '', raw_html)
+    return TAG_PATTERN.sub('', raw_html)
 
 
 def delete_tag_and_br(raw_html):
-    return delete_br(delete_tag(raw_html).strip()).strip()
+    """ Text of an html fragment, lines joined by spaces
+    :param raw_html: <td>Intel Xeon Gold 6248<br>\n2.50 GHz</td>
+    :return: Intel Xeon Gold 6248 2.50 GHz
 
+    Same result as delete_br(delete_tag(raw_html).strip()).strip(): no `<br>` is
+    left once the tags are deleted, and the ends are stripped before the inner
+    newlines become spaces, so a single pattern pass is enough.
+    """
+    if '<' in raw_html:
+        raw_html = TAG_PATTERN.sub('', raw_html)
+    return raw_html.strip().replace('\n', ' ')
 
-def clean_vendor(vendor):
-    def _clear(pattern):
-        return re.sub(re.compile(pattern, re.IGNORECASE), '', vendor)
 
-    vendor = vendor.strip()
-    patterns = [
+# stripped in turn, each pass over what the previous one left
+VENDOR_SUFFIXES = [
+    re.compile(pattern, re.IGNORECASE)
+    for pattern in [
         ' *[(].*[)]',
         ',* *Ltd\.*$|,* *Inc\.*$',
-        ',* *Co\.*$|,* *Corporation\.*$|,* *Corparation\.*$|,* *Corp\.*$| Incoporated$| Incorporated$| Incorporation$',
+        ',* *Co\.*$|,* *Corporation\.*$|,* *Corparation\.*$|,* *Corp\.*$'
+        '| Incoporated$| Incorporated$| Incorporation$',
         ' International$',
         ' Computer[s]*$',
         ' Technology$',
     ]
-    for pattern in patterns:
-        vendor = _clear(pattern)
-
-    replace_pairs = [
-        ('^Huawei', 'Huawei'),
-        ('^ASUS', 'ASUS'),
-        ('^acer', 'Acer'),
-        ('^Hewlett[ -]*Packard', 'HPE'),
-        ('^Inspur', 'Inspur'),
-        ('H3C', 'H3C'),
-        ('^Giga[ -]*byte', 'Gigabyte'),
-        ('^Fujitsu', 'Fujitsu'),
-        ('^Hitachi', 'Hitachi'),
-        ('^Lenovo', 'Lenovo'),
-        ('^Quanta', 'Quanta'),
-        ('^Super[ -]*Micro', 'SuperMicro'),
-        ('^UNIWIDE', 'Uniwide'),
-        ('^Wizbrain', 'Wizbrain'),
-        ('^ScaleMP', 'ScaleMP'),
-        ('^AMD', 'AMD'),
-        ('Advanced Micro Devices', 'AMD'),
-        ('^Hewelett-Packard', 'HPE'),
-        ('^Oracl', 'Oracle'),
-        ('^BEA', 'BEA'),
-        ('^OpenJDK', 'OpenJDK'),
+]
+# a vendor matching none of the suffixes is left as it is
+VENDOR_ANY_SUFFIX = re.compile(
+    '|'.join(f"(?:{pattern.pattern})" for pattern in VENDOR_SUFFIXES[1:]),
+    re.IGNORECASE,
+)
+# (pattern, name), a vendor takes the name of the first pattern it matches
+VENDOR_NAMES = [
+    ('^Huawei', 'Huawei'),
+    ('^ASUS', 'ASUS'),
+    ('^acer', 'Acer'),
+    ('^Hewlett[ -]*Packard', 'HPE'),
+    ('^Inspur', 'Inspur'),
+    ('H3C', 'H3C'),
+    ('^Giga[ -]*byte', 'Gigabyte'),
+    ('^Fujitsu', 'Fujitsu'),
+    ('^Hitachi', 'Hitachi'),
+    ('^Lenovo', 'Lenovo'),
+    ('^Quanta', 'Quanta'),
+    ('^Super[ -]*Micro', 'SuperMicro'),
+    ('^UNIWIDE', 'Uniwide'),
+    ('^Wizbrain', 'Wizbrain'),
+    ('^ScaleMP', 'ScaleMP'),
+    ('^AMD', 'AMD'),
+    ('Advanced Micro Devices', 'AMD'),
+    ('^Hewelett-Packard', 'HPE'),
+    ('^Oracl', 'Oracle'),
+    ('^BEA', 'BEA'),
+    ('^OpenJDK', 'OpenJDK'),
+]
+
+
+def _vendor_rules():
+    """ The VENDOR_NAMES in one pattern for the prefixes, tried in order at the
+    start of the vendor, and one per pattern anywhere in it
+
+    The patterns after the first match are tested against its name, not the
+    vendor, the name they end with is worked out here once.
+    """
+    compiled = [re.compile(pattern, re.IGNORECASE) for pattern, _ in VENDOR_NAMES]
+    names = []
+    for i, (_, name) in enumerate(VENDOR_NAMES):
+        for pattern, later in zip(compiled[i + 1 :], VENDOR_NAMES[i + 1 :]):
+            if pattern.search(name):
+                name = later[1]
+        names.append(name)
+    prefixes = re.compile(
+        '|'.join(
+            f"(?P<v{i}>{pattern})"
+            for i, (pattern, _) in enumerate(VENDOR_NAMES)
+            if pattern.startswith('^')
+        ),
+        re.IGNORECASE,
+    )
+    anywhere = [
+        (i, compiled[i])
+        for i, (pattern, _) in enumerate(VENDOR_NAMES)
+        if not pattern.startswith('^')
     ]
-    for pair in replace_pairs:
-        if len(re.findall(re.compile(pair[0], re.IGNORECASE), vendor)):
-            vendor = pair[1]
+    return prefixes, anywhere, names
+
 
+VENDOR_PREFIXES, VENDOR_ANYWHERE, VENDOR_CANONICAL = _vendor_rules()
+
+
+def clean_vendor(vendor):
+    """ Vendor name without its company suffixes, or its canonical name
+    :param vendor: Hewlett Packard Enterprise Co.
+    :return: HPE
+    """
+    vendor = vendor.strip()
+    if '(' in vendor:
+        vendor = VENDOR_SUFFIXES[0].sub('', vendor)
+    if VENDOR_ANY_SUFFIX.search(vendor):
+        for pattern in VENDOR_SUFFIXES[1:]:
+            vendor = pattern.sub('', vendor)
+
+    first = len(VENDOR_NAMES)
+    match = VENDOR_PREFIXES.match(vendor)
+    if match:
+        first = int(match.lastgroup[1:])
+    for i, pattern in VENDOR_ANYWHERE:
+        if i < first and pattern.search(vendor):
+            first = i
+            break
+    if first < len(VENDOR_NAMES):
+        return VENDOR_CANONICAL[first]
     return vendor
 
 
@@ -126,6 +193,28 @@ def get_threads_per_core(cpu_info):
     return threads_per_core
 
 
+def parse_cpu_enabled(cpu_info):
+    """ Total cores, chips and threads per core of the CPU(s) enabled
+    :param cpu_info: 64 cores, 2 chips, 2 threads/core
+    :return: (64, 2, 2), None when the text is not of this shape
+
+    The values of get_total_cores, get_chips and get_threads_per_core, from a
+    single split.
+    """
+    if not isinstance(cpu_info, str):
+        return None
+    items = cpu_info.split(',')
+    try:
+        total_cores = int(items[0].split()[0])
+        chips = int(items[1].split()[0])
+        threads_per_core = 1
+        if len(items) == 3:
+            threads_per_core = int(items[-1].split()[0])
+    except (IndexError, ValueError):
+        return None
+    return total_cores, chips, threads_per_core
+
+
 def get_total_memory_amount(memory_info):
     total_memory_amount = int(memory_info.split()[0])
     unit = memory_info.split()[1]
@@ -145,6 +234,105 @@ def get_memory_number(memory_info):
     return memory_num
     
 
+# sizes in GB, a leading one is the total of the description
+MEMORY_TOTAL = re.compile(r'\s*(\d+(?:\.\d+)?)\s*([KMGT])i?B', re.IGNORECASE)
+# the count of a group of DIMMs, `12 x` or `12*` as get_memory_number reads
+# it, and its size if stated
+DIMM_GROUP = re.compile(
+    r'(\d+)[ ]*[x*](?:[ ]*(\d+(?:\.\d+)?)[ ]*(?i:([KMGT])i?B))?'
+)
+DDR_TYPE = re.compile(r'\bDDR(\d)[A-Z]*(?:[- ](\d{3,4})\b)?', re.IGNORECASE)
+# PC4-2933Y-R, its number is in MT/s from DDR4 on and in MB/s before
+PC_MODULE = re.compile(r'\bPC(\d)[A-Z]*-(\d{4,5})', re.IGNORECASE)
+MEMORY_SPEED = re.compile(r'\b(\d{3,4})[ ]*(?:MHz|MT/s)', re.IGNORECASE)
+# (8 x 64 GB 2Rx4 PC4-3200AA-R, running at 2933), the speed the DIMMs run at
+RUNNING_AT = re.compile(r'\brunning at[ ]*(\d{3,4})\b', re.IGNORECASE)
+PC_BANDWIDTH = {
+    1600: 200,
+    2100: 266,
+    2700: 333,
+    3200: 400,
+    4200: 533,
+    5300: 667,
+    6400: 800,
+    8500: 1066,
+    10600: 1333,
+    12800: 1600,
+    14900: 1866,
+    17000: 2133,
+}
+SIZE_UNITS = {'K': 1 / 1024 / 1024, 'M': 1 / 1024, 'G': 1, 'T': 1024}
+
+
+class MemorySpec(NamedTuple):
+    amount: Optional[int]
+    dimms: int
+    total: Optional[Union[int, float]]
+    dimm_size: Optional[Union[int, float]]
+    memory_type: Optional[str]
+    speed: Optional[int]
+
+
+def _size_gb(number, unit):
+    size = (float(number) if '.' in number else int(number)) * SIZE_UNITS[unit.upper()]
+    if size == int(size):
+        return int(size)
+    return round(size, 2)
+
+
+def parse_memory(info):
+    """ Amount, number of DIMMs, total GB, GB per DIMM, type and speed of a
+    memory
+    :param info: 384 GB (12 x 32 GB 2Rx4 PC4-2933Y-R)
+    :return: MemorySpec(384, 12, 384, 32, 'DDR4', 2933), None when info is
+    not a str
+
+    amount is get_total_memory_amount(info), None where it raises, and dimms
+    is get_memory_number(info). total reads the units of the sizes, without
+    a leading size it is the sum of the DIMM groups of stated size. speed is
+    the one the DIMMs are `running at`, else their rating. The fields that
+    are not given are None.
+    """
+    if not isinstance(info, str):
+        return None
+    try:
+        amount = get_total_memory_amount(info)
+    except (IndexError, ValueError):
+        amount = None
+    groups = DIMM_GROUP.findall(info)
+    dimms = sum(int(count) for count, _, _ in groups) or 1
+    sizes = [
+        (int(count), _size_gb(size, unit)) for count, size, unit in groups if size
+    ]
+    dimm_size = sizes[0][1] if len(sizes) else None
+
+    total = None
+    match = MEMORY_TOTAL.match(info)
+    if match:
+        total = _size_gb(*match.groups())
+    elif len(sizes):
+        total = sum(count * size for count, size in sizes)
+
+    memory_type = speed = None
+    ddr = DDR_TYPE.search(info)
+    module = PC_MODULE.search(info)
+    if ddr:
+        memory_type = f"DDR{ddr.group(1)}"
+        speed = int(ddr.group(2)) if ddr.group(2) else None
+    if module:
+        generation, number = int(module.group(1)), int(module.group(2))
+        memory_type = memory_type or f"DDR{generation}"
+        if speed is None:
+            speed = number if generation >= 4 else PC_BANDWIDTH.get(number)
+    if speed is None:
+        match = MEMORY_SPEED.search(info)
+        speed = int(match.group(1)) if match else None
+    running = RUNNING_AT.search(info)
+    if running:
+        speed = int(running.group(1))
+    return MemorySpec(amount, dimms, total, dimm_size, memory_type, speed)
+
+
 def parse_storage(info):
     if 'SSD' in info.upper():
         storage_type = 'SSD'
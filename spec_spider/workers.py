@@ -0,0 +1,59 @@
+import importlib
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+from twisted.internet import defer, reactor
+from twisted.python.failure import Failure
+
+# spider instances of a worker process, by spider class path
+_spiders = {}
+
+
+def _run_parser(spider_path, method, url, body, encoding, kwargs):
+    """ Run a detail parser of a spider inside a worker process """
+    from scrapy.http import HtmlResponse
+
+    spider = _spiders.get(spider_path)
+    if spider is None:
+        module, name = spider_path.rsplit('.', 1)
+        spider = getattr(importlib.import_module(module), name)()
+        _spiders[spider_path] = spider
+    response = HtmlResponse(url, body=body, encoding=encoding)
+    return getattr(spider, method)(response, **kwargs)
+
+
+def _fire(d, future):
+    exc = future.exception()
+    if exc is not None:
+        d.errback(Failure(exc))
+    else:
+        d.callback(future.result())
+
+
+class ParsePool:
+    """ Detail parsers run in worker processes, off the reactor thread
+
+    Only the response body and the cb_kwargs cross the process boundary, the
+    parser returns a plain dict. At most max_inflight parses are pending, the
+    others wait on the reactor without holding a worker.
+    """
+
+    def __init__(self, workers, max_inflight):
+        self.executor = ProcessPoolExecutor(
+            workers, mp_context=multiprocessing.get_context('spawn')
+        )
+        self.semaphore = defer.DeferredSemaphore(max_inflight)
+
+    def submit(self, spider_cls, method, response, kwargs):
+        spider_path = f"{spider_cls.__module__}.{spider_cls.__name__}"
+        args = (spider_path, method, response.url, response.body, response.encoding)
+        return self.semaphore.run(self._submit, args + (kwargs,))
+
+    def _submit(self, args):
+        d = defer.Deferred()
+        future = self.executor.submit(_run_parser, *args)
+        future.add_done_callback(lambda f: reactor.callFromThread(_fire, d, f))
+        return d
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False)
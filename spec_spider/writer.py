@@ -0,0 +1,87 @@
+import logging
+import queue
+import threading
+from collections import deque
+
+from twisted.internet import defer, reactor, threads
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+class BackgroundWriter(threading.Thread):
+    """ Export items on a thread of its own, so the reactor never waits on disk
+
+    The pipeline puts (file, exporter, item) on a bounded queue; the thread
+    exports them in batches and flushes the files of each batch. While the
+    queue is full, `put` returns a Deferred fired once the item is queued,
+    which holds the item in the scraper and so stops the engine from pulling
+    more requests out of the scheduler.
+    """
+
+    def __init__(self, maxsize=1000, batch_size=100):
+        super().__init__(name='export-writer', daemon=True)
+        self.queue = queue.Queue(maxsize)
+        self.batch_size = batch_size
+        # (task, deferred) waiting for room in the queue, reactor thread only
+        self.pending = deque()
+
+    def put(self, file, exporter, item):
+        task = (file, exporter, item)
+        if not len(self.pending):
+            try:
+                self.queue.put_nowait(task)
+                return None
+            except queue.Full:
+                pass
+        d = defer.Deferred()
+        self.pending.append((task, d))
+        return d
+
+    def _drain(self):
+        while len(self.pending):
+            task, d = self.pending[0]
+            try:
+                self.queue.put_nowait(task)
+            except queue.Full:
+                return
+            self.pending.popleft()
+            d.callback(None)
+
+    def _next_batch(self):
+        batch = [self.queue.get()]
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self.queue.get_nowait())
+            except queue.Empty:
+                break
+        # there is room again for the items held back
+        reactor.callFromThread(self._drain)
+        return batch
+
+    def run(self):
+        stopping = False
+        while not stopping:
+            files = set()
+            for task in self._next_batch():
+                if task is _STOP:
+                    stopping = True
+                    continue
+                file, exporter, item = task
+                try:
+                    exporter.export_item(item)
+                except Exception:
+                    logger.exception(f"Error exporting {item!r}")
+                if file is not None:
+                    files.add(file)
+            for file in files:
+                file.flush()
+
+    def _stop(self):
+        self.queue.put(_STOP)
+        self.join()
+
+    def stop(self):
+        """ Deferred fired once every queued item is exported """
+        return threads.deferToThread(self._stop)